@@ -1 +1,6 @@
-from .datastorage import DataStore, StorageStrategy, YamlStorage, update_datastore, AttributeRemover, Status, update_and_store_data
+from .datastorage import DataStore, StorageStrategy, YamlStorage, JournalStorage, update_datastore, AttributeRemover, Status, update_and_store_data, \
+    ConcurrentModificationError, LiveStatus
+from .sqlitestorage import SqliteStorage, LazyNode, to_plain_data
+from .shardedstorage import ShardedYamlStorage, LazyShard
+from .dotpoints import DotpointStore, DotpointsView, DOTPOINT_DTYPE
+from .registry import SessionYamlStorage, YamlDataRegistry, CopyOnWriteDict, default_registry
@@ -0,0 +1,186 @@
+"""
+Load time benchmark of YamlStorage on synthetic survey files, parsing the YAML file versus reading the binary snapshot,
+and parse and dump benchmark of the YAML backends of `bgstools.utils.serialization`.
+
+Can be used as stand-alone script by providing command-line arguments:
+    python -m bgstools.datastorage.benchmark --stations 100 1000 --output datastorage_benchmark.json
+    python -m bgstools.datastorage.benchmark --yaml-backends --stations 100 1000
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import datetime
+import tempfile
+from typing import Callable
+import yaml
+from ..utils import serialization
+from ..version import __version__
+from .datastorage import YamlStorage
+
+DEFAULT_STATIONS = (100, 1_000, 5_000)
+
+
+def generate_survey_data(n_stations:int, n_frames:int = 10) -> dict:
+    """
+    Generate a survey dictionary shaped like the files of the annotation apps, with `n_stations` stations
+    of `n_frames` frames each.
+
+    Args:
+        n_stations (int): The number of stations.
+        n_frames (int, optional): The number of frames per station. Defaults to 10.
+
+    Returns:
+        dict: The survey data, made of dictionaries, lists and scalars only.
+    """
+    stations = {}
+    for station in range(n_stations):
+        stations[f'STATION_{station}'] = {
+            'STATUS': 'COMPLETED' if station % 3 == 0 else 'NOT_STARTED',
+            'SITE': {'DECIMAL_LATITUDE': 57.0 + station * 1e-4, 'DECIMAL_LONGITUDE': 11.0 + station * 1e-4, 'DEPTH': 10.5},
+            'FRAMES': {
+                f'SEC_{frame:06d}': {
+                    'FILEPATH': f'/data/survey/station_{station}/frames/SEC_{frame:06d}.png',
+                    'INTERPRETATION': {'DOTPOINTS': [{'ID': i, 'X': i * 10, 'Y': i * 20, 'LABEL': 'Sand'} for i in range(3)]},
+                }
+                for frame in range(n_frames)
+            },
+        }
+    return {'SELECTED_SURVEY': 'SURVEY_1', 'APP': {'SURVEYS': {'SURVEY_1': {'STATIONS': stations}}}}
+
+
+def _time(func:Callable, repeat:int) -> float:
+    """The best wall time of `repeat` runs of a function without arguments."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmarks(stations:tuple = DEFAULT_STATIONS, n_frames:int = 10, repeat:int = 3, callback:Callable[[str], None] = None) -> dict:
+    """
+    Run the load benchmarks for each survey size.
+
+    Args:
+        stations (tuple, optional): The numbers of stations of the synthetic survey files. Defaults to 100, 1000 and 5000
+            (about 22 MiB with 10 frames per station).
+        n_frames (int, optional): The number of frames per station. Defaults to 10.
+        repeat (int, optional): The number of runs of each measurement, of which the fastest is reported. Defaults to 3.
+        callback (Callable[[str], None], optional): A callback function called with a message after each survey size.
+
+    Returns:
+        dict: A JSON-serializable dictionary with the environment and one result per survey size.
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as dirpath:
+        for n_stations in stations:
+            file_path = os.path.join(dirpath, f'survey_{n_stations}.yaml')
+            with open(file_path, 'w') as f:
+                serialization.safe_dump(generate_survey_data(n_stations, n_frames), f)
+
+            yaml_seconds = _time(lambda: YamlStorage(file_path=file_path), repeat)
+            # The first load parses the YAML file and writes the snapshot
+            YamlStorage(file_path=file_path, snapshot_cache=True)
+            snapshot_seconds = _time(lambda: YamlStorage(file_path=file_path, snapshot_cache=True), repeat)
+
+            result = {
+                'n_stations': n_stations,
+                'yaml_bytes': os.path.getsize(file_path),
+                'snapshot_bytes': os.path.getsize(f'{file_path}.snapshot'),
+                'yaml_seconds': yaml_seconds,
+                'snapshot_seconds': snapshot_seconds,
+                'speedup': yaml_seconds / snapshot_seconds if snapshot_seconds > 0 else None,
+            }
+            results.append(result)
+            if callback:
+                callback(f"{n_stations} stations ({result['yaml_bytes'] / 1024 ** 2:.1f} MiB): yaml {yaml_seconds:.3f} s, "
+                         f"snapshot {snapshot_seconds:.3f} s")
+
+    return {
+        'bgstools': __version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'pyyaml': yaml.__version__,
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'n_frames': n_frames,
+        'results': results,
+    }
+
+
+def run_yaml_backend_benchmarks(stations:tuple = DEFAULT_STATIONS, n_frames:int = 10, repeat:int = 3, callback:Callable[[str], None] = None) -> dict:
+    """
+    Run the parse and dump benchmarks of each available YAML backend for each survey size.
+
+    Args:
+        stations (tuple, optional): The numbers of stations of the synthetic survey documents. Defaults to 100, 1000 and 5000.
+        n_frames (int, optional): The number of frames per station. Defaults to 10.
+        repeat (int, optional): The number of runs of each measurement, of which the fastest is reported. Defaults to 3.
+        callback (Callable[[str], None], optional): A callback function called with a message after each survey size.
+
+    Returns:
+        dict: A JSON-serializable dictionary with the environment and one result per survey size, with the parse and
+            dump times of each backend and their speedup over the pure-Python backend.
+    """
+    results = []
+    for n_stations in stations:
+        data = generate_survey_data(n_stations, n_frames)
+        document = serialization.get_yaml_backend('python').safe_dump(data)
+        result = {'n_stations': n_stations, 'yaml_bytes': len(document.encode('utf-8')), 'backends': {}}
+
+        for name in serialization.available_yaml_backends():
+            backend = serialization.get_yaml_backend(name)
+            if backend.safe_load(document) != data:
+                raise AssertionError(f"The YAML backend `{name}` does not read back the survey data")
+            result['backends'][name] = {
+                'parse_seconds': _time(lambda: backend.safe_load(document), repeat),
+                'dump_seconds': _time(lambda: backend.safe_dump(data), repeat),
+            }
+
+        python_times = result['backends']['python']
+        for times in result['backends'].values():
+            times['parse_speedup'] = python_times['parse_seconds'] / times['parse_seconds']
+            times['dump_speedup'] = python_times['dump_seconds'] / times['dump_seconds']
+        results.append(result)
+        if callback:
+            callback(f"{n_stations} stations ({result['yaml_bytes'] / 1024 ** 2:.1f} MiB): " + ', '.join(
+                f"{name} parse {times['parse_seconds']:.3f} s, dump {times['dump_seconds']:.3f} s"
+                for name, times in result['backends'].items()))
+
+    return {
+        'bgstools': __version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'pyyaml': yaml.__version__,
+        'libyaml': yaml.__with_libyaml__,
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'n_frames': n_frames,
+        'results': results,
+    }
+
+
+def main(argv:list = None):
+    parser = argparse.ArgumentParser(description='Benchmark the load time of YamlStorage with and without the binary snapshot.')
+    parser.add_argument('--stations', type=int, nargs='+', default=list(DEFAULT_STATIONS), help='Numbers of stations of the survey files.')
+    parser.add_argument('--frames', type=int, default=10, help='Number of frames per station.')
+    parser.add_argument('--repeat', type=int, default=3, help='Number of runs of each measurement.')
+    parser.add_argument('--output', type=str, default=None, help='Path of the JSON report. Defaults to stdout.')
+    parser.add_argument('--yaml-backends', action='store_true', help='Benchmark the parse and dump times of the YAML backends instead.')
+    args = parser.parse_args(argv)
+
+    benchmark = run_yaml_backend_benchmarks if args.yaml_backends else run_benchmarks
+    report = benchmark(stations=args.stations, n_frames=args.frames, repeat=args.repeat,
+                       callback=lambda message: print(message, file=sys.stderr))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+
+
+if __name__ == '__main__':
+    main()
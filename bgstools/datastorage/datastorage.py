@@ -1,9 +1,37 @@
 import os
-from typing import Dict, Callable
+import stat
+import time
+import asyncio
+import functools
+import atexit
+import pickle
+import hashlib
+import weakref
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Dict, Callable, Optional
 import yaml
+from ..utils import serialization
 from dataclasses import dataclass, field
 import chardet
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+_MISSING = object()
+
+# Header of the binary snapshot sidecar of a YamlStorage, followed by the 16 bytes content hash of the YAML file
+_SNAPSHOT_MAGIC = b'BGSTOOLS-SNAPSHOT-1\n'
+_SNAPSHOT_HASH_SIZE = 16
+
+
+class ConcurrentModificationError(Exception):
+    """Raised when a YamlStorage shared between processes was modified by another writer since it was loaded."""
+
 
 def update_and_store_data(data, keys_list, new_value, datastore):
     """
@@ -18,6 +46,7 @@ def update_and_store_data(data, keys_list, new_value, datastore):
 
     Returns:
         None. However, this function has the side effect of updating the `data` dictionary and storing it in the datastore.
+        If the datastore is a `DataStore` and the new value equals the current one, nothing is written.
 
     Raises:
         KeyError: If any key in the keys_list is not found in the dictionary, an error message will be raised.
@@ -28,11 +57,143 @@ def update_and_store_data(data, keys_list, new_value, datastore):
         for key in keys_list[:-1]:
             nested_dict = nested_dict[key]
 
-        # Update the value and store the data
+        # Update the value and store the data, letting the strategy write only the changed path if it can
+        try:
+            old_value = nested_dict[keys_list[-1]]
+        except (KeyError, IndexError):
+            old_value = _MISSING
         nested_dict[keys_list[-1]] = new_value
-        datastore.store_data(data=data)
+        if isinstance(datastore, DataStore):
+            datastore.store_paths(data=data, paths=[list(keys_list)], changed=_is_changed(old_value, new_value))
+        elif hasattr(datastore, 'store_paths'):
+            datastore.store_paths(data=data, paths=[list(keys_list)])
+        else:
+            datastore.store_data(data=data)
     except KeyError as e:
-        raise (f'BGSTOOLS: Error updating and storing data: {e}')
+        raise KeyError(f'BGSTOOLS: Error updating and storing data: {e}')
+
+
+def _is_changed(old_value, new_value) -> bool:
+    """True if assigning `new_value` over `old_value` must be persisted.
+
+    Re-assigning the same dictionary or list counts as a change, since it may have been mutated in place.
+    """
+    if old_value is _MISSING or type(old_value) is not type(new_value):
+        return True
+    if old_value is new_value:
+        return isinstance(new_value, (dict, list, set))
+    try:
+        return bool(old_value != new_value)
+    except Exception:
+        return True
+
+
+def _set_nested_value(data:Dict, keys_list:list, value):
+    """Sets a value in nested dictionaries and lists, creating the missing intermediate dictionaries.
+
+    Existing dictionaries and lists on the path are stepped into by key or index; a missing key, or a key holding
+    a scalar, gets a new dictionary.
+    """
+    nested = data
+    for key in keys_list[:-1]:
+        if isinstance(nested, list):
+            nested = nested[key]
+            continue
+        if not isinstance(nested.get(key), (dict, list)):
+            nested[key] = {}
+        nested = nested[key]
+    nested[keys_list[-1]] = value
+
+
+def _get_nested_value(data:Dict, keys_list:list):
+    """Gets a value from a nested dictionary, raising KeyError if the path does not exist."""
+    for key in keys_list:
+        data = data[key]
+    return data
+
+
+def _write_file_atomically(file_path:str, content:bytes) -> os.stat_result:
+    """Replaces a file with the given content through a temporary file in the same directory.
+
+    Returns the status of the written file, taken before the rename so it cannot belong to another writer's file.
+    """
+    dirpath = os.path.dirname(os.path.abspath(file_path))
+    fd, temp_path = tempfile.mkstemp(dir=dirpath, prefix=f'.{os.path.basename(file_path)}.', suffix='.tmp')
+    try:
+        # mkstemp creates the file readable by its owner only, keep the mode of the replaced file instead
+        try:
+            mode = stat.S_IMODE(os.stat(file_path).st_mode)
+        except FileNotFoundError:
+            mode = 0o666 & ~_get_umask()
+        os.chmod(temp_path, mode)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+            file_stat = os.fstat(f.fileno())
+        os.replace(temp_path, file_path)
+        return file_stat
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _get_umask() -> int:
+    """The file mode creation mask of the process, read once since it can only be read by setting it."""
+    global _umask
+    if _umask is None:
+        _umask = os.umask(0o022)
+        os.umask(_umask)
+    return _umask
+
+
+_umask = None
+
+
+@contextmanager
+def _exclusive_file_lock(lock_path:str):
+    """Holds an advisory exclusive lock on a lock file for the duration of the context, blocking until it is acquired."""
+    with open(lock_path, 'a+b') as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    pass
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _merge_changes(base, ours, theirs):
+    """Three-way merges nested dictionaries: applies the changes from `base` to `ours` onto `theirs`.
+
+    Keys changed on one side only take that side's value, and keys changed on both sides take ours.
+    A missing key is represented by `_MISSING`.
+    """
+    if ours == base:
+        return theirs
+    if theirs == base or not (isinstance(base, dict) and isinstance(ours, dict) and isinstance(theirs, dict)):
+        return ours
+
+    merged = {}
+    for key in list(theirs) + [key for key in ours if key not in theirs]:
+        value = _merge_changes(base.get(key, _MISSING), ours.get(key, _MISSING), theirs.get(key, _MISSING))
+        if value is not _MISSING:
+            merged[key] = value
+    return merged
 
 
 @dataclass
@@ -52,6 +213,17 @@ class StorageStrategy:
         """
         self.data = data
 
+    def store_paths(self, data: Dict, paths: list):
+        """Stores the given data, of which only the values at the given nested paths changed.
+
+        Strategies that can write partially override this method. By default the whole data is stored.
+
+        Args:
+            data (Dict): The data to store in the storage strategy.
+            paths (list): A list of key lists, each the path to a changed value.
+        """
+        self.store_data(data=data)
+
     def load_data(self):
         """Loads the data from the storage strategy into the `data` attribute."""
         pass
@@ -73,6 +245,31 @@ class StorageStrategy:
 class YamlStorage(StorageStrategy):
     """A storage strategy that stores and retrieves data in a YAML file.
 
+    The file is always replaced atomically: the data is written to a temporary file in the same directory,
+    which is then renamed over the YAML file, so a crash never leaves a truncated file behind.
+
+    `load_data` remembers the identity, size and modification time of the file it parsed, and keeps the current
+    data when the file has not changed since it was last loaded or stored, so repeated loads cost a single `stat`.
+
+    With `write_behind=True`, `store_data` and `update_data` only mark the data as dirty, and consecutive
+    updates are coalesced into a single write. The write happens once no update arrived for `flush_interval`
+    seconds, but never later than `max_staleness` seconds after the first unwritten update, on an explicit
+    `flush()`, or at interpreter exit.
+
+    With `shared=True`, the file can be written by several processes (e.g. Streamlit sessions and batch workers).
+    Writes hold an advisory lock on `<file_path>.lock` only while they compare and replace the file. Each storage
+    remembers the content hash (`version`) of the file it last loaded or wrote; if another process wrote the file
+    since, the changes made here are merged onto the newer content instead of overwriting it, or
+    `ConcurrentModificationError` is raised with `on_conflict='raise'`. `update_data` applies the update function
+    to the latest content while holding the lock. Reads never take the lock: the file is always replaced
+    atomically, so readers see either the old or the new content.
+
+    With `snapshot_cache=True`, a binary snapshot of the parsed data (pickle protocol 5) is kept in
+    `<file_path>.snapshot`, keyed by the content hash of the YAML file. Loads read the YAML bytes, and only parse
+    them if the snapshot does not match, which is much faster than parsing large files. The YAML file stays the
+    source of truth: editing it by hand invalidates the snapshot. Only enable it for directories whose files
+    are trusted, since unpickling a tampered snapshot can execute code.
+
     Use:
 
     ```
@@ -90,38 +287,200 @@ class YamlStorage(StorageStrategy):
 
     Args:
         file_path (str): The path to the YAML file to store the data in.
+        write_behind (bool, optional): If True, coalesce writes as described above. Defaults to False.
+        flush_interval (float, optional): The debounce interval of write-behind mode in seconds. Defaults to 1.0.
+        max_staleness (float, optional): The maximum time in seconds an update stays unwritten in write-behind mode. Defaults to 5.0.
+        shared (bool, optional): If True, make writes safe against other processes as described above. Defaults to False.
+        on_conflict (str, optional): In shared mode, 'merge' to merge with the changes of other writers or
+            'raise' to raise `ConcurrentModificationError`. Defaults to 'merge'.
+        snapshot_cache (bool, optional): If True, maintain the binary snapshot described above. Defaults to False.
     """
 
     file_path: str = field(default_factory=str)
+    write_behind: bool = False
+    flush_interval: float = 1.0
+    max_staleness: float = 5.0
+    shared: bool = False
+    on_conflict: str = 'merge'
+    snapshot_cache: bool = False
+    _lock: threading.RLock = field(default_factory=threading.RLock, init=False, repr=False, compare=False)
+    _flush_timer: Optional[threading.Timer] = field(default=None, init=False, repr=False, compare=False)
+    _dirty_since: Optional[float] = field(default=None, init=False, repr=False, compare=False)
+    _file_signature: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)
+    _encoding: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    _base_bytes: bytes = field(default=b'', init=False, repr=False, compare=False)
 
     def __post_init__(self):
         """Checks if the YAML file exists and loads it if it does, otherwise initializes the `data` property to an empty dictionary."""
+        if self.on_conflict not in ('merge', 'raise'):
+            raise ValueError(f"on_conflict must be 'merge' or 'raise', not {self.on_conflict!r}")
+
         if os.path.isfile(self.file_path):
             self.load_data()
         else:
             self.data = {}
 
+        if self.write_behind:
+            _write_behind_storages[id(self)] = self
+
+    @property
+    def is_dirty(self) -> bool:
+        """True if there are updates that have not been written to the YAML file yet."""
+        return self._dirty_since is not None
+
+    @property
+    def lock_path(self) -> str:
+        """The path to the lock file used in shared mode."""
+        return f'{self.file_path}.lock'
+
+    @property
+    def snapshot_path(self) -> str:
+        """The path to the binary snapshot sidecar."""
+        return f'{self.file_path}.snapshot'
+
+    @property
+    def version(self) -> str:
+        """The content hash of the YAML file as last loaded or written by this storage."""
+        return _content_hash(self._base_bytes)
+
     def store_data(self, data:Dict):
-        """Stores the data in the YAML file."""
-        
-        with open(self.file_path, 'w') as f:
-            yaml.safe_dump(self.data, f, encoding='utf-8')
+        """Stores the data in the YAML file, or schedules the write in write-behind mode."""
+        with self._lock:
             self.data = data
+            if self.write_behind:
+                self._schedule_flush()
+            else:
+                self._write_file()
+
+    def flush(self):
+        """Writes pending updates to the YAML file. Does nothing if there are none."""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if self._dirty_since is not None:
+                self._write_file()
+                self._dirty_since = None
+
+    def _schedule_flush(self):
+        """Restarts the debounce timer, bounded by the staleness deadline of the first unwritten update."""
+        now = time.monotonic()
+        if self._dirty_since is None:
+            self._dirty_since = now
+        delay = min(self.flush_interval, self._dirty_since + self.max_staleness - now)
+
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+        self._flush_timer = threading.Timer(max(delay, 0.0), self.flush)
+        self._flush_timer.daemon = True
+        self._flush_timer.start()
+
+    def _write_file(self):
+        """Atomically replaces the YAML file with the current data."""
+        yaml_bytes = serialization.safe_dump(self.data, encoding='utf-8')
+        if not self.shared:
+            self._replace_file(yaml_bytes)
+            return
+
+        # Serialize before taking the lock, so the critical section is a read, a hash and a rename in the common case
+        with self._lock, _exclusive_file_lock(self.lock_path):
+            current_bytes = self._read_current_bytes()
+            if current_bytes != self._base_bytes:
+                yaml_bytes = self._merge_into(current_bytes)
+            self._replace_file(yaml_bytes)
+
+    def _replace_file(self, yaml_bytes:bytes):
+        file_stat = _write_file_atomically(self.file_path, yaml_bytes)
+        self._file_signature = _file_signature(file_stat)
+        self._encoding = 'utf-8'
+        if self.shared:
+            self._base_bytes = yaml_bytes
+        if self.snapshot_cache:
+            self._write_snapshot(yaml_bytes, self.data)
+
+    def _read_snapshot(self, yaml_bytes:bytes):
+        """Returns the data of the snapshot if it was taken from the given YAML content, otherwise _MISSING."""
+        try:
+            with open(self.snapshot_path, 'rb') as f:
+                header = f.read(len(_SNAPSHOT_MAGIC) + _SNAPSHOT_HASH_SIZE)
+                if header != _SNAPSHOT_MAGIC + _content_digest(yaml_bytes):
+                    return _MISSING
+                return pickle.load(f)
+        except FileNotFoundError:
+            return _MISSING
+        except Exception:
+            # A truncated or otherwise unreadable snapshot is rebuilt from the YAML file
+            return _MISSING
+
+    def _write_snapshot(self, yaml_bytes:bytes, data):
+        """Replaces the snapshot with the given data, taken from the given YAML content. Failures are ignored, the YAML file stays valid."""
+        try:
+            snapshot_bytes = _SNAPSHOT_MAGIC + _content_digest(yaml_bytes) + pickle.dumps(data, protocol=5)
+            _write_file_atomically(self.snapshot_path, snapshot_bytes)
+        except (OSError, pickle.PicklingError, TypeError, AttributeError):
+            pass
+
+    def _read_current_bytes(self) -> bytes:
+        try:
+            with open(self.file_path, 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return b''
+
+    def _parse(self, yaml_bytes:bytes) -> Dict:
+        if not yaml_bytes:
+            return {}
+        yaml_str, self._encoding = _decode_yaml_bytes(yaml_bytes, self._encoding)
+        data = serialization.safe_load(yaml_str)
+        return {} if data is None else data
+
+    def _merge_into(self, current_bytes:bytes) -> bytes:
+        """Merges the changes made since the last load or write onto the current file content, and returns the result serialized."""
+        if self.on_conflict == 'raise':
+            raise ConcurrentModificationError(
+                f'BGSTOOLS: {self.file_path} was modified by another writer (version {_content_hash(current_bytes)}, '
+                f'expected {self.version}). Reload the data and retry.')
+
+        merged = _merge_changes(self._parse(self._base_bytes), self.data, self._parse(current_bytes))
+        if isinstance(self.data, dict) and isinstance(merged, dict) and merged is not self.data:
+            # Update in place so callers holding the data dictionary see the merged result
+            self.data.clear()
+            self.data.update(merged)
+        else:
+            self.data = merged
+        return serialization.safe_dump(self.data, encoding='utf-8')
 
     def load_data(self):
-        """Loads the data from the YAML file into the `data` attribute of the `StorageStrategy` class."""
+        """Loads the data from the YAML file into the `data` attribute of the `StorageStrategy` class.
+
+        The file is only read and parsed if it changed since it was last loaded or stored, and with
+        `snapshot_cache=True` it is not parsed if the snapshot matches its content. In write-behind mode,
+        pending updates are written first so they are not lost.
+        """
+        if self.is_dirty:
+            self.flush()
+
         try:
             with open(self.file_path, 'rb') as f:
+                signature = _file_signature(os.fstat(f.fileno()))
+                if signature == self._file_signature:
+                    return
                 yaml_bytes = f.read()
 
-            # Use chardet to detect the encoding of the yaml file
-            result = chardet.detect(yaml_bytes)
-            encoding = 'utf-8' if result['encoding'] is None else result['encoding']
-            yaml_str = yaml_bytes.decode(encoding=encoding)
-
-            self.data = yaml.safe_load(yaml_str)
+            data = self._read_snapshot(yaml_bytes) if self.snapshot_cache else _MISSING
+            if data is _MISSING:
+                yaml_str, self._encoding = _decode_yaml_bytes(yaml_bytes, self._encoding)
+                data = serialization.safe_load(yaml_str)
+                if self.snapshot_cache:
+                    self._write_snapshot(yaml_bytes, data)
+            self.data = data
+            self._file_signature = signature
+            if self.shared:
+                self._base_bytes = yaml_bytes
         except (FileNotFoundError, IOError):
             self.data = {}
+            self._file_signature = None
+            self._base_bytes = b''
 
     def update_data(self, update_func: Callable):
         """Updates the data in the YAML file using the given update function.
@@ -129,17 +488,248 @@ class YamlStorage(StorageStrategy):
         Args:
             update_func (Callable): A function that takes the current data as input and returns the updated data.
         """
-        #self.load_data()
-        self.data = update_func(self.data)
-        self.store_data(data=self.data)
+        if self.shared and not self.write_behind:
+            # Apply the update to the latest content under the lock, so concurrent updates are serialized
+            with self._lock, _exclusive_file_lock(self.lock_path):
+                current_bytes = self._read_current_bytes()
+                if current_bytes != self._base_bytes:
+                    self.data = self._parse(current_bytes)
+                    self._base_bytes = current_bytes
+                self.data = update_func(self.data)
+                self._replace_file(serialization.safe_dump(self.data, encoding='utf-8'))
+            return
+
+        with self._lock:
+            self.data = update_func(self.data)
+            self.store_data(data=self.data)
 
     def delete_data(self):
-        """Deletes the YAML file containing the data."""
+        """Deletes the YAML file containing the data and its snapshot, discarding pending updates."""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            self._dirty_since = None
+            self._file_signature = None
+            self._base_bytes = b''
+            for path in (self.file_path, self.snapshot_path):
+                try:
+                    os.remove(path)
+                except (FileNotFoundError, IOError):
+                    pass
+
+
+def _file_signature(file_stat:os.stat_result) -> tuple:
+    """The attributes that change whenever a file is rewritten in place or replaced."""
+    return (file_stat.st_dev, file_stat.st_ino, file_stat.st_size, file_stat.st_mtime_ns)
+
+
+def _content_digest(content:bytes) -> bytes:
+    return hashlib.blake2b(content, digest_size=_SNAPSHOT_HASH_SIZE).digest()
+
+
+def _content_hash(content:bytes) -> str:
+    return _content_digest(content).hex()
+
+
+def _decode_yaml_bytes(yaml_bytes:bytes, encoding:Optional[str] = None) -> tuple:
+    """Decodes YAML file content, trying UTF-8 and the given encoding before falling back to chardet detection.
+
+    Returns:
+        tuple: The decoded string and the encoding that decoded it.
+    """
+    for candidate in ('utf-8-sig', encoding):
+        if candidate is None:
+            continue
         try:
-            os.remove(self.file_path)
-        except (FileNotFoundError, IOError):
+            return yaml_bytes.decode(candidate), candidate
+        except (UnicodeDecodeError, LookupError):
             pass
 
+    # Use chardet to detect the encoding of the yaml file
+    result = chardet.detect(yaml_bytes)
+    encoding = 'utf-8' if result['encoding'] is None else result['encoding']
+    return yaml_bytes.decode(encoding=encoding), encoding
+
+
+# The live write-behind YamlStorage instances, by id since dataclass instances are not hashable
+_write_behind_storages = weakref.WeakValueDictionary()
+
+
+@atexit.register
+def _flush_at_exit():
+    """Flushes the pending updates of the write-behind YamlStorage instances still alive at interpreter exit."""
+    for storage in list(_write_behind_storages.values()):
+        storage.flush()
+
+
+@dataclass
+class JournalStorage(StorageStrategy):
+    """A storage strategy that keeps a YAML snapshot plus an append-only journal of changed paths.
+
+    `store_paths` (used by `update_and_store_data`) appends one small `{path, value}` entry per changed path to
+    `<file_path>.journal` instead of rewriting the whole document, so the write cost is proportional to the change.
+    Loading reads the snapshot and replays the journal. Once the journal grows past `compaction_threshold` bytes,
+    the current data is written as a new snapshot and the journal is reset.
+
+    The first line of the journal records the hash of the snapshot it applies to, so a journal left over from a
+    crash during compaction is never replayed onto the newer snapshot. A torn last entry is discarded on load.
+
+    Use:
+
+    ```
+    data_store = DataStore(JournalStorage(file_path='/path/to/survey.yaml'))
+    data = data_store.load_data()
+    update_and_store_data(data, ['APP', 'SURVEYS', 'SURVEY_1', 'STATUS'], 'COMPLETED', data_store)
+    ```
+
+    Args:
+        file_path (str): The path to the YAML snapshot file.
+        compaction_threshold (int, optional): The journal size in bytes above which it is compacted. Defaults to 1 MiB.
+    """
+
+    file_path: str = field(default_factory=str)
+    compaction_threshold: int = 1024 * 1024
+
+    def __post_init__(self):
+        """Loads the snapshot and the journal if they exist, otherwise initializes the `data` property to an empty dictionary."""
+        if os.path.isfile(self.file_path) or os.path.isfile(self.journal_path):
+            self.load_data()
+        else:
+            self.data = {}
+
+    @property
+    def journal_path(self) -> str:
+        """The path to the journal file."""
+        return f'{self.file_path}.journal'
+
+    def load_data(self):
+        """Loads the snapshot into the `data` attribute and replays the journal entries on top of it."""
+        try:
+            with open(self.file_path, 'rb') as f:
+                snapshot_bytes = f.read()
+        except FileNotFoundError:
+            snapshot_bytes = b''
+        data = serialization.safe_load(_decode_yaml_bytes(snapshot_bytes)[0]) if snapshot_bytes else None
+        self.data = data if data is not None else {}
+
+        try:
+            with open(self.journal_path, 'rb') as f:
+                journal_lines = f.readlines()
+        except FileNotFoundError:
+            return
+
+        if not journal_lines or self._journal_header(journal_lines[0]) != self._snapshot_hash(snapshot_bytes):
+            # Stale journal from an interrupted compaction, the snapshot already holds its entries
+            return
+
+        valid_size = len(journal_lines[0])
+        for line in journal_lines[1:]:
+            entry = self._parse_entry(line)
+            if entry is None:
+                break
+            _set_nested_value(self.data, entry['path'], entry['value'])
+            valid_size += len(line)
+
+        # Drop a torn entry left by a crash, so later appends start on a clean line
+        if valid_size < sum(len(line) for line in journal_lines):
+            with open(self.journal_path, 'r+b') as f:
+                f.truncate(valid_size)
+
+    def store_data(self, data: Dict):
+        """Stores the data as a new snapshot and resets the journal."""
+        self.data = data
+        self.compact()
+
+    def store_paths(self, data: Dict, paths: list):
+        """Appends the values at the given nested paths to the journal, compacting it when it passes the threshold.
+
+        Args:
+            data (Dict): The data, already holding the new values.
+            paths (list): A list of key lists, each the path to a changed value.
+        """
+        self.data = data
+        if not os.path.isfile(self.journal_path):
+            self.compact()
+            return
+
+        lines = []
+        for path in paths:
+            line = serialization.safe_dump({'path': list(path), 'value': _get_nested_value(data, path)},
+                                  default_flow_style=True, width=float('inf'), encoding='utf-8')
+            if line.count(b'\n') != 1:
+                # Values that cannot be written on a single line go to a new snapshot instead
+                self.compact()
+                return
+            lines.append(line)
+
+        with open(self.journal_path, 'ab') as f:
+            f.write(b''.join(lines))
+            f.flush()
+            os.fsync(f.fileno())
+            journal_size = f.tell()
+
+        if journal_size > self.compaction_threshold:
+            self.compact()
+
+    def compact(self):
+        """Writes the current data as a new snapshot and resets the journal."""
+        snapshot_bytes = serialization.safe_dump(self.data, encoding='utf-8')
+        _write_file_atomically(self.file_path, snapshot_bytes)
+        _write_file_atomically(self.journal_path, f'# {self._snapshot_hash(snapshot_bytes)}\n'.encode('utf-8'))
+
+    def delete_data(self):
+        """Deletes the snapshot and the journal."""
+        for path in (self.file_path, self.journal_path):
+            try:
+                os.remove(path)
+            except (FileNotFoundError, IOError):
+                pass
+
+    @staticmethod
+    def _snapshot_hash(snapshot_bytes: bytes) -> str:
+        return hashlib.blake2b(snapshot_bytes, digest_size=16).hexdigest()
+
+    @staticmethod
+    def _journal_header(line: bytes) -> Optional[str]:
+        line = line.decode('utf-8', errors='replace').strip()
+        return line[2:] if line.startswith('# ') else None
+
+    @staticmethod
+    def _parse_entry(line: bytes) -> Optional[Dict]:
+        if not line.endswith(b'\n'):
+            return None
+        try:
+            entry = serialization.safe_load(line.decode('utf-8'))
+        except (UnicodeDecodeError, yaml.YAMLError):
+            return None
+        if not isinstance(entry, dict) or not isinstance(entry.get('path'), list) or 'value' not in entry:
+            return None
+        return entry
+
+
+# Per event loop, the asyncio lock of each storage location, see `_async_lock`
+_async_locks = weakref.WeakKeyDictionary()
+
+
+def _storage_key(storage_strategy) -> tuple:
+    """The location of a storage strategy: its file or directory, or the storage itself if it has neither."""
+    for attribute in ('file_path', 'dirpath'):
+        path = getattr(storage_strategy, attribute, None)
+        if path:
+            return (attribute, os.path.abspath(path))
+    return ('id', id(storage_strategy))
+
+
+def _async_lock(storage_strategy) -> asyncio.Lock:
+    """The asyncio lock that serializes the async operations on a storage location within the running event loop."""
+    locks = _async_locks.setdefault(asyncio.get_running_loop(), {})
+    key = _storage_key(storage_strategy)
+    lock = locks.get(key)
+    if lock is None:
+        lock = locks[key] = asyncio.Lock()
+    return lock
+
 
 @dataclass
 class DataStore:
@@ -153,10 +743,24 @@ class DataStore:
         loaded_data = data_store.load_data()
         ````
 
+    In async code, use `aload_data`, `astore_data` and `aupdate_data` instead, which run the parsing and
+    serialization in an executor so the event loop is not blocked.
+
+    The DataStore keeps track of the nested paths modified through `store_paths` (used by `update_datastore` and
+    `update_and_store_data`) since the last persist. A call in which nothing changed does not write, and the
+    strategy receives the modified paths so it can write partially if it supports it.
+
     Attributes:
         storage_strategy (StorageStrategy): The storage strategy used to store and retrieve data.
+        dirty_paths (set): The nested paths, as tuples of keys, modified since the last persist.
+        write_stats (Dict): The number of `performed` and `skipped` writes.
+        revision (int): A counter incremented each time the data is stored, loaded, updated or deleted.
     """
     storage_strategy: StorageStrategy
+    dirty_paths: set = field(default_factory=set, init=False, repr=False, compare=False)
+    write_stats: Dict = field(default_factory=lambda: {'performed': 0, 'skipped': 0}, init=False, repr=False, compare=False)
+    revision: int = field(default=0, init=False, repr=False, compare=False)
+    _aload_task: Optional[asyncio.Future] = field(default=None, init=False, repr=False, compare=False)
 
     def store_data(self, data:Dict):
         """Stores the given data using the current storage strategy.
@@ -166,10 +770,49 @@ class DataStore:
         """
         self.storage_strategy.data = data
         self.storage_strategy.store_data(data=self.storage_strategy.data)
+        self.dirty_paths.clear()
+        self.write_stats['performed'] += 1
+        self.revision += 1
+
+    def store_paths(self, data:Dict, paths:list, changed:bool = True) -> bool:
+        """Stores the given data using the current storage strategy, of which only the values at the given nested paths changed.
+
+        Args:
+            data (Dict): The data to store.
+            paths (list): A list of key lists, each the path to a changed value.
+            changed (bool, optional): False if the values at the paths were set to what they already were,
+                in which case the paths are not marked as modified. Defaults to True.
+
+        Returns:
+            bool: True if the data was written, False if the write was skipped because nothing changed.
+        """
+        self.storage_strategy.data = data
+        if changed:
+            self.dirty_paths.update(tuple(path) for path in paths)
+
+        if not self.dirty_paths:
+            self.write_stats['skipped'] += 1
+            return False
+
+        self.storage_strategy.store_paths(data=self.storage_strategy.data, paths=self._collapse_dirty_paths())
+        self.dirty_paths.clear()
+        self.write_stats['performed'] += 1
+        self.revision += 1
+        return True
+
+    def _collapse_dirty_paths(self) -> list:
+        """The dirty paths without those nested under another dirty path."""
+        collapsed = []
+        for path in sorted(self.dirty_paths, key=len):
+            if not any(path[:len(prefix)] == prefix for prefix in collapsed):
+                collapsed.append(path)
+        return [list(path) for path in collapsed]
 
     def load_data(self) -> Dict:
         """Loads the data from the current storage strategy into the `data` attribute of the `StorageStrategy` class and returns it."""
         self.storage_strategy.load_data()
+        self.dirty_paths.clear()
+        self.revision += 1
         return self.storage_strategy.data
 
     def update_data(self, update_func: Callable):
@@ -179,16 +822,72 @@ class DataStore:
             update_func (Callable): A function that takes the current data as input and returns the updated data.
         """
         self.storage_strategy.update_data(update_func)
+        self.revision += 1
 
     def delete_data(self):
         """Deletes the data stored by the current storage strategy."""
-        self.storage_strategy.delete_data() 
+        self.storage_strategy.delete_data()
+        self.revision += 1
+
+    async def _run_locked(self, func:Callable, executor=None):
+        """Runs a blocking function in the executor, holding the asyncio lock of the storage location."""
+        async with _async_lock(self.storage_strategy):
+            return await asyncio.get_running_loop().run_in_executor(executor, func)
+
+    async def aload_data(self, executor=None) -> Dict:
+        """Loads the data like `load_data`, without blocking the event loop.
+
+        Concurrent calls on the same DataStore share a single load. Loads wait for the pending writes to the same
+        file or directory to finish.
+
+        Args:
+            executor (concurrent.futures.Executor, optional): The executor running the load. Defaults to the default executor of the event loop.
+
+        Returns:
+            Dict: The loaded data.
+        """
+        task = self._aload_task
+        if task is None:
+            task = self._aload_task = asyncio.ensure_future(self._run_locked(self.load_data, executor))
+
+            def clear_task(finished_task):
+                if self._aload_task is finished_task:
+                    self._aload_task = None
+            task.add_done_callback(clear_task)
+
+        # A cancelled caller must not cancel the load shared with the other callers
+        return await asyncio.shield(task)
+
+    async def astore_data(self, data:Dict, executor=None):
+        """Stores the data like `store_data`, without blocking the event loop.
+
+        Writes to the same file or directory are serialized, in the order they were requested.
+
+        Args:
+            data (Dict): The data to store.
+            executor (concurrent.futures.Executor, optional): The executor running the store. Defaults to the default executor of the event loop.
+        """
+        await self._run_locked(functools.partial(self.store_data, data), executor)
+
+    async def aupdate_data(self, update_func: Callable, executor=None):
+        """Updates the data like `update_data`, without blocking the event loop.
+
+        The update function runs in the executor, and updates of the same file or directory are serialized.
+
+        Args:
+            update_func (Callable): A function that takes the current data as input and returns the updated data.
+            executor (concurrent.futures.Executor, optional): The executor running the update. Defaults to the default executor of the event loop.
+        """
+        await self._run_locked(functools.partial(self.update_data, update_func), executor)
 
 
 
 def update_datastore(DATASTORE: DataStore, kwargs: Dict = None, callback: Callable = None) -> Dict:
     """Updates the data in the datastore using the given keyword arguments.
 
+    Only the keys whose values differ from the current ones are marked as modified, and nothing is written if
+    none of them changed. Without keyword arguments, the current data is always stored.
+
     Args:
         DATASTORE (DataStore): The datastore to update.
         kwargs (Dict, optional): The keyword arguments to update the datastore with.
@@ -202,11 +901,16 @@ def update_datastore(DATASTORE: DataStore, kwargs: Dict = None, callback: Callab
     """
     current_data = DATASTORE.storage_strategy.data
 
+    changed_keys = []
     if kwargs:
+        changed_keys = [key for key, value in kwargs.items() if _is_changed(current_data.get(key, _MISSING), value)]
         current_data.update(kwargs)
 
     try:
-        DATASTORE.store_data(data=current_data)
+        if kwargs:
+            DATASTORE.store_paths(data=current_data, paths=[[key] for key in changed_keys], changed=bool(changed_keys))
+        else:
+            DATASTORE.store_data(data=current_data)
     except Exception as e:
         if callback:
             callback(f'Error updating datastore: {e}')
@@ -260,6 +964,94 @@ class Status:
         return {key: getattr(self, key) for key in self.__dict__ if getattr(self, key) is not None}
 
 
+class LiveStatus:
+    """
+    A live view of selected keys of a DataStore, read as attributes.
+
+    Unlike `Status`, nothing is copied at construction: each attribute access reads the current value from
+    `data_store.storage_strategy.data`, so a single instance stays up to date across updates. With `cache=True`,
+    values are cached per key until the data store next stores, loads, updates or deletes its data (tracked by
+    its `revision`); changes made to the data without going through the data store are then not seen.
+
+    Attributes:
+        Any number of read-only attributes specified by the keys parameter in the constructor. Missing keys read as None.
+
+    Usage:
+        ```
+        status = LiveStatus(data_store, ['SELECTED_SURVEY', 'SELECTED_STATION'], cache=True)
+        update_datastore(data_store, {'SELECTED_STATION': 'STATION_2'})
+        status.SELECTED_STATION  # 'STATION_2'
+        ```
+    """
+
+    __slots__ = ('_data_store', '_keys', '_key_set', '_cache', '_cache_revision')
+
+    def __init__(
+        self,
+        data_store: DataStore,
+        keys: list,
+        cache: bool = False
+    ):
+        """
+        Initialize a new instance of the LiveStatus class.
+
+        Args:
+            data_store: A DataStore object that contains the data.
+            keys (list): A list of keys to read from the data store.
+            cache (bool, optional): If True, cache the values until the data store changes, as described above. Defaults to False.
+        """
+        if not hasattr(data_store, 'storage_strategy') or not hasattr(data_store.storage_strategy, 'data'):
+            raise ValueError("The provided data store does not have a storage_strategy with a data attribute")
+
+        if not isinstance(keys, list):
+            raise TypeError("Keys must be a list")
+
+        self._data_store = data_store
+        # Ordered for get_attributes, which follows the declaration order as Status does, and a set for lookups
+        self._keys = tuple(dict.fromkeys(keys))
+        self._key_set = frozenset(self._keys)
+        self._cache = {} if cache else None
+        self._cache_revision = None
+
+    def __getattr__(self, key):
+        # Only called for names that are not slots, so the slots above are never looked up here
+        if key.startswith('_') or key not in self._key_set:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{key}'")
+        return self._get(key)
+
+    def __setattr__(self, key, value):
+        if key not in LiveStatus.__slots__:
+            raise AttributeError(f"'{type(self).__name__}' attributes are read from the data store and cannot be set")
+        object.__setattr__(self, key, value)
+
+    def __dir__(self):
+        return sorted(set(super().__dir__()) | self._key_set)
+
+    def _get(self, key):
+        if self._cache is None:
+            return self._data_store.storage_strategy.data.get(key, None)
+
+        revision = getattr(self._data_store, 'revision', None)
+        if revision != self._cache_revision:
+            self._cache.clear()
+            self._cache_revision = revision
+        try:
+            return self._cache[key]
+        except KeyError:
+            value = self._cache[key] = self._data_store.storage_strategy.data.get(key, None)
+            return value
+
+    def get_attributes(self):
+        """
+        Get a dictionary of all attributes that are not None.
+
+        Returns:
+            A dictionary where the keys are the attribute names and the values are the attribute values.
+        """
+        values = ((key, self._get(key)) for key in self._keys)
+        return {key: value for key, value in values if value is not None}
+
+
 class AttributeRemover:
     """
     AttributeRemover class to remove specified attributes from an object.
@@ -0,0 +1,337 @@
+import json
+from collections.abc import MutableMapping
+from typing import Hashable, Iterable, Optional
+import numpy as np
+
+# One row per dot point. `frame`, `point` and `label` are codes into the frame, point ID and label tables of the
+# DotpointStore, `status` is a code into STATUSES. Coordinates are float64 so that they round-trip unchanged.
+DOTPOINT_DTYPE = np.dtype([
+    ('frame', np.int32),
+    ('point', np.int32),
+    ('x', np.float64),
+    ('y', np.float64),
+    ('label', np.int32),
+    ('status', np.int8),
+])
+
+# The values of `bgstools.io.media.Status`, in code order
+STATUSES = ('NOT_STARTED', 'IN_PROGRESS', 'COMPLETED', 'ERROR', 'UPDATED')
+
+NO_LABEL = -1
+
+_STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+
+
+class DotpointsView(MutableMapping):
+    """The dot points of a frame of a DotpointStore, presented as the `DOTPOINTS` dictionary of `select_random_frames`.
+
+    Each point ID maps to a dictionary with the keys `x`, `y` and `annotation` (the label, or None), plus `status`
+    if it is not 'NOT_STARTED'. The dictionaries are built on access: assign to a point ID to change a point.
+    """
+
+    def __init__(self, store:'DotpointStore', frame_key:Hashable):
+        self._store = store
+        self._frame_key = frame_key
+
+    def _index(self, point_id) -> int:
+        points = self._store.get_points(self._frame_key)
+        code = self._store._point_codes.get(point_id)
+        indexes = np.flatnonzero(points['point'] == code) if code is not None else []
+        if len(indexes) == 0:
+            raise KeyError(point_id)
+        return int(indexes[0])
+
+    def __getitem__(self, point_id):
+        row = self._store.get_points(self._frame_key)[self._index(point_id)]
+        return self._store._row_to_dotpoint(row)
+
+    def __setitem__(self, point_id, dotpoint:dict):
+        self._store.set_point(self._frame_key, point_id, dotpoint['x'], dotpoint['y'],
+                              label=dotpoint.get('annotation'), status=dotpoint.get('status', STATUSES[0]))
+
+    def __delitem__(self, point_id):
+        self._store.remove_point(self._frame_key, point_id)
+
+    def __iter__(self):
+        point_ids = self._store.point_ids
+        return iter([point_ids[code] for code in self._store.get_points(self._frame_key)['point'].tolist()])
+
+    def __len__(self):
+        return len(self._store.get_points(self._frame_key))
+
+    def __repr__(self):
+        return f'DotpointsView({self._frame_key!r}, {len(self)} points)'
+
+
+class DotpointStore:
+    """
+    Columnar store of the dot point annotations of video frames.
+
+    The points of each frame are kept in a NumPy structured array of `DOTPOINT_DTYPE` (frame, point, x, y, label,
+    status: 29 bytes per point), and point IDs and labels are dictionary-encoded in tables shared by all frames, so
+    that point IDs keep their type, e.g. `0` or `'P1'`. The
+    store is saved to and loaded from a single binary `.npz` file. `dotpoints(frame_key)` presents the points
+    of a frame in the nested dictionary shape of `select_random_frames`, for code written against it.
+
+    Attributes:
+        frames (list): The frame table: the frame keys, indexed by frame code.
+        point_ids (list): The point ID table: the point IDs, indexed by point code.
+        labels (list): The label table: the labels, indexed by label code.
+
+    Usage:
+        ```
+        store = DotpointStore.from_frames(frames)  # frames as returned by `select_random_frames`
+        store.add_points('SEC_000005', x=[10, 20], y=[30, 40], labels=['Sand', 'Mud'])
+        store.save('/path/to/dotpoints.npz')
+
+        store = DotpointStore.load('/path/to/dotpoints.npz')
+        store.dotpoints('SEC_000005')  # {0: {'x': 10.0, 'y': 30.0, 'annotation': 'Sand'}, 1: {...}}
+        ```
+    """
+
+    def __init__(self):
+        """Initialize a new, empty instance of the DotpointStore class."""
+        self.frames = []
+        self.point_ids = []
+        self.labels = []
+        self._frame_codes = {}
+        self._point_codes = {}
+        self._label_codes = {}
+        self._points = {}
+
+    def __len__(self):
+        return sum(len(points) for points in self._points.values())
+
+    def __contains__(self, frame_key:Hashable):
+        return frame_key in self._frame_codes
+
+    def frame_code(self, frame_key:Hashable) -> int:
+        """Get the code of a frame, adding it to the frame table if it is new."""
+        code = self._frame_codes.get(frame_key)
+        if code is None:
+            code = self._frame_codes[frame_key] = len(self.frames)
+            self.frames.append(frame_key)
+            self._points[code] = np.empty(0, dtype=DOTPOINT_DTYPE)
+        return code
+
+    def point_code(self, point_id:Hashable) -> int:
+        """Get the code of a point ID, adding it to the point ID table if it is new."""
+        code = self._point_codes.get(point_id)
+        if code is None:
+            code = self._point_codes[point_id] = len(self.point_ids)
+            self.point_ids.append(point_id)
+        return code
+
+    def label_code(self, label:Optional[str]) -> int:
+        """Get the code of a label, adding it to the label table if it is new. None is coded as NO_LABEL."""
+        if label is None:
+            return NO_LABEL
+        code = self._label_codes.get(label)
+        if code is None:
+            code = self._label_codes[label] = len(self.labels)
+            self.labels.append(label)
+        return code
+
+    def _status_code(self, status) -> int:
+        status = getattr(status, 'value', status)
+        if status not in _STATUS_CODES:
+            raise ValueError(f"Unknown status {status!r}, expected any of {STATUSES}")
+        return _STATUS_CODES[status]
+
+    def _row_to_dotpoint(self, row) -> dict:
+        label = int(row['label'])
+        dotpoint = {'x': float(row['x']), 'y': float(row['y']), 'annotation': None if label == NO_LABEL else self.labels[label]}
+        if row['status'] != 0:
+            dotpoint['status'] = STATUSES[row['status']]
+        return dotpoint
+
+    def get_points(self, frame_key:Hashable) -> np.ndarray:
+        """
+        Get the points of a frame.
+
+        Args:
+            frame_key (Hashable): The frame key.
+
+        Returns:
+            np.ndarray: A structured array of `DOTPOINT_DTYPE`, empty if the frame has no points.
+        """
+        code = self._frame_codes.get(frame_key)
+        return self._points[code] if code is not None else np.empty(0, dtype=DOTPOINT_DTYPE)
+
+    def add_points(self, frame_key:Hashable, x, y, labels:Iterable = None, statuses:Iterable = None, point_ids:Iterable = None) -> np.ndarray:
+        """
+        Append points to a frame in bulk.
+
+        Args:
+            frame_key (Hashable): The frame key.
+            x (array-like): The x-coordinates of the points in pixels.
+            y (array-like): The y-coordinates of the points in pixels.
+            labels (Iterable, optional): The label of each point, or None for unlabelled points. Defaults to None.
+            statuses (Iterable, optional): The status of each point. Defaults to 'NOT_STARTED'.
+            point_ids (Iterable, optional): The IDs of the points. Defaults to consecutive integer IDs after the largest
+                integer ID of the frame.
+
+        Returns:
+            np.ndarray: The IDs of the added points.
+
+        Raises:
+            ValueError: If the arrays do not share the same length, a point ID already exists, or a status is unknown.
+        """
+        x = np.asarray(x, dtype=np.float64).ravel()
+        y = np.asarray(y, dtype=np.float64).ravel()
+        if y.shape != x.shape:
+            raise ValueError(f"Got {len(x)} x-coordinates for {len(y)} y-coordinates")
+        code = self.frame_code(frame_key)
+        points = self._points[code]
+
+        if point_ids is None:
+            integer_ids = [point_id for point_id in map(self.point_ids.__getitem__, points['point'].tolist())
+                           if isinstance(point_id, int) and not isinstance(point_id, bool)]
+            start = max(integer_ids) + 1 if integer_ids else 0
+            point_ids = np.arange(start, start + len(x))
+        else:
+            point_ids = np.array(list(point_ids), dtype=object)
+            if len(point_ids) != len(x):
+                raise ValueError(f"Got {len(point_ids)} point IDs for {len(x)} coordinates")
+        point_codes = np.array([self.point_code(point_id) for point_id in point_ids.tolist()], dtype=np.int32)
+        if len(np.unique(point_codes)) != len(point_codes) or np.isin(point_codes, points['point']).any():
+            raise ValueError(f"Duplicate point IDs in frame {frame_key!r}")
+
+        new_points = np.empty(len(x), dtype=DOTPOINT_DTYPE)
+        new_points['frame'] = code
+        new_points['point'] = point_codes
+        new_points['x'] = x
+        new_points['y'] = y
+        new_points['label'] = NO_LABEL if labels is None else [self.label_code(label) for label in labels]
+        new_points['status'] = 0 if statuses is None else [self._status_code(status) for status in statuses]
+
+        self._points[code] = np.concatenate((points, new_points))
+        return point_ids
+
+    def set_point(self, frame_key:Hashable, point_id:Hashable, x:float, y:float, label:Optional[str] = None, status='NOT_STARTED'):
+        """Set a point of a frame, replacing it if it exists."""
+        code = self.frame_code(frame_key)
+        points = self._points[code]
+        point_code = self._point_codes.get(point_id)
+        indexes = np.flatnonzero(points['point'] == point_code) if point_code is not None else []
+        if len(indexes) == 0:
+            self.add_points(frame_key, [x], [y], labels=[label], statuses=[status], point_ids=[point_id])
+            return
+        points[indexes[0]] = (code, point_code, x, y, self.label_code(label), self._status_code(status))
+
+    def set_labels(self, frame_key:Hashable, point_ids:Iterable, labels:Iterable):
+        """Set the labels of points of a frame in bulk."""
+        self._set_column(frame_key, point_ids, 'label', [self.label_code(label) for label in labels])
+
+    def set_statuses(self, frame_key:Hashable, point_ids:Iterable, statuses:Iterable):
+        """Set the statuses of points of a frame in bulk."""
+        self._set_column(frame_key, point_ids, 'status', [self._status_code(status) for status in statuses])
+
+    def _set_column(self, frame_key:Hashable, point_ids:Iterable, column:str, values:list):
+        points = self.get_points(frame_key)
+        point_codes = np.array([self._point_codes.get(point_id, -1) for point_id in point_ids], dtype=np.int32)
+        order = np.argsort(points['point'])
+        positions = np.searchsorted(points['point'][order], point_codes)
+        if (positions >= len(points)).any() or (points['point'][order[positions]] != point_codes).any():
+            raise KeyError(f"Unknown point IDs in frame {frame_key!r}")
+        points[column][order[positions]] = values
+
+    def remove_point(self, frame_key:Hashable, point_id:Hashable):
+        """Remove a point of a frame. Raises KeyError if it does not exist."""
+        points = self.get_points(frame_key)
+        keep = points['point'] != self._point_codes.get(point_id, -1)
+        if keep.all():
+            raise KeyError(point_id)
+        self._points[self._frame_codes[frame_key]] = points[keep]
+
+    def dotpoints(self, frame_key:Hashable) -> DotpointsView:
+        """Get the points of a frame as a `DOTPOINTS` dictionary view. See `DotpointsView`."""
+        self.frame_code(frame_key)
+        return DotpointsView(self, frame_key)
+
+    def to_table(self) -> np.ndarray:
+        """Get the points of all frames as a single structured array, ordered by frame code."""
+        if not self._points:
+            return np.empty(0, dtype=DOTPOINT_DTYPE)
+        return np.concatenate([self._points[code] for code in range(len(self.frames))])
+
+    def to_frames(self, frames:dict) -> dict:
+        """
+        Write the points back into a frames dictionary, as plain `DOTPOINTS` dictionaries that can be stored as YAML.
+
+        Args:
+            frames (dict): A dictionary of frames as returned by `select_random_frames`. It is modified in place.
+
+        Returns:
+            dict: The frames dictionary.
+        """
+        for frame_key, frame in frames.items():
+            if frame_key in self._frame_codes:
+                frame.setdefault('INTERPRETATION', {})['DOTPOINTS'] = dict(self.dotpoints(frame_key))
+        return frames
+
+    @classmethod
+    def from_frames(cls, frames:dict) -> 'DotpointStore':
+        """
+        Build a store from a frames dictionary, as returned by `select_random_frames`.
+
+        Args:
+            frames (dict): The frames, each with an `INTERPRETATION` holding a `DOTPOINTS` dictionary of point IDs to
+                dictionaries with `x`, `y` and optionally `annotation` and `status`.
+
+        Returns:
+            DotpointStore: The new store, with every frame in its frame table.
+        """
+        store = cls()
+        for frame_key, frame in frames.items():
+            store.frame_code(frame_key)
+            dotpoints = ((frame or {}).get('INTERPRETATION') or {}).get('DOTPOINTS') or {}
+            if dotpoints:
+                store.add_points(
+                    frame_key,
+                    x=[dotpoint['x'] for dotpoint in dotpoints.values()],
+                    y=[dotpoint['y'] for dotpoint in dotpoints.values()],
+                    labels=[dotpoint.get('annotation') for dotpoint in dotpoints.values()],
+                    statuses=[dotpoint.get('status', STATUSES[0]) for dotpoint in dotpoints.values()],
+                    point_ids=list(dotpoints))
+        return store
+
+    def save(self, file_path:str):
+        """
+        Save the store to a binary NumPy `.npz` file.
+
+        Args:
+            file_path (str): The path to the file. NumPy appends `.npz` if it is missing.
+        """
+        np.savez(file_path,
+                 points=self.to_table(),
+                 frames=np.array(json.dumps(self.frames)),
+                 point_ids=np.array(json.dumps(self.point_ids)),
+                 labels=np.array(json.dumps(self.labels)))
+
+    @classmethod
+    def load(cls, file_path:str) -> 'DotpointStore':
+        """
+        Load a store saved with `save`.
+
+        Args:
+            file_path (str): The path to the `.npz` file.
+
+        Returns:
+            DotpointStore: The loaded store.
+        """
+        store = cls()
+        with np.load(file_path, allow_pickle=False) as npz:
+            for frame_key in json.loads(str(npz['frames'])):
+                store.frame_code(frame_key)
+            for point_id in json.loads(str(npz['point_ids'])):
+                store.point_code(point_id)
+            for label in json.loads(str(npz['labels'])):
+                store.label_code(label)
+            points = npz['points']
+
+        # The table is ordered by frame code, so each frame is a contiguous slice of it
+        boundaries = np.searchsorted(points['frame'], np.arange(len(store.frames) + 1))
+        for code in range(len(store.frames)):
+            store._points[code] = points[boundaries[code]:boundaries[code + 1]].copy()
+        return store
@@ -0,0 +1,286 @@
+import os
+import copy
+import threading
+from collections.abc import MutableMapping
+from dataclasses import dataclass, field
+from typing import Dict, Callable, Optional
+from ..utils import serialization
+from .datastorage import StorageStrategy, _MISSING, _write_file_atomically, _file_signature, _decode_yaml_bytes
+from .sqlitestorage import to_plain_data
+
+
+class CopyOnWriteDict(MutableMapping):
+    """A mutable view of a shared nested dictionary that copies only what is modified through it.
+
+    The shared dictionary is never modified. Assigned and deleted keys are kept in the view, nested dictionaries
+    are returned as views of their own, and lists are copied on first access since they can be mutated in place.
+    A copied list only counts as a modification once it differs from the shared one.
+    """
+
+    def __init__(self, base:Dict):
+        self._base = base
+        self._local = {}
+        self._deleted = set()
+        self._children = {}
+        self._lists = {}
+
+    def __getitem__(self, key):
+        if key in self._local:
+            return self._local[key]
+        if key in self._children:
+            return self._children[key]
+        if key in self._lists:
+            return self._lists[key]
+        if key in self._deleted:
+            raise KeyError(key)
+
+        value = self._base[key]
+        if isinstance(value, dict):
+            value = self._children[key] = CopyOnWriteDict(value)
+        elif isinstance(value, list):
+            value = self._lists[key] = copy.deepcopy(value)
+        return value
+
+    def __setitem__(self, key, value):
+        self._local[key] = value
+        self._children.pop(key, None)
+        self._lists.pop(key, None)
+        self._deleted.discard(key)
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self._local.pop(key, None)
+        self._children.pop(key, None)
+        self._lists.pop(key, None)
+        if key in self._base:
+            self._deleted.add(key)
+
+    def __contains__(self, key):
+        return key in self._local or (key not in self._deleted and key in self._base)
+
+    def __iter__(self):
+        for key in self._base:
+            if key not in self._deleted:
+                yield key
+        for key in self._local:
+            if key not in self._base:
+                yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f'CopyOnWriteDict({len(self)} keys, modified={self.is_modified})'
+
+    @property
+    def is_modified(self) -> bool:
+        """True if anything was assigned or deleted through this view or its nested views."""
+        return (bool(self._local or self._deleted)
+                or any(child.is_modified for child in self._children.values())
+                or any(value != self._base[key] for key, value in self._lists.items()))
+
+    def materialize(self) -> Dict:
+        """Returns a plain dictionary with the modifications applied, sharing the unmodified subtrees with the base."""
+        if not self.is_modified:
+            return self._base
+
+        result = {}
+        for key in self:
+            if key in self._local:
+                result[key] = copy.deepcopy(to_plain_data(self._local[key]))
+            elif key in self._children:
+                result[key] = self._children[key].materialize()
+            elif key in self._lists and self._lists[key] != self._base[key]:
+                result[key] = copy.deepcopy(to_plain_data(self._lists[key]))
+            else:
+                result[key] = self._base[key]
+        return result
+
+    def rebase(self, base:Dict):
+        """Makes the view an unmodified view of a new base, keeping the nested views that callers may hold."""
+        self._base = base
+        self._local.clear()
+        self._deleted.clear()
+        self._lists.clear()
+        for key, child in list(self._children.items()):
+            if isinstance(base.get(key, _MISSING), dict):
+                child.rebase(base[key])
+            else:
+                del self._children[key]
+
+
+@dataclass
+class _RegistryEntry:
+    signature: Optional[tuple]
+    data: Dict
+    encoding: Optional[str] = None
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class YamlDataRegistry:
+    """
+    Process-wide cache of parsed YAML files, shared by every SessionYamlStorage of the process.
+
+    Each file is parsed once, and again only when its identity, size or modification time changes on disk. The
+    cached data must be treated as read-only: sessions access it through `CopyOnWriteDict` views.
+
+    Usage:
+        ```
+        registry = YamlDataRegistry()
+        data_store = DataStore(SessionYamlStorage(file_path='/path/to/survey.yaml', registry=registry))
+        ```
+    """
+
+    def __init__(self):
+        """Initialize a new, empty instance of the YamlDataRegistry class."""
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, file_path:str):
+        return os.path.abspath(file_path) in self._entries
+
+    def _entry(self, file_path:str) -> _RegistryEntry:
+        key = os.path.abspath(file_path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _RegistryEntry(signature=None, data={})
+            return entry
+
+    def get_data(self, file_path:str) -> Dict:
+        """
+        Get the shared data of a YAML file, parsing it only if it changed since it was cached.
+
+        Args:
+            file_path (str): The path to the YAML file.
+
+        Returns:
+            Dict: The parsed data, shared by all callers. It must not be modified. Empty if the file does not exist.
+        """
+        entry = self._entry(file_path)
+        # Sessions of different files parse concurrently, sessions of the same file wait for a single parse
+        with entry.lock:
+            try:
+                with open(file_path, 'rb') as f:
+                    signature = _file_signature(os.fstat(f.fileno()))
+                    if signature == entry.signature:
+                        return entry.data
+                    yaml_bytes = f.read()
+            except (FileNotFoundError, IOError):
+                entry.signature, entry.data = None, {}
+                return entry.data
+
+            yaml_str, entry.encoding = _decode_yaml_bytes(yaml_bytes, entry.encoding)
+            data = serialization.safe_load(yaml_str)
+            entry.signature, entry.data = signature, {} if data is None else data
+            return entry.data
+
+    def put_data(self, file_path:str, data:Dict) -> Dict:
+        """
+        Write data to a YAML file and make it the shared data of the file.
+
+        Args:
+            file_path (str): The path to the YAML file.
+            data (Dict): The data. It becomes shared and must not be modified afterwards.
+
+        Returns:
+            Dict: The shared data.
+        """
+        entry = self._entry(file_path)
+        with entry.lock:
+            file_stat = _write_file_atomically(file_path, serialization.safe_dump(data, encoding='utf-8'))
+            entry.signature, entry.data, entry.encoding = _file_signature(file_stat), data, 'utf-8'
+            return entry.data
+
+    def invalidate(self, file_path:Optional[str] = None):
+        """
+        Drop the cached data of a file, or of all files.
+
+        Args:
+            file_path (str, optional): The path to the YAML file. Defaults to None, which drops all files.
+        """
+        with self._lock:
+            if file_path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(os.path.abspath(file_path), None)
+
+
+# The registry used by SessionYamlStorage unless another one is given
+default_registry = YamlDataRegistry()
+
+
+@dataclass
+class SessionYamlStorage(StorageStrategy):
+    """A storage strategy for YAML files opened by many sessions of the same process, such as Streamlit sessions.
+
+    The file is parsed once per process into a `YamlDataRegistry`, and the `data` attribute of each session is a
+    `CopyOnWriteDict` view of the shared data: a session only holds copies of the subtrees it modified. Loading
+    is a `stat` of the file while it is unchanged on disk. A store writes the shared data with the session's
+    changes applied (reusing all the unmodified subtrees), makes it the new shared data, and rebases the session
+    view on it. Other sessions see the new data on their next `load_data`.
+
+    Values assigned to the view are copied when stored, so modify the data through the view afterwards rather
+    than through the assigned objects. As with `YamlStorage`, concurrent stores of different sessions are
+    last-writer-wins.
+
+    Use:
+
+    ```
+    data_store = DataStore(SessionYamlStorage(file_path='/path/to/survey.yaml'))
+    data = data_store.load_data()
+    update_and_store_data(data, ['APP', 'SURVEYS', 'SURVEY_1', 'STATUS'], 'COMPLETED', data_store)
+    ```
+
+    Args:
+        file_path (str): The path to the YAML file.
+        registry (YamlDataRegistry, optional): The registry holding the shared data. Defaults to the process-wide `default_registry`.
+    """
+
+    file_path: str = field(default_factory=str)
+    registry: Optional[YamlDataRegistry] = field(default=None, repr=False, compare=False)
+
+    def __post_init__(self):
+        """Loads the shared data of the file, which is empty if it does not exist."""
+        if self.registry is None:
+            self.registry = default_registry
+        self.load_data()
+
+    def load_data(self):
+        """Replaces the `data` attribute with a view of the current shared data, unless it already is one."""
+        base = self.registry.get_data(self.file_path)
+        if not (isinstance(self.data, CopyOnWriteDict) and self.data._base is base):
+            self.data = CopyOnWriteDict(base)
+
+    def store_data(self, data:Dict):
+        """Writes the data with the session's changes applied and shares it with the other sessions."""
+        if isinstance(data, CopyOnWriteDict):
+            if not data.is_modified and data._base is self.registry.get_data(self.file_path):
+                # Nothing to write: the file already holds this data
+                self.data = data
+                return
+            data.rebase(self.registry.put_data(self.file_path, data.materialize()))
+            self.data = data
+        else:
+            self.data = CopyOnWriteDict(self.registry.put_data(self.file_path, copy.deepcopy(to_plain_data(data))))
+
+    def update_data(self, update_func: Callable):
+        """Updates the data using the given update function and stores it.
+
+        Args:
+            update_func (Callable): A function that takes the current data as input and returns the updated data.
+        """
+        self.store_data(update_func(self.data))
+
+    def delete_data(self):
+        """Deletes the YAML file and drops its shared data."""
+        try:
+            os.remove(self.file_path)
+        except (FileNotFoundError, IOError):
+            pass
+        self.registry.invalidate(self.file_path)
+        self.data = CopyOnWriteDict({})
@@ -0,0 +1,261 @@
+import os
+import threading
+from urllib.parse import quote
+from collections.abc import Mapping, MutableMapping
+from dataclasses import dataclass, field
+from typing import Dict, Callable, Optional
+from ..utils import serialization
+from .datastorage import StorageStrategy, _write_file_atomically, _content_digest, _get_nested_value, _decode_yaml_bytes
+from .sqlitestorage import to_plain_data
+
+
+class LazyShard(MutableMapping):
+    """A nested dictionary of a ShardedYamlStorage whose content is read from its shard file on first access."""
+
+    def __init__(self, storage:'ShardedYamlStorage', path:tuple, filename:str):
+        self._storage = storage
+        self.path = path
+        self.filename = filename
+        self._data = None
+
+    @property
+    def is_loaded(self) -> bool:
+        """True if the shard file has been read."""
+        return self._data is not None
+
+    @property
+    def data(self) -> Dict:
+        """The content of the shard, read from its file on first access."""
+        if self._data is None:
+            self._data = self._storage._read_shard(self.path, self.filename)
+        return self._data
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def __setitem__(self, key, value):
+        self.data[key] = value
+
+    def __delitem__(self, key):
+        del self.data[key]
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __repr__(self):
+        return f'LazyShard({list(self.path)!r}, loaded={self.is_loaded})'
+
+
+# The directory of the shard files, apart from the root file so that no key can collide with it
+SHARDS_DIRNAME = 'shards'
+
+
+def _shard_filename(path:tuple) -> str:
+    """The relative file path of a shard: its keys, percent-encoded, as directories of the shards directory."""
+    names = [SHARDS_DIRNAME]
+    for key in path:
+        name = quote(str(key), safe='')
+        names.append(name.replace('.', '%2E') if name in ('.', '..') else name)
+    return '/'.join(names) + '.yaml'
+
+
+@dataclass
+class ShardedYamlStorage(StorageStrategy):
+    """A storage strategy that splits the nested data into one YAML file per subtree at a given key depth.
+
+    With `shard_depth=3`, each value at `APP > SURVEYS > <survey>` is stored in its own file, e.g.
+    `<dirpath>/shards/APP/SURVEYS/SURVEY_1.yaml`, and with `shard_depth=5` each station under
+    `APP > SURVEYS > <survey> > STATIONS > <station>` is. Only dictionaries at exactly that depth become shards;
+    everything above them is kept in `<dirpath>/root.yaml`, where each shard is replaced by its file path.
+
+    After `load_data`, every shard in the `data` attribute is a lazy mapping that reads its file on first access, so
+    memory scales with the shards actually used. A store only writes the shards whose content changed since they
+    were read or written, and shards that were never accessed are not written at all. `store_paths` (used by
+    `update_and_store_data` and `DataStore.store_paths`) only considers the shards under the changed paths.
+
+    Each file is replaced atomically. The shards are written before the root file that references them, and shard
+    files removed from the data are deleted after it.
+
+    Use:
+
+    ```
+    data_store = DataStore(ShardedYamlStorage(dirpath='/path/to/survey_datastore', shard_depth=5))
+    data = data_store.load_data()
+    stations = data['APP']['SURVEYS']['SURVEY_1']['STATIONS']  # No station file is read yet
+    update_and_store_data(data, ['APP', 'SURVEYS', 'SURVEY_1', 'STATIONS', 'STATION_1', 'STATUS'], 'COMPLETED', data_store)
+    ```
+
+    Args:
+        dirpath (str): The path to the directory holding the root and shard files.
+        shard_depth (int, optional): The number of keys from the root to each shard. Defaults to 3.
+    """
+
+    dirpath: str = field(default_factory=str)
+    shard_depth: int = 3
+    _shard_filenames: Dict = field(default_factory=dict, init=False, repr=False, compare=False)
+    _shard_digests: Dict = field(default_factory=dict, init=False, repr=False, compare=False)
+    _root_digest: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
+    _lock: threading.RLock = field(default_factory=threading.RLock, init=False, repr=False, compare=False)
+
+    ROOT_FILENAME = 'root.yaml'
+
+    def __post_init__(self):
+        """Loads the root file if it exists, otherwise initializes the `data` property to an empty dictionary."""
+        if self.shard_depth < 1:
+            raise ValueError(f"shard_depth must be at least 1, not {self.shard_depth}")
+
+        if os.path.isfile(self.root_path):
+            self.load_data()
+        else:
+            self.data = {}
+
+    @property
+    def root_path(self) -> str:
+        """The path to the root file."""
+        return os.path.join(self.dirpath, self.ROOT_FILENAME)
+
+    def _read_shard(self, path:tuple, filename:str) -> Dict:
+        try:
+            with open(os.path.join(self.dirpath, filename), 'rb') as f:
+                content = f.read()
+        except FileNotFoundError:
+            return {}
+
+        data = serialization.safe_load(_decode_yaml_bytes(content)[0])
+        with self._lock:
+            if self._shard_filenames.get(path) == filename:
+                self._shard_digests[path] = _content_digest(content)
+        return {} if data is None else data
+
+    def _split(self, data) -> tuple:
+        """Splits the data into the root document, with each shard replaced by its file path, and the shards by path."""
+        shards = {}
+        used_filenames = set()
+
+        def split(value, path):
+            if not isinstance(value, Mapping):
+                return value
+            if len(path) == self.shard_depth:
+                filename = _shard_filename(path)
+                if filename in used_filenames:
+                    # Distinct keys with the same text, such as 1 and '1'
+                    filename = f'{filename[:-len(".yaml")]}~{_content_digest(repr(path).encode("utf-8")).hex()[:8]}.yaml'
+                used_filenames.add(filename)
+                shards[path] = (filename, value)
+                return filename
+            return {key: split(item, path + (key,)) for key, item in value.items()}
+
+        return split(data, ()), shards
+
+    def load_data(self):
+        """Loads the root file into the `data` attribute, with a lazy mapping in place of each shard. No shard file is read."""
+        with self._lock:
+            try:
+                with open(self.root_path, 'rb') as f:
+                    content = f.read()
+            except FileNotFoundError:
+                self.data = {}
+                self._shard_filenames, self._shard_digests, self._root_digest = {}, {}, None
+                return
+
+            root = serialization.safe_load(_decode_yaml_bytes(content)[0]) or {}
+            data = root.get('DATA') or {}
+            self._shard_filenames, self._shard_digests = {}, {}
+            for path in root.get('SHARDS') or []:
+                path = tuple(path)
+                parent = _get_nested_value(data, list(path[:-1]))
+                filename = parent[path[-1]]
+                parent[path[-1]] = LazyShard(self, path, filename)
+                self._shard_filenames[path] = filename
+
+            self.data = data
+            self._root_digest = _content_digest(content)
+
+    def _store(self, data:Dict, changed_paths:Optional[list] = None):
+        """Writes the changed shards, the root file if it changed, and deletes the shard files no longer in the data.
+
+        With `changed_paths`, only the shards above or below one of the paths, and new shards, are considered.
+        """
+        with self._lock:
+            self.data = data
+            root_data, shards = self._split(data)
+
+            for path, (filename, value) in shards.items():
+                known = self._shard_filenames.get(path) == filename
+                if known and changed_paths is not None and not any(path[:len(p)] == p[:len(path)] for p in changed_paths):
+                    continue
+                if known and isinstance(value, LazyShard) and not value.is_loaded and value.path == path:
+                    continue
+
+                content = serialization.safe_dump(to_plain_data(value), encoding='utf-8')
+                digest = _content_digest(content)
+                if not known or self._shard_digests.get(path) != digest:
+                    file_path = os.path.join(self.dirpath, filename)
+                    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+                    _write_file_atomically(file_path, content)
+                    self._shard_digests[path] = digest
+
+            content = serialization.safe_dump({'SHARDS': [list(path) for path in shards], 'DATA': root_data}, encoding='utf-8')
+            digest = _content_digest(content)
+            if digest != self._root_digest:
+                os.makedirs(self.dirpath, exist_ok=True)
+                _write_file_atomically(self.root_path, content)
+                self._root_digest = digest
+
+            filenames = {path: filename for path, (filename, _) in shards.items()}
+            used_filenames = set(filenames.values())
+            for path, filename in self._shard_filenames.items():
+                if filenames.get(path) != filename and filename not in used_filenames:
+                    self._remove_shard_file(filename)
+                    self._shard_digests.pop(path, None)
+            self._shard_filenames = filenames
+
+    def _remove_shard_file(self, filename:str):
+        """Removes a shard file and the directories it leaves empty."""
+        try:
+            os.remove(os.path.join(self.dirpath, filename))
+        except (FileNotFoundError, IOError):
+            return
+        dirname = os.path.dirname(filename)
+        while dirname:
+            try:
+                os.rmdir(os.path.join(self.dirpath, dirname))
+            except OSError:
+                break
+            dirname = os.path.dirname(dirname)
+
+    def store_data(self, data:Dict):
+        """Stores the data, writing only the shards whose content changed."""
+        self._store(data)
+
+    def store_paths(self, data:Dict, paths:list):
+        """Stores the data, of which only the values at the given nested paths changed.
+
+        Args:
+            data (Dict): The data, already holding the new values.
+            paths (list): A list of key lists, each the path to a changed value.
+        """
+        self._store(data, changed_paths=[tuple(path) for path in paths])
+
+    def update_data(self, update_func: Callable):
+        """Updates the data using the given update function and stores it.
+
+        Args:
+            update_func (Callable): A function that takes the current data as input and returns the updated data.
+        """
+        self.store_data(update_func(self.data))
+
+    def delete_data(self):
+        """Deletes the root file and the shard files."""
+        with self._lock:
+            for filename in self._shard_filenames.values():
+                self._remove_shard_file(filename)
+            try:
+                os.remove(self.root_path)
+            except (FileNotFoundError, IOError):
+                pass
+            self.data = {}
+            self._shard_filenames, self._shard_digests, self._root_digest = {}, {}, None
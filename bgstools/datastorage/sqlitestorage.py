@@ -0,0 +1,342 @@
+import os
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from collections.abc import Mapping, MutableMapping
+from dataclasses import dataclass, field
+from typing import Dict, Callable, Optional
+from ..utils import serialization
+from .datastorage import StorageStrategy
+
+# Separator between the encoded keys of a path. JSON escapes control characters, so it never
+# appears inside an encoded key, and it sorts before every character that can start one
+_PATH_SEPARATOR = '\x1f'
+_PATH_SEPARATOR_END = '\x20'
+
+# Tag of the keys JSON cannot hold, such as the dates `yaml.safe_load` reads from unquoted ISO dates
+_YAML_KEY_TAG = '!'
+
+_MISSING = object()
+
+
+def _encode_key(key) -> str:
+    """Encodes a key as JSON, or as its YAML text in a tagged JSON string if JSON cannot hold it."""
+    if key is None or isinstance(key, (str, bool, int, float)):
+        return json.dumps(key)
+    return _YAML_KEY_TAG + json.dumps(serialization.safe_dump(key))
+
+
+def _decode_key(encoded_key:str):
+    if encoded_key.startswith(_YAML_KEY_TAG):
+        return serialization.safe_load(json.loads(encoded_key[len(_YAML_KEY_TAG):]))
+    return json.loads(encoded_key)
+
+
+def _encode_path(keys_list:list) -> str:
+    """Encodes a list of keys as a string that sorts every path right after its prefixes."""
+    return _PATH_SEPARATOR.join(_encode_key(key) for key in keys_list)
+
+
+def _is_json_faithful(value) -> bool:
+    """True if the value survives a JSON round trip with its types unchanged."""
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return True
+    if isinstance(value, list):
+        return all(_is_json_faithful(item) for item in value)
+    if isinstance(value, dict):
+        return all(isinstance(key, str) and _is_json_faithful(item) for key, item in value.items())
+    return False
+
+
+def _encode_value(value) -> tuple:
+    if _is_json_faithful(value):
+        return 'json', json.dumps(value)
+    return 'yaml', serialization.safe_dump(value)
+
+
+def _decode_value(kind:str, value:str):
+    return json.loads(value) if kind == 'json' else serialization.safe_load(value)
+
+
+def _flatten(keys_list:list, value):
+    """Yields (path, leaf value) pairs. Non-empty mappings are descended into, anything else is a leaf."""
+    if isinstance(value, Mapping) and len(value) > 0:
+        for key, item in value.items():
+            yield from _flatten(keys_list + [key], item)
+    else:
+        yield keys_list, value
+
+
+def to_plain_data(value):
+    """Converts lazily loaded mappings, such as the `data` of a SqliteStorage, into plain nested dictionaries.
+
+    Args:
+        value: Any value, possibly a lazy mapping or containing some.
+
+    Returns:
+        The value with every mapping replaced by a plain dictionary.
+    """
+    if isinstance(value, Mapping):
+        return {key: to_plain_data(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [to_plain_data(item) for item in value]
+    return value
+
+
+class LazyNode(MutableMapping):
+    """A nested dictionary of a SqliteStorage whose children are read from the database on first access.
+
+    Mutations are kept in memory until they are stored with `store_paths` or `store_data`.
+    """
+
+    def __init__(self, storage:'SqliteStorage', keys_list:list):
+        self._storage = storage
+        self._keys_list = keys_list
+        self._children = {}
+        self._deleted = set()
+        self._keys = None
+
+    def __getitem__(self, key):
+        if key in self._children:
+            return self._children[key]
+        if key in self._deleted:
+            raise KeyError(key)
+
+        value = self._storage._read_node(self._keys_list + [key])
+        if value is _MISSING:
+            raise KeyError(key)
+        self._children[key] = value
+        return value
+
+    def __setitem__(self, key, value):
+        self._children[key] = value
+        self._deleted.discard(key)
+        if self._keys is not None and key not in self._keys:
+            self._keys.append(key)
+
+    def __delitem__(self, key):
+        self[key]
+        del self._children[key]
+        self._deleted.add(key)
+        if self._keys is not None:
+            self._keys.remove(key)
+
+    def __iter__(self):
+        if self._keys is None:
+            keys = [key for key in self._storage._read_child_keys(self._keys_list) if key not in self._deleted]
+            self._keys = keys + [key for key in self._children if key not in keys]
+        return iter(list(self._keys))
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f'LazyNode({self._keys_list!r})'
+
+
+@dataclass
+class SqliteStorage(StorageStrategy):
+    """A storage strategy that stores the nested data in a SQLite database, one row per leaf value addressed by its key path.
+
+    After `load_data`, the `data` attribute is a lazy mapping: nested dictionaries are read from the database when
+    they are first accessed, so memory stays proportional to the part of the tree the application touches. Changes
+    stored with `store_paths` (used by `update_and_store_data`) or `set_value` only rewrite the rows under the
+    changed paths. Use `transaction()` to apply several changes atomically.
+
+    Use:
+
+    ```
+    data_store = DataStore(SqliteStorage(file_path='/path/to/survey.sqlite'))
+    data = data_store.load_data()
+    update_and_store_data(data, ['APP', 'SURVEYS', 'SURVEY_1', 'STATUS'], 'COMPLETED', data_store)
+
+    data_store.storage_strategy.get_value(['APP', 'SURVEYS', 'SURVEY_1', 'STATUS'])  # 'COMPLETED'
+    ```
+
+    Args:
+        file_path (str): The path to the SQLite database file.
+    """
+
+    file_path: str = field(default_factory=str)
+    _connection: Optional[sqlite3.Connection] = field(default=None, init=False, repr=False, compare=False)
+    _lock: threading.RLock = field(default_factory=threading.RLock, init=False, repr=False, compare=False)
+    _transaction_depth: int = field(default=0, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        """Loads the database lazily if it exists, otherwise initializes the `data` property to an empty dictionary."""
+        if os.path.isfile(self.file_path):
+            self.load_data()
+        else:
+            self.data = {}
+
+    def _db(self) -> sqlite3.Connection:
+        """Returns the database connection, opening (or creating) the database on first use."""
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.file_path, isolation_level=None, check_same_thread=False)
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute('CREATE TABLE IF NOT EXISTS nodes (path TEXT PRIMARY KEY, kind TEXT NOT NULL, value TEXT NOT NULL) WITHOUT ROWID')
+        return self._connection
+
+    @contextmanager
+    def transaction(self):
+        """A context manager that commits all the changes stored inside it at once, or none of them on error.
+
+        Use:
+
+        ```
+        with storage.transaction():
+            storage.set_value(['APP', 'SELECTED_SURVEY'], 'SURVEY_1')
+            storage.set_value(['APP', 'SELECTED_STATION'], 'STATION_1')
+        ```
+        """
+        with self._lock:
+            if self._transaction_depth == 0:
+                self._db().execute('BEGIN IMMEDIATE')
+            self._transaction_depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._transaction_depth -= 1
+                if self._transaction_depth == 0:
+                    self._db().execute('ROLLBACK')
+                raise
+            else:
+                self._transaction_depth -= 1
+                if self._transaction_depth == 0:
+                    self._db().execute('COMMIT')
+
+    def _read_node(self, keys_list:list):
+        """Reads the value at a path: a leaf value, a LazyNode for a nested dictionary, or _MISSING."""
+        encoded_path = _encode_path(keys_list)
+        with self._lock:
+            row = self._db().execute('SELECT kind, value FROM nodes WHERE path = ?', (encoded_path,)).fetchone()
+            if row is not None:
+                return _decode_value(*row)
+            prefix = encoded_path + _PATH_SEPARATOR if keys_list else ''
+            upper = encoded_path + _PATH_SEPARATOR_END if keys_list else '\U0010ffff'
+            row = self._db().execute('SELECT 1 FROM nodes WHERE path >= ? AND path < ? LIMIT 1', (prefix, upper)).fetchone()
+        return LazyNode(self, keys_list) if row is not None else _MISSING
+
+    def _read_child_keys(self, keys_list:list) -> list:
+        """Reads the keys of the nested dictionary at a path, in storage order.
+
+        Only one row is read per key: after each key, the lookup skips past the rows of its subtree, so the cost
+        depends on the number of keys and not on the size of the subtrees below them.
+        """
+        prefix = _encode_path(keys_list) + _PATH_SEPARATOR if keys_list else ''
+        upper = _encode_path(keys_list) + _PATH_SEPARATOR_END if keys_list else '\U0010ffff'
+        keys, lower = [], prefix
+        with self._lock:
+            while True:
+                row = self._db().execute('SELECT path FROM nodes WHERE path >= ? AND path < ? ORDER BY path LIMIT 1', (lower, upper)).fetchone()
+                if row is None:
+                    return keys
+                encoded_key = row[0][len(prefix):].split(_PATH_SEPARATOR, 1)[0]
+                keys.append(_decode_key(encoded_key))
+                lower = prefix + encoded_key + _PATH_SEPARATOR_END
+
+    def _write_subtree(self, keys_list:list, value):
+        """Replaces the rows of the subtree at a path, and any leaf row of its ancestors, with the flattened value."""
+        encoded_path = _encode_path(keys_list)
+        ancestors = [_encode_path(keys_list[:i]) for i in range(1, len(keys_list))]
+        rows = [(_encode_path(path), *_encode_value(to_plain_data(leaf))) for path, leaf in _flatten(list(keys_list), value) if path]
+
+        with self.transaction():
+            if keys_list:
+                self._db().execute('DELETE FROM nodes WHERE path = ? OR (path >= ? AND path < ?)',
+                                         (encoded_path, encoded_path + _PATH_SEPARATOR, encoded_path + _PATH_SEPARATOR_END))
+            else:
+                self._db().execute('DELETE FROM nodes')
+            self._db().executemany('DELETE FROM nodes WHERE path = ?', [(ancestor,) for ancestor in ancestors])
+            self._db().executemany('INSERT INTO nodes (path, kind, value) VALUES (?, ?, ?)', rows)
+
+    def _write_root(self, data, keys_list:list) -> list:
+        """Finds the shortest prefix of a path whose value is not a nested dictionary, which must be rewritten whole."""
+        for i, key in enumerate(keys_list):
+            if not isinstance(data, Mapping):
+                return keys_list[:i]
+            data = data[key]
+        return list(keys_list)
+
+    def get_value(self, keys_list:list, default=None):
+        """Reads the value at a nested path directly from the database.
+
+        Args:
+            keys_list (list): A list of keys, ordered by their level in the dictionary.
+            default (any, optional): The value to return if the path does not exist. Defaults to None.
+
+        Returns:
+            The value at the path, with nested dictionaries as plain dictionaries, or the default value.
+        """
+        value = self._read_node(list(keys_list))
+        return default if value is _MISSING else to_plain_data(value)
+
+    def set_value(self, keys_list:list, value):
+        """Sets the value at a nested path, creating the missing intermediate dictionaries, and stores it.
+
+        Args:
+            keys_list (list): A list of keys, ordered by their level in the dictionary.
+            value (any): The new value.
+        """
+        nested_dict = self.data
+        for key in keys_list[:-1]:
+            if not isinstance(nested_dict.get(key), Mapping):
+                nested_dict[key] = {}
+            nested_dict = nested_dict[key]
+        nested_dict[keys_list[-1]] = value
+        self.store_paths(data=self.data, paths=[list(keys_list)])
+
+    def store_data(self, data: Dict):
+        """Replaces all the rows with the given data."""
+        data = to_plain_data(data)
+        self._write_subtree([], data)
+        self.data = data
+
+    def store_paths(self, data: Dict, paths: list):
+        """Rewrites only the rows under the given nested paths, in a single transaction.
+
+        Args:
+            data (Dict): The data, already holding the new values.
+            paths (list): A list of key lists, each the path to a changed value.
+        """
+        self.data = data
+        with self.transaction():
+            for path in paths:
+                root = self._write_root(data, list(path))
+                value = data
+                for key in root:
+                    value = value[key]
+                self._write_subtree(root, value)
+
+    def load_data(self):
+        """Replaces the `data` attribute with a lazy view of the database. No rows are read until they are accessed."""
+        self.data = LazyNode(self, []) if os.path.isfile(self.file_path) else {}
+
+    def update_data(self, update_func: Callable):
+        """Updates the data using the given update function and stores it.
+
+        Args:
+            update_func (Callable): A function that takes the current data as input and returns the updated data.
+        """
+        self.store_data(update_func(self.data))
+
+    def delete_data(self):
+        """Deletes the database file."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+            for path in (self.file_path, f'{self.file_path}-wal', f'{self.file_path}-shm'):
+                try:
+                    os.remove(path)
+                except (FileNotFoundError, IOError):
+                    pass
+            self.data = {}
+
+    def close(self):
+        """Closes the database connection."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
@@ -1 +1,2 @@
-from .lambdas import upsert_data
\ No newline at end of file
+from .lambdas import upsert_data
+from .persistent import PersistentMap, bulk_upsert
@@ -0,0 +1,385 @@
+from collections.abc import Mapping
+from typing import Iterable, Optional
+
+# Hash array mapped trie: each level consumes 5 bits of the 64 bits hash of the key, so a node has up to 32 slots
+_BITS = 5
+_MASK = (1 << _BITS) - 1
+_HASH_MASK = (1 << 64) - 1
+_MAX_SHIFT = 64
+
+_MISSING = object()
+
+
+def _hash(key) -> int:
+    return hash(key) & _HASH_MASK
+
+
+def _index(bitmap:int, bit:int) -> int:
+    return (bitmap & (bit - 1)).bit_count()
+
+
+class _BitmapNode:
+    """A trie node holding its occupied slots only, as `(key, value, hash)` leaves or child nodes."""
+
+    __slots__ = ('bitmap', 'entries', 'edit')
+
+    def __init__(self, bitmap:int, entries:list, edit):
+        self.bitmap = bitmap
+        self.entries = entries
+        self.edit = edit
+
+    def _editable(self, edit) -> '_BitmapNode':
+        # Nodes created by the current batch of updates are modified in place, others are copied
+        if edit is not None and self.edit is edit:
+            return self
+        return _BitmapNode(self.bitmap, list(self.entries), edit)
+
+    def find(self, key_hash:int, shift:int, key, default):
+        bit = 1 << ((key_hash >> shift) & _MASK)
+        if not self.bitmap & bit:
+            return default
+        entry = self.entries[_index(self.bitmap, bit)]
+        if isinstance(entry, tuple):
+            return entry[1] if entry[0] is key or entry[0] == key else default
+        return entry.find(key_hash, shift + _BITS, key, default)
+
+    def assoc(self, key_hash:int, shift:int, key, value, edit, added:list):
+        bit = 1 << ((key_hash >> shift) & _MASK)
+        index = _index(self.bitmap, bit)
+        if not self.bitmap & bit:
+            added[0] = True
+            node = self._editable(edit)
+            node.entries.insert(index, (key, value, key_hash))
+            node.bitmap |= bit
+            return node
+
+        entry = self.entries[index]
+        if isinstance(entry, tuple):
+            if entry[0] is key or entry[0] == key:
+                if entry[1] is value:
+                    return self
+                child = (key, value, key_hash)
+            else:
+                added[0] = True
+                child = _merge_leaves(entry, (key, value, key_hash), shift + _BITS, edit)
+        else:
+            child = entry.assoc(key_hash, shift + _BITS, key, value, edit, added)
+            if child is entry:
+                return self
+
+        node = self._editable(edit)
+        node.entries[index] = child
+        return node
+
+    def without(self, key_hash:int, shift:int, key, edit):
+        bit = 1 << ((key_hash >> shift) & _MASK)
+        if not self.bitmap & bit:
+            return self
+        index = _index(self.bitmap, bit)
+        entry = self.entries[index]
+        if isinstance(entry, tuple):
+            if not (entry[0] is key or entry[0] == key):
+                return self
+            child = None
+        else:
+            child = entry.without(key_hash, shift + _BITS, key, edit)
+            if child is entry:
+                return self
+
+        if child is None:
+            if len(self.entries) == 1:
+                return None
+            node = self._editable(edit)
+            del node.entries[index]
+            node.bitmap &= ~bit
+            return node
+        node = self._editable(edit)
+        node.entries[index] = child
+        return node
+
+    def leaves(self):
+        for entry in self.entries:
+            if isinstance(entry, tuple):
+                yield entry
+            else:
+                yield from entry.leaves()
+
+
+class _CollisionNode:
+    """A node holding the leaves of distinct keys with the same 64 bits hash."""
+
+    __slots__ = ('key_hash', 'entries', 'edit')
+
+    def __init__(self, key_hash:int, entries:list, edit):
+        self.key_hash = key_hash
+        self.entries = entries
+        self.edit = edit
+
+    def _position(self, key) -> int:
+        for position, entry in enumerate(self.entries):
+            if entry[0] is key or entry[0] == key:
+                return position
+        return -1
+
+    def find(self, key_hash:int, shift:int, key, default):
+        position = self._position(key) if key_hash == self.key_hash else -1
+        return default if position < 0 else self.entries[position][1]
+
+    def assoc(self, key_hash:int, shift:int, key, value, edit, added:list):
+        if key_hash != self.key_hash:
+            # A key whose hash only shares the prefix consumed so far: split above this node
+            node = _BitmapNode(1 << ((self.key_hash >> shift) & _MASK), [self], edit)
+            return node.assoc(key_hash, shift, key, value, edit, added)
+
+        position = self._position(key)
+        if position >= 0 and self.entries[position][1] is value:
+            return self
+        node = self if edit is not None and self.edit is edit else _CollisionNode(self.key_hash, list(self.entries), edit)
+        if position >= 0:
+            node.entries[position] = (key, value, key_hash)
+        else:
+            added[0] = True
+            node.entries.append((key, value, key_hash))
+        return node
+
+    def without(self, key_hash:int, shift:int, key, edit):
+        position = self._position(key) if key_hash == self.key_hash else -1
+        if position < 0:
+            return self
+        if len(self.entries) == 1:
+            return None
+        return _CollisionNode(self.key_hash, self.entries[:position] + self.entries[position + 1:], edit)
+
+    def leaves(self):
+        yield from self.entries
+
+
+def _merge_leaves(first:tuple, second:tuple, shift:int, edit):
+    """Builds the subtree holding two leaves with distinct keys, starting at the given shift."""
+    if first[2] == second[2] or shift >= _MAX_SHIFT:
+        return _CollisionNode(first[2], [first, second], edit)
+
+    first_bit = 1 << ((first[2] >> shift) & _MASK)
+    second_bit = 1 << ((second[2] >> shift) & _MASK)
+    if first_bit == second_bit:
+        return _BitmapNode(first_bit, [_merge_leaves(first, second, shift + _BITS, edit)], edit)
+    entries = [first, second] if first_bit < second_bit else [second, first]
+    return _BitmapNode(first_bit | second_bit, entries, edit)
+
+
+class PersistentMap(Mapping):
+    """
+    Immutable mapping with structural sharing (a hash array mapped trie).
+
+    `set`, `delete` and `update` return a new map and leave the original unchanged, copying only the nodes on the
+    path to each changed key, so keeping every intermediate snapshot costs O(log32 n) memory per change instead
+    of a full copy. `update` applies a whole batch of changes in one pass, modifying the nodes it created itself in
+    place. Keys are iterated in hash order, not insertion order.
+
+    Usage:
+        ```
+        frames = PersistentMap()
+        snapshot = frames.set('SEC_000005', {'STATUS': 'NOT_STARTED'})
+        snapshot = snapshot.update({'SEC_000010': {...}, 'SEC_000015': {...}})
+        frames  # still empty
+        ```
+    """
+
+    __slots__ = ('_root', '_size')
+
+    def __init__(self, items=None, **kwargs):
+        """
+        Initialize a new instance of the PersistentMap class.
+
+        Args:
+            items (Mapping | Iterable, optional): A mapping or an iterable of (key, value) pairs. Defaults to None.
+            **kwargs: Additional keys and values.
+        """
+        self._root = None
+        self._size = 0
+        if items or kwargs:
+            updated = self.update(items or (), **kwargs)
+            self._root, self._size = updated._root, updated._size
+
+    @classmethod
+    def _from_root(cls, root, size:int) -> 'PersistentMap':
+        persistent_map = cls.__new__(cls)
+        persistent_map._root, persistent_map._size = root, size
+        return persistent_map
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def get(self, key, default=None):
+        if self._root is None:
+            return default
+        return self._root.find(_hash(key), 0, key, default)
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        return (key for key, _, _ in self._leaves())
+
+    def _leaves(self):
+        return self._root.leaves() if self._root is not None else iter(())
+
+    def items(self):
+        return [(key, value) for key, value, _ in self._leaves()]
+
+    def values(self):
+        return [value for _, value, _ in self._leaves()]
+
+    def __repr__(self):
+        return f'PersistentMap({dict(self.items())!r})'
+
+    def set(self, key, value) -> 'PersistentMap':
+        """Return a new map with the key set to the value."""
+        return self.update(((key, value),))
+
+    def delete(self, key) -> 'PersistentMap':
+        """Return a new map without the key. Raises KeyError if the key is missing."""
+        if key not in self:
+            raise KeyError(key)
+        return self._from_root(self._root.without(_hash(key), 0, key, None), self._size - 1)
+
+    def update(self, items=(), **kwargs) -> 'PersistentMap':
+        """
+        Return a new map with many keys set at once.
+
+        Args:
+            items (Mapping | Iterable, optional): A mapping or an iterable of (key, value) pairs.
+            **kwargs: Additional keys and values.
+
+        Returns:
+            PersistentMap: The new map, or this map if nothing changed.
+        """
+        pairs = items.items() if isinstance(items, Mapping) else items
+        # Nodes created with this token belong to this batch only and are modified in place
+        edit = object()
+        root, size = self._root, self._size
+        for key, value in list(pairs) + list(kwargs.items()):
+            added = [False]
+            key_hash = _hash(key)
+            if root is None:
+                root = _BitmapNode(1 << (key_hash & _MASK), [(key, value, key_hash)], edit)
+                added[0] = True
+            else:
+                root = root.assoc(key_hash, 0, key, value, edit, added)
+            size += added[0]
+        return self if root is self._root else self._from_root(root, size)
+
+    def set_in(self, keys_list:list, value) -> 'PersistentMap':
+        """Return a new map with a value set at a nested path. Missing or non-map intermediate values become maps."""
+        return bulk_upsert(self, paths=[(keys_list, value)])
+
+    def get_in(self, keys_list:list, default=None):
+        """Get the value at a nested path, or the default value if the path does not exist."""
+        value = self
+        for key in keys_list:
+            if not isinstance(value, Mapping) or key not in value:
+                return default
+            value = value[key]
+        return value
+
+    @classmethod
+    def from_dict(cls, data:Mapping) -> 'PersistentMap':
+        """Convert nested dictionaries to nested persistent maps."""
+        return cls((key, cls.from_dict(value) if isinstance(value, Mapping) else value) for key, value in data.items())
+
+    def to_dict(self) -> dict:
+        """Convert nested persistent maps to nested dictionaries."""
+        return {key: value.to_dict() if isinstance(value, PersistentMap) else value for key, value in self.items()}
+
+
+def _group_paths(paths:Iterable) -> dict:
+    """Groups (keys_list, value) pairs by their first key, keeping their order. Paths of a single key are leaves."""
+    groups = {}
+    for keys_list, value in paths:
+        keys_list = list(keys_list)
+        if not keys_list:
+            raise ValueError("Paths must contain at least one key")
+        groups.setdefault(keys_list[0], []).append((keys_list[1:], value))
+    return groups
+
+
+def bulk_upsert(data, items=None, paths:Optional[Iterable] = None, overwrite:bool = True, copy:bool = False):
+    """
+    Insert or update many keys of a dictionary or a PersistentMap in a single pass.
+
+    Top-level keys are given as `items` and nested keys as `paths`. Each container on the way to a changed key is
+    visited, and in copy mode copied, once per call however many keys change under it, instead of once per key as
+    when calling `upsert_data` in a loop. Missing or non-mapping intermediate values are replaced by empty containers.
+    When a key is given more than once, the last value wins.
+
+    Args:
+        data (dict | PersistentMap): The data to update.
+        items (Mapping | Iterable, optional): Top-level keys and values, as a mapping or (key, value) pairs.
+        paths (Iterable, optional): Nested updates, as (keys_list, value) pairs.
+        overwrite (bool, optional): If False, only insert missing keys and leave existing values untouched,
+            like `upsert_data`. Defaults to True.
+        copy (bool, optional): If True, leave a dictionary unmodified and return an updated copy that shares the
+            unmodified subtrees with it. PersistentMaps are never modified. Defaults to False.
+
+    Returns:
+        dict | PersistentMap: The updated dictionary (the same object unless `copy` is True) or the new PersistentMap.
+
+    Raises:
+        ValueError: If a path is empty.
+
+    Usage:
+        ```
+        frames = bulk_upsert(frames, paths=[([key, 'INTERPRETATION', 'STATUS'], 'NOT_STARTED') for key in frame_keys])
+        snapshot = bulk_upsert(PersistentMap.from_dict(frames), items=new_frames)
+        ```
+    """
+    pairs = []
+    if items is not None:
+        pairs.extend(([key], value) for key, value in (items.items() if isinstance(items, Mapping) else items))
+    if paths is not None:
+        pairs.extend(paths)
+    return _upsert(data, _group_paths(pairs), overwrite, copy)
+
+
+def _upsert(data, groups:dict, overwrite:bool, copy:bool):
+    is_persistent = isinstance(data, PersistentMap)
+    changes = []
+    for key, entries in groups.items():
+        current = data.get(key, _MISSING)
+        # The last leaf value of the key, and the nested updates that follow it
+        value = _MISSING
+        nested = []
+        for keys_list, entry_value in entries:
+            if keys_list:
+                nested.append((keys_list, entry_value))
+            else:
+                value, nested = entry_value, []
+
+        if value is not _MISSING and not overwrite and current is not _MISSING:
+            value = _MISSING
+        if value is not _MISSING:
+            current = value
+            if not nested:
+                changes.append((key, value))
+                continue
+
+        if nested:
+            if is_persistent:
+                child = current if isinstance(current, PersistentMap) else PersistentMap(current if isinstance(current, Mapping) else None)
+            else:
+                child = current if isinstance(current, dict) else dict(current) if isinstance(current, Mapping) else {}
+            changes.append((key, _upsert(child, _group_paths(nested), overwrite, copy)))
+
+    if is_persistent:
+        return data.update(changes)
+
+    result = dict(data) if copy else data
+    for key, value in changes:
+        result[key] = value
+    return result
@@ -8,6 +8,9 @@ from .io import load_yaml, get_available_services, \
     is_directory_empty, delete_directory_contents, check_nested_dict, get_yaml_files_with_keys, \
     find_files_with_key_or_value
 
+from .corpusindex import YamlCorpusIndex
+from .keypaths import stream_has_key_paths
+
 from .media import VideoLoader, export_processed_tiff, is_url, get_video_info, convert_image_frame, \
     load_big_tiff,  export_processed_tiff, extract_frames_every_n_seconds, select_random_frames, convert_codec, \
     extract_frames, load_video, calculate_frames
\ No newline at end of file
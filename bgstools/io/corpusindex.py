@@ -0,0 +1,318 @@
+import os
+import json
+import sqlite3
+from typing import Callable, Optional
+import yaml
+from ..utils import serialization
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    file_id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS nodes (
+    file_id INTEGER NOT NULL REFERENCES files(file_id) ON DELETE CASCADE,
+    key_path TEXT NOT NULL,
+    is_key_path INTEGER NOT NULL,
+    key TEXT,
+    value TEXT,
+    value_json TEXT
+);
+CREATE INDEX IF NOT EXISTS nodes_file ON nodes(file_id);
+CREATE INDEX IF NOT EXISTS nodes_key ON nodes(key);
+CREATE INDEX IF NOT EXISTS nodes_value ON nodes(value);
+CREATE INDEX IF NOT EXISTS nodes_key_path ON nodes(key_path);
+"""
+
+# Incremented when the content of the index changes, so that index files of older versions are rebuilt
+_SCHEMA_VERSION = 4
+
+
+def _canonical(value) -> str:
+    """A text form of a scalar that is equal for values that compare equal in Python, e.g. 1, 1.0 and True."""
+    if value is None:
+        return 'z:'
+    if isinstance(value, str):
+        return 's:' + value
+    if isinstance(value, (bool, int, float)):
+        return 'n:' + (repr(float(value)) if float(value) == value else str(value))
+    return f'o:{type(value).__name__}:{value!r}'
+
+
+def _prefix_upper_bound(text:str) -> str:
+    """The smallest string greater than every string starting with `text`, in code point order, or None if there is none."""
+    while text:
+        code_point = ord(text[-1]) + 1
+        if 0xD800 <= code_point <= 0xDFFF:
+            code_point = 0xE000
+        if code_point <= 0x10FFFF:
+            return text[:-1] + chr(code_point)
+        text = text[:-1]
+    return None
+
+
+# The scalars that JSON stores and reads back unchanged. Other scalars, such as dates, are read from their file.
+_JSON_SCALARS = (str, int, float, bool, type(None))
+
+
+def _encode_key_path(keys_list) -> str:
+    """A text form of a key path. Keys that JSON cannot hold, such as dates, are stored as YAML to keep their type."""
+    return json.dumps([key if isinstance(key, _JSON_SCALARS) else {'yaml': serialization.safe_dump(key)} for key in keys_list])
+
+
+def _decode_key_path(key_path:str) -> list:
+    return json.loads(key_path, object_hook=lambda key: serialization.safe_load(key['yaml']))
+
+
+def _flatten_nodes(data, keys_list:tuple = (), is_key_path:bool = True):
+    """Yields (keys_list, value, is_mapping_entry, is_key_path) for every node below the root, dictionary entries
+    and list items, in depth-first order. `is_key_path` is True if the path only goes through dictionary keys.
+
+    A scalar root is yielded with an empty key list.
+    """
+    if isinstance(data, dict):
+        for key, value in data.items():
+            yield keys_list + (key,), value, True, is_key_path
+            yield from _flatten_nodes(value, keys_list + (key,), is_key_path)
+    elif isinstance(data, list):
+        for index, value in enumerate(data):
+            yield keys_list + (index,), value, False, False
+            yield from _flatten_nodes(value, keys_list + (index,), False)
+    elif not keys_list:
+        yield keys_list, data, False, True
+
+
+def _get_value_at(data, keys_list:list):
+    for key in keys_list:
+        data = data[key]
+    return data
+
+
+class YamlCorpusIndex:
+    """
+    Persistent SQLite index of the YAML files of a directory tree.
+
+    The index stores the modification time and size of each `.yaml` file, and one row per node of its content:
+    the key path, the last key, and the value if it is a scalar. `refresh` only parses the files that are new or
+    changed since the last refresh, and lookups are answered from the index without opening the files.
+
+    Usage:
+        ```
+        with YamlCorpusIndex('/path/to/surveys_index.sqlite') as index:
+            index.refresh('/path/to/surveys_dir')
+            index.find_files_with_key_or_value('v1')
+            index.get_yaml_files_with_keys([['APP', 'SURVEYS', 'SURVEY_NAME']])
+        ```
+    """
+
+    def __init__(self, index_filepath:str):
+        """
+        Initialize a new instance of the YamlCorpusIndex class, creating the index file if it does not exist.
+
+        Args:
+            index_filepath (str): The path to the SQLite index file.
+        """
+        self.index_filepath = index_filepath
+        self._connection = sqlite3.connect(index_filepath, isolation_level=None)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA foreign_keys=ON')
+        if self._connection.execute('PRAGMA user_version').fetchone()[0] != _SCHEMA_VERSION:
+            self._connection.executescript(f"""
+                DROP TABLE IF EXISTS nodes;
+                DROP TABLE IF EXISTS files;
+                PRAGMA user_version = {_SCHEMA_VERSION};""")
+        self._connection.executescript(_SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Closes the index file."""
+        self._connection.close()
+
+    @staticmethod
+    def _scope(dirpath:Optional[str]) -> tuple:
+        """The SQL condition and parameters restricting file paths to a directory tree, or to all files."""
+        if dirpath is None:
+            return '1', ()
+        prefix = os.path.join(os.path.abspath(dirpath), '')
+        return 'substr(files.path, 1, ?) = ?', (len(prefix), prefix)
+
+    def refresh(self, dirpath:str, callback:Callable[[str], None] = None) -> dict:
+        """
+        Bring the index of a directory tree up to date, parsing only the new and changed `.yaml` files.
+
+        Args:
+            dirpath (str): The path of the directory to index.
+            callback (Callable[[str], None], optional): A function called with a message for each file that fails to parse.
+                Defaults to printing the message.
+
+        Returns:
+            dict: The number of `parsed`, `unchanged` and `removed` files.
+
+        Raises:
+            ValueError: If the directory does not exist.
+        """
+        if not os.path.exists(dirpath):
+            raise ValueError(f"The provided directory {dirpath} does not exist.")
+
+        condition, parameters = self._scope(dirpath)
+        indexed = {path: (file_id, mtime_ns, size) for file_id, path, mtime_ns, size in self._connection.execute(
+            f'SELECT file_id, path, mtime_ns, size FROM files WHERE {condition}', parameters)}
+
+        stats = {'parsed': 0, 'unchanged': 0, 'removed': 0}
+        for root, dirs, files in os.walk(dirpath):
+            for file in files:
+                if not file.endswith('.yaml'):
+                    continue
+                file_path = os.path.abspath(os.path.join(root, file))
+                try:
+                    file_stat = os.stat(file_path)
+                except FileNotFoundError:
+                    continue
+
+                entry = indexed.pop(file_path, None)
+                if entry is not None and entry[1:] == (file_stat.st_mtime_ns, file_stat.st_size):
+                    stats['unchanged'] += 1
+                    continue
+                self._index_file(file_path, file_stat, callback)
+                stats['parsed'] += 1
+
+        if indexed:
+            self._connection.executemany('DELETE FROM files WHERE file_id = ?', [(file_id,) for file_id, _, _ in indexed.values()])
+            stats['removed'] = len(indexed)
+        return stats
+
+    def _index_file(self, file_path:str, file_stat:os.stat_result, callback:Callable[[str], None] = None):
+        """Parses a file and replaces its rows in the index, in a single transaction."""
+        error = None
+        try:
+            with open(file_path, 'r') as stream:
+                data = serialization.safe_load(stream)
+        except (yaml.YAMLError, UnicodeDecodeError) as exc:
+            error, data = str(exc), None
+            (callback or print)(f"Error loading YAML file {file_path}: {exc}")
+
+        rows = []
+        if error is None:
+            for keys_list, value, is_mapping_entry, is_key_path in _flatten_nodes(data):
+                is_scalar = not isinstance(value, (dict, list))
+                rows.append((
+                    _encode_key_path(keys_list),
+                    is_key_path,
+                    # List indices are positions, not keys, and must not match a search
+                    _canonical(keys_list[-1]) if is_mapping_entry else None,
+                    _canonical(value) if is_scalar else None,
+                    json.dumps(value) if isinstance(value, _JSON_SCALARS) else None,
+                ))
+
+        connection = self._connection
+        connection.execute('BEGIN')
+        try:
+            connection.execute('DELETE FROM files WHERE path = ?', (file_path,))
+            file_id = connection.execute('INSERT INTO files (path, mtime_ns, size, error) VALUES (?, ?, ?, ?)',
+                                         (file_path, file_stat.st_mtime_ns, file_stat.st_size, error)).lastrowid
+            connection.executemany('INSERT INTO nodes (file_id, key_path, is_key_path, key, value, value_json) VALUES (?, ?, ?, ?, ?, ?)',
+                                   [(file_id, *row) for row in rows])
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+
+    def _match_condition(self, column:str, search_value, prefix:bool) -> tuple:
+        """The SQL condition and parameters matching a column of canonical values, exactly or by string prefix.
+
+        Both forms are answered from the column index: a prefix is a range of canonical values.
+        """
+        if not prefix:
+            return f'{column} = ?', (_canonical(search_value),)
+        if not isinstance(search_value, str):
+            raise TypeError(f"A prefix search needs a string, not {type(search_value).__name__}")
+        lower = _canonical(search_value)
+        upper = _prefix_upper_bound(lower)
+        return f'{column} >= ? AND {column} < ?', (lower, upper)
+
+    def find_files_with_key_or_value(self, search_value, dirpath:Optional[str] = None, prefix:bool = False) -> list:
+        """
+        Find the keys and scalar values equal to a search value, like `find_files_with_key_or_value`, using the index only.
+
+        The keys and scalar values are indexed, so the cost of a lookup depends on the number of matches and not on
+        the size of the corpus.
+
+        Args:
+            search_value: The key or value to search for.
+            dirpath (str, optional): Restrict the search to the files under this directory. Defaults to all indexed files.
+            prefix (bool, optional): Find the string keys and values that start with `search_value` instead. Defaults to False.
+
+        Returns:
+            list: A list of dictionaries with the keys `yaml_file` (the file name), `unknown_key` (the last key of the
+                path), `value` (the value at the path) and `nested_list` (the path), ordered by file path and by
+                position in the file. Values that are dictionaries, lists or scalars JSON cannot hold, such as dates, are
+                read from their file.
+
+        Raises:
+            TypeError: If `prefix` is True and `search_value` is not a string.
+        """
+        condition, parameters = self._scope(dirpath)
+        key_condition, key_parameters = self._match_condition('key', search_value, prefix)
+        value_condition, value_parameters = self._match_condition('value', search_value, prefix)
+        # A key match comes before a value match of the same node, as in find_value_in_dict
+        rows = self._connection.execute(f"""
+            SELECT files.path, nodes.key_path, nodes.value_json FROM (
+                SELECT rowid, 0 AS kind, * FROM nodes WHERE {key_condition}
+                UNION ALL
+                SELECT rowid, 1 AS kind, * FROM nodes WHERE {value_condition}
+            ) AS nodes JOIN files USING (file_id)
+            WHERE {condition}
+            ORDER BY files.path, nodes.rowid, nodes.kind""", (*key_parameters, *value_parameters, *parameters)).fetchall()
+
+        results, loaded_files = [], {}
+        for file_path, key_path, value_json in rows:
+            path = _decode_key_path(key_path)
+            if value_json is not None:
+                value = json.loads(value_json)
+            else:
+                if file_path not in loaded_files:
+                    with open(file_path, 'r') as stream:
+                        loaded_files[file_path] = serialization.safe_load(stream)
+                value = _get_value_at(loaded_files[file_path], path)
+            results.append({
+                'yaml_file': os.path.basename(file_path),
+                'unknown_key': path[-1] if path else None,
+                'value': value,
+                'nested_list': path,
+            })
+        return results
+
+    def get_yaml_files_with_keys(self, keys_list:list, dirpath:Optional[str] = None) -> dict:
+        """
+        Check which files contain any of the given nested key paths, like `get_yaml_files_with_keys`, using the index only.
+
+        As with `check_nested_dict`, a key path only goes through dictionary keys, never through list positions.
+
+        Args:
+            keys_list (list): The list of key paths to check for.
+            dirpath (str, optional): Restrict the check to the files under this directory. Defaults to all indexed files.
+
+        Returns:
+            dict: A dictionary with file names as keys and booleans as values. Files that failed to parse are left out.
+        """
+        condition, parameters = self._scope(dirpath)
+        files = self._connection.execute(
+            f'SELECT file_id, path FROM files WHERE error IS NULL AND {condition} ORDER BY path', parameters).fetchall()
+
+        # An empty key path exists in every file, as in check_nested_dict
+        if any(len(keys) == 0 for keys in keys_list):
+            found_ids = {file_id for file_id, _ in files}
+        else:
+            key_paths = [_encode_key_path(keys) for keys in keys_list]
+            found_ids = {file_id for file_id, in self._connection.execute(
+                f'SELECT DISTINCT file_id FROM nodes WHERE key_path IN ({", ".join("?" * len(key_paths))}) AND is_key_path',
+                key_paths)}
+        return {os.path.basename(file_path): file_id in found_ids for file_id, file_path in files}
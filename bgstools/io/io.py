@@ -3,14 +3,67 @@ import shutil
 from glob import glob
 import yaml
 from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 import requests
 import toml
 from pathlib import Path
 from typing import Callable, Optional
-from ..utils import find_value_in_dict
+from ..utils import find_value_in_dict, check_nested_dict, serialization
+from .corpusindex import YamlCorpusIndex, _get_value_at
+from .keypaths import stream_has_key_paths
 
 
-def find_files_with_key_or_value(surveys_dirpath:str, search_value:str):
+def _list_yaml_files(dirpath:str) -> list:
+    """The paths of the .yaml files of a directory tree, in `os.walk` order."""
+    return [os.path.join(root, file) for root, dirs, files in os.walk(dirpath) for file in files if file.endswith(".yaml")]
+
+
+def _find_in_yaml_file(file_path:str, search_value) -> tuple:
+    """Search one .yaml file for a key or value. Returns the result dictionaries and an error message or None."""
+    try:
+        with open(file_path, 'r') as stream:
+            data = serialization.safe_load(stream)
+    except yaml.YAMLError as exc:
+        return [], f"Error loading YAML file {file_path}: {exc}"
+
+    return [{
+        'yaml_file': os.path.basename(file_path),
+        'unknown_key': path[-1] if path else None,
+        'value': _get_value_at(data, path),
+        'nested_list': path
+    } for path in find_value_in_dict(data, search_value)], None
+
+
+def _check_yaml_file_keys(file_path:str, keys_list:list) -> tuple:
+    """Check one .yaml file for nested keys. Returns a boolean, or None if the file fails to load, and an error message or None."""
+    try:
+        with open(file_path, 'r') as stream:
+            return stream_has_key_paths(stream, keys_list), None
+    except yaml.YAMLError as exc:
+        return None, f"Error loading YAML file {file_path}: {exc}"
+
+
+def _map_yaml_files(func:Callable, file_paths:list, n_workers:Optional[int], chunk_size:int):
+    """Apply a function to each file, in a process pool unless `n_workers` is 1, yielding the results in file order."""
+    if chunk_size < 1:
+        raise ValueError(f"`chunk_size` must be a positive integer, not {chunk_size}")
+
+    n_workers = os.cpu_count() if n_workers is None else n_workers
+    if n_workers == 1 or len(file_paths) <= 1:
+        yield from map(func, file_paths)
+        return
+
+    with ProcessPoolExecutor(max_workers=min(n_workers, len(file_paths))) as executor:
+        yield from executor.map(func, file_paths, chunksize=chunk_size)
+
+
+def find_files_with_key_or_value(
+        surveys_dirpath:str,
+        search_value:str,
+        index_filepath:Optional[str] = None,
+        n_workers:Optional[int] = 1,
+        chunk_size:int = 16):
     """
     This function navigates through a directory and its subdirectories to find .yaml files.
     It then loads each file into a dictionary and searches the dictionary for a given key or value.
@@ -18,6 +71,11 @@ def find_files_with_key_or_value(surveys_dirpath:str, search_value:str):
     Parameters:
     surveys_dirpath (str): The path of the directory to search.
     search_value: The key or value to search for in the .yaml files.
+    index_filepath (str, optional): The path to a `YamlCorpusIndex` file. If given, only the files changed since the
+        last call are parsed, and the search runs against the index. The results are then ordered by file path.
+    n_workers (int, optional): Number of worker processes parsing the files. 1 parses them in the current process,
+        None uses all available cores. Workers only send back the results. Defaults to 1.
+    chunk_size (int, optional): Number of files sent to a worker at once. Defaults to 16.
     
     Returns:
     list: A list of dictionaries, each containing a filename, an unknown key, its value, and a list of keys.
@@ -60,68 +118,42 @@ def find_files_with_key_or_value(surveys_dirpath:str, search_value:str):
     if not os.path.exists(surveys_dirpath):
         raise ValueError(f"The provided directory {surveys_dirpath} does not exist.")
 
+    if index_filepath is not None:
+        with YamlCorpusIndex(index_filepath) as index:
+            index.refresh(surveys_dirpath)
+            return index.find_files_with_key_or_value(search_value, dirpath=surveys_dirpath)
+
     result_list = []
 
-    # Walk through the directory
-    for root, dirs, files in os.walk(surveys_dirpath):
-        for file in files:
-            # Check if the file is a .yaml file
-            if file.endswith(".yaml"):
-                # Construct the full file path
-                file_path = os.path.join(root, file)
-                
-                # Open and load the yaml file
-                try:
-                    with open(file_path, 'r') as stream:
-                        data = yaml.safe_load(stream)
-                except yaml.YAMLError as exc:
-                    print(f"Error loading YAML file {file_path}: {exc}")
-                    continue
-                
-                # Search for the key or value in the data
-                paths = find_value_in_dict(data, search_value)
-                for path in paths:
-                    result_list.append({
-                        'yaml_file': file,
-                        'unknown_key': path[-1],
-                        'value': data[path[-1]],
-                        'nested_list': path
-                    })
+    # Results come back in the order of the directory walk, whatever the number of workers
+    file_paths = _list_yaml_files(surveys_dirpath)
+    for results, error in _map_yaml_files(partial(_find_in_yaml_file, search_value=search_value), file_paths, n_workers, chunk_size):
+        if error is not None:
+            print(error)
+        result_list.extend(results)
 
     return result_list
 
 
-def check_nested_dict(nested_dict:dict, keys_list:list):
-    """
-    Helper function to recursively search for keys in a nested dictionary.
-    
-    Parameters:
-    nested_dict (dict): The dictionary to search.
-    keys_list (list): The list of keys to check for.
-    
-    Returns:
-    bool: True if all keys are found, False otherwise.
-    """
-    for keys in keys_list:
-        temp_dict = nested_dict
-        for key in keys:
-            if key in temp_dict:
-                temp_dict = temp_dict[key]
-            else:
-                break
-        else:
-            return True
-    return False
-
-
-def get_yaml_files_with_keys(dirpath:dict, keys_list:list):
+def get_yaml_files_with_keys(
+        dirpath:dict,
+        keys_list:list,
+        index_filepath:Optional[str] = None,
+        n_workers:Optional[int] = 1,
+        chunk_size:int = 16):
     """
     This function navigates through a directory and its subdirectories to find .yaml files.
     It then checks if these files contain all the specified keys from a provided list.
+    Each file is only read until the answer is known, see `stream_has_key_paths`.
     
     Parameters:
     dirpath (str): The path of the directory to search.
     keys_list (list): The list of keys to check for in the .yaml files.
+    index_filepath (str, optional): The path to a `YamlCorpusIndex` file. If given, only the files changed since the
+        last call are parsed, and the check runs against the index.
+    n_workers (int, optional): Number of worker processes parsing the files. 1 parses them in the current process,
+        None uses all available cores. Workers only send back the booleans. Defaults to 1.
+    chunk_size (int, optional): Number of files sent to a worker at once. Defaults to 16.
     
     Returns:
     dict: A dictionary with filenames as keys and boolean values indicating whether the 
@@ -138,28 +170,18 @@ def get_yaml_files_with_keys(dirpath:dict, keys_list:list):
     # Check if the provided directory exists
     if not os.path.exists(dirpath):
         raise ValueError(f"The provided directory {dirpath} does not exist.")
+
+    if index_filepath is not None:
+        with YamlCorpusIndex(index_filepath) as index:
+            index.refresh(dirpath)
+            return index.get_yaml_files_with_keys(keys_list, dirpath=dirpath)
     
-    # Walk through the directory
-    for root, dirs, files in os.walk(dirpath):
-        for file in files:
-            # Check if the file is a .yaml file
-            if file.endswith(".yaml"):
-                # Construct the full file path
-                file_path = os.path.join(root, file)
-                
-                # Open and load the yaml file
-                try:
-                    with open(file_path, 'r') as stream:
-                        data = yaml.safe_load(stream)
-                except yaml.YAMLError as exc:
-                    print(f"Error loading YAML file {file_path}: {exc}")
-                    continue
-                
-                # Check if all keys in the keys_list are in the data
-                if check_nested_dict(data, keys_list):
-                    file_dict[file] = True
-                else:
-                    file_dict[file] = False
+    file_paths = _list_yaml_files(dirpath)
+    for file_path, (found, error) in zip(file_paths, _map_yaml_files(partial(_check_yaml_file_keys, keys_list=keys_list), file_paths, n_workers, chunk_size)):
+        if error is not None:
+            print(error)
+            continue
+        file_dict[os.path.basename(file_path)] = found
                     
     return file_dict
 
@@ -527,7 +549,7 @@ def load_yaml(filepath: str) -> dict:
         try:
             response = requests.get(filepath)
             response.raise_for_status()  # Raises a HTTPError if the response status is 4xx, 5xx
-            yaml_data = yaml.safe_load(response.text)
+            yaml_data = serialization.safe_load(response.text)
         except (requests.RequestException, yaml.YAMLError) as e:
             raise Exception(f'Error loading YAML from `{filepath}`. \n {str(e)}')
         else:
@@ -538,7 +560,7 @@ def load_yaml(filepath: str) -> dict:
 
         with open(filepath, 'r') as file_descriptor:
             try:
-                yaml_data = yaml.safe_load(file_descriptor)
+                yaml_data = serialization.safe_load(file_descriptor)
             except yaml.YAMLError as msg:
                 raise yaml.YAMLError(f'File `{filepath}` loading error. \n {msg}')
             else:
@@ -559,7 +581,7 @@ def load_yaml_from_file(file):
         yaml.YAMLError: If there is an error while loading the YAML data from the file.
     """
     try:
-        yaml_data = yaml.safe_load(file)
+        yaml_data = serialization.safe_load(file)
     except yaml.YAMLError as e:
         raise yaml.YAMLError(f'File loading error. \n {e}')
     else:
@@ -0,0 +1,158 @@
+from typing import IO
+import yaml
+from ..utils import serialization, check_nested_dict
+
+
+class _LoadRequired(Exception):
+    """Raised when the event stream alone cannot decide a match, e.g. on aliases and merge keys."""
+
+
+_MERGE_TAG = 'tag:yaml.org,2002:merge'
+
+# The key of a mapping entry whose key is itself a mapping or a sequence
+_UNMATCHABLE = object()
+
+
+def _construct_key(loader:yaml.SafeLoader, event:yaml.ScalarEvent):
+    """Construct the Python value of a scalar mapping key, as `yaml.safe_load` would, without keeping the node."""
+    tag = event.tag
+    if tag is None or tag == '!':
+        tag = loader.resolve(yaml.ScalarNode, event.value, event.implicit)
+    if tag == _MERGE_TAG:
+        raise _LoadRequired()
+
+    node = yaml.ScalarNode(tag, event.value, event.start_mark, event.end_mark, style=event.style)
+    constructor = loader.yaml_constructors.get(tag, loader.yaml_constructors[None])
+    return constructor(loader, node)
+
+
+def _is_seekable(stream) -> bool:
+    if isinstance(stream, (str, bytes)):
+        return True
+    seekable = getattr(stream, 'seekable', None)
+    return seekable() if seekable is not None else hasattr(stream, 'seek')
+
+
+def stream_has_key_paths(stream:IO, keys_list:list) -> bool:
+    """
+    Check whether a YAML document contains any of the given nested key paths, reading only as much of it as needed.
+
+    The document is read as a stream of parser events while keeping track of the current mapping path, and the
+    values of mappings that cannot lead to a requested path are skipped without being built. Reading stops as soon
+    as a requested path is found, or as soon as the mappings that could hold the remaining paths are closed.
+    Memory does not depend on the size of the document.
+
+    The result is the same as `check_nested_dict(yaml.safe_load(stream), keys_list)` for key paths through nested
+    mappings, assuming that keys are unique within a mapping, as YAML requires. Errors in the part of the
+    document that is not read are not detected. Documents with aliases or merge keys are read again and built in
+    full, so a stream that cannot seek, such as a pipe, is read into memory first.
+
+    Args:
+        stream (IO): A text or binary stream, or a string, holding a YAML document.
+        keys_list (list): The list of key paths to check for. Each key path is a list of keys.
+
+    Returns:
+        bool: True if any of the key paths exists, False otherwise.
+
+    Raises:
+        yaml.YAMLError: If the document fails to parse before the result is known.
+
+    Usage:
+        ```
+        with open('survey.yaml', 'rb') as stream:
+            stream_has_key_paths(stream, [['APP', 'SURVEYS', 'SURVEY_NAME'], ['APP', 'CONFIG', 'REMOTE', 'IP']])
+        ```
+    """
+    alive = {tuple(keys) for keys in keys_list}
+    if () in alive:
+        # An empty key path exists in any document
+        return True
+    if not alive:
+        return False
+
+    if not _is_seekable(stream):
+        stream = stream.read()
+    start = None if isinstance(stream, (str, bytes)) else stream.tell()
+
+    loader = yaml.SafeLoader('')
+    # One [path, key, expecting_key] entry per open mapping on the way to a requested path
+    frames = []
+    # Depth of the mapping or sequence being skipped, and whether it is a key of the innermost mapping
+    skip_depth, skipping_key = 0, False
+
+    def drop_paths_under(path):
+        """Drops the requested paths under a path whose value has been read, and tells whether any are left."""
+        alive.difference_update([keys for keys in alive if keys[:len(path)] == path])
+        return bool(alive)
+
+    def leads_to_requested_path(path):
+        return any(len(keys) > len(path) and keys[:len(path)] == path for keys in alive)
+
+    try:
+        for event in serialization.parse(stream):
+            if skip_depth:
+                if isinstance(event, (yaml.MappingStartEvent, yaml.SequenceStartEvent)):
+                    skip_depth += 1
+                elif isinstance(event, (yaml.MappingEndEvent, yaml.SequenceEndEvent)):
+                    skip_depth -= 1
+                    if skip_depth == 0 and skipping_key:
+                        # A mapping or a sequence used as a key cannot be part of a key path
+                        frames[-1][1:] = [_UNMATCHABLE, False]
+                        skipping_key = False
+                    elif skip_depth == 0:
+                        frames[-1][2] = True
+                continue
+
+            if isinstance(event, (yaml.StreamStartEvent, yaml.DocumentStartEvent)):
+                continue
+            if isinstance(event, (yaml.DocumentEndEvent, yaml.StreamEndEvent)):
+                return False
+            if isinstance(event, yaml.AliasEvent):
+                raise _LoadRequired()
+
+            if not frames:
+                # The root of the document must be a mapping for any key path to exist
+                if not isinstance(event, yaml.MappingStartEvent):
+                    return False
+                frames.append([(), _UNMATCHABLE, True])
+                continue
+
+            frame = frames[-1]
+            path, key, expecting_key = frame
+            if expecting_key:
+                if isinstance(event, yaml.MappingEndEvent):
+                    frames.pop()
+                    if not drop_paths_under(path) or not frames:
+                        return False
+                    frames[-1][2] = True
+                elif isinstance(event, yaml.ScalarEvent):
+                    key = _construct_key(loader, event)
+                    if path + (key,) in alive:
+                        return True
+                    frame[1:] = [key, False]
+                else:
+                    skip_depth, skipping_key = 1, True
+                continue
+
+            # The value of `key`
+            if key is not _UNMATCHABLE:
+                value_path = path + (key,)
+                if isinstance(event, yaml.MappingStartEvent) and leads_to_requested_path(value_path):
+                    frames.append([value_path, _UNMATCHABLE, True])
+                    continue
+                if not drop_paths_under(value_path):
+                    return False
+
+            if isinstance(event, (yaml.MappingStartEvent, yaml.SequenceStartEvent)):
+                skip_depth = 1
+            else:
+                frame[2] = True
+    except _LoadRequired:
+        pass
+    else:
+        return False
+
+    # Aliases and merge keys can bring in keys from elsewhere in the document, build it instead
+    if start is not None:
+        stream.seek(start)
+    return check_nested_dict(serialization.safe_load(stream), keys_list)
@@ -1 +1,7 @@
-from .spatial import get_h3_geohash, get_h3_geohash_epsg3006, get_coordinates_epsg3006_from_geohash, reproject_coordinates
\ No newline at end of file
+from .spatial import get_h3_geohash, get_h3_geohash_epsg3006, get_coordinates_epsg3006_from_geohash, reproject_coordinates, \
+    reproject_coordinates_array, get_transformer, get_h3_geohash_array, get_h3_geohash_epsg3006_array, \
+    get_coordinates_epsg3006_from_geohash_array
+from .bulk import csv_epsg3006_to_h3
+from .index import H3Index
+from .aggregation import aggregate_h3, h3_to_parent_array, h3_to_int_array, h3_to_string_array, h3_get_resolution_array
+from .geotagging import geotag_frames, get_frame_seconds
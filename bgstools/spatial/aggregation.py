@@ -0,0 +1,172 @@
+import numpy as np
+from .spatial import get_h3_geohash_array
+
+# Bit layout of a H3 cell index: 4 resolution bits at offset 52, followed by 15 digits of 3 bits,
+# where the digits below the cell resolution are set to 7
+_H3_RESOLUTION_OFFSET = np.uint64(52)
+_H3_RESOLUTION_MASK = np.uint64(0xF << 52)
+
+STATISTICS = ('count', 'sum', 'mean', 'min', 'max')
+
+
+def h3_to_int_array(geohashes) -> np.ndarray:
+    """Convert H3 geohashes to an array of uint64 H3 indexes.
+
+    Args:
+        geohashes (array-like): The H3 geohashes, either as hexadecimal strings or as integers.
+
+    Returns:
+        np.ndarray: The H3 indexes as a uint64 array.
+
+    """
+    geohashes = np.asarray(geohashes)
+    if np.issubdtype(geohashes.dtype, np.integer):
+        return geohashes.astype(np.uint64)
+    return np.fromiter((int(geohash, 16) for geohash in geohashes.tolist()), dtype=np.uint64, count=geohashes.size)
+
+
+def h3_to_string_array(cells) -> np.ndarray:
+    """Convert uint64 H3 indexes to an array of H3 geohash strings.
+
+    Args:
+        cells (array-like): The H3 indexes as integers.
+
+    Returns:
+        np.ndarray: The H3 geohashes as a string array.
+
+    """
+    return np.array([format(cell, 'x') for cell in np.asarray(cells, dtype=np.uint64).tolist()], dtype=str)
+
+
+def h3_get_resolution_array(cells) -> np.ndarray:
+    """Get the resolutions of an array of uint64 H3 indexes.
+
+    Args:
+        cells (array-like): The H3 indexes as integers.
+
+    Returns:
+        np.ndarray: The resolutions as a uint8 array.
+
+    """
+    return ((np.asarray(cells, dtype=np.uint64) & _H3_RESOLUTION_MASK) >> _H3_RESOLUTION_OFFSET).astype(np.uint8)
+
+
+def h3_to_parent_array(cells, resolution:int) -> np.ndarray:
+    """Get the parents of an array of uint64 H3 indexes at a coarser resolution, using bit operations only.
+
+    Args:
+        cells (array-like): The H3 indexes as integers.
+        resolution (int): The resolution of the parents.
+
+    Returns:
+        np.ndarray: The parent H3 indexes as a uint64 array.
+
+    Raises:
+        ValueError: If any cell is coarser than the requested resolution.
+
+    """
+    cells = np.asarray(cells, dtype=np.uint64)
+    if cells.size and h3_get_resolution_array(cells).min() < resolution:
+        raise ValueError(f"Cannot get parents at resolution {resolution} of cells with a coarser resolution")
+
+    unused_digits = np.uint64((1 << (3 * (15 - resolution))) - 1)
+    return (cells & ~_H3_RESOLUTION_MASK) | np.uint64(resolution << 52) | unused_digits
+
+
+def _group_partials(cells:np.ndarray, counts:np.ndarray, partials:dict) -> tuple:
+    """Group partial statistics by cell, sorting once and reducing each column with `np.add.reduceat` and friends."""
+    order = np.argsort(cells, kind='stable')
+    sorted_cells = cells[order]
+    starts = np.flatnonzero(np.concatenate(([True], sorted_cells[1:] != sorted_cells[:-1])))
+
+    grouped = {}
+    for name, (sums, valid_counts, minima, maxima) in partials.items():
+        grouped[name] = (
+            np.add.reduceat(sums[order], starts),
+            np.add.reduceat(valid_counts[order], starts),
+            np.fmin.reduceat(minima[order], starts),
+            np.fmax.reduceat(maxima[order], starts),
+        )
+    return sorted_cells[starts], np.add.reduceat(counts[order], starts), grouped
+
+
+def aggregate_h3(
+        geohashes=None,
+        values:dict = None,
+        resolutions:int | list = 9,
+        decimalLatitudes=None,
+        decimalLongitudes=None,
+        statistics:tuple = ('count', 'mean'),
+        as_strings:bool = False) -> dict:
+    """
+    Aggregate value columns per H3 cell at one or more resolutions.
+
+    The records are grouped at the finest requested resolution with a single sort. Each coarser resolution is then
+    derived from the next finer one by grouping the per-cell partial statistics under their parent cells, so the
+    records are never re-indexed. NaN values are ignored.
+
+    Args:
+        geohashes (array-like, optional): The H3 geohashes of the records, as strings or uint64 integers, at or finer
+            than the finest requested resolution. If None, `decimalLatitudes` and `decimalLongitudes` are used.
+        values (dict, optional): A dictionary with column names as keys and array-likes of numbers, one per record,
+            as values. Defaults to None, which only counts records.
+        resolutions (int | list, optional): One or more H3 resolutions. Defaults to 9.
+        decimalLatitudes (array-like, optional): The latitudes of the records in decimal degrees.
+        decimalLongitudes (array-like, optional): The longitudes of the records in decimal degrees.
+        statistics (tuple, optional): The statistics computed for each value column, among
+            'count', 'sum', 'mean', 'min' and 'max'. Defaults to ('count', 'mean').
+        as_strings (bool, optional): If True, return the cells as H3 geohash strings instead of uint64
+            integers. Defaults to False.
+
+    Returns:
+        dict: A dictionary with the resolutions as keys. Each value is a dictionary of columnar NumPy arrays,
+            one row per occupied cell sorted by H3 index: `cell`, `count` (the number of records) and
+            `<column>_<statistic>` for each value column and statistic.
+
+    Raises:
+        ValueError: If neither geohashes nor coordinates are given, if the arrays do not share the same length,
+            or if a statistic is unknown.
+
+    Usage:
+        ```
+        result = aggregate_h3(geohashes, values={'DEPTH': depths}, resolutions=[7, 9])
+        result[7]['cell'], result[7]['count'], result[7]['DEPTH_mean']
+        ```
+    """
+    resolutions = sorted({resolutions} if isinstance(resolutions, int) else set(resolutions), reverse=True)
+    unknown_statistics = set(statistics) - set(STATISTICS)
+    if unknown_statistics:
+        raise ValueError(f"Unknown statistics {sorted(unknown_statistics)}, expected any of {STATISTICS}")
+
+    if geohashes is None:
+        if decimalLatitudes is None or decimalLongitudes is None:
+            raise ValueError("Either `geohashes` or both `decimalLatitudes` and `decimalLongitudes` must be given")
+        geohashes = get_h3_geohash_array(decimalLatitudes, decimalLongitudes, resolutions[0])
+
+    cells = h3_to_int_array(geohashes)
+    counts = np.ones(len(cells), dtype=np.int64)
+
+    # Per-record partial statistics: (sum, number of valid values, minimum, maximum)
+    partials = {}
+    for name, column in (values or {}).items():
+        column = np.asarray(column, dtype=np.float64)
+        if column.shape != cells.shape:
+            raise ValueError(f"Column `{name}` has {column.size} values for {cells.size} records")
+        valid = ~np.isnan(column)
+        partials[name] = (np.where(valid, column, 0.0), valid.astype(np.int64), column, column)
+
+    result = {}
+    for resolution in resolutions:
+        if cells.size:
+            cells = h3_to_parent_array(cells, resolution)
+            cells, counts, partials = _group_partials(cells, counts, partials)
+
+        columns = {'cell': h3_to_string_array(cells) if as_strings else cells, 'count': counts}
+        for name, (sums, valid_counts, minima, maxima) in partials.items():
+            with np.errstate(invalid='ignore', divide='ignore'):
+                column_statistics = {'count': valid_counts, 'sum': sums, 'mean': sums / valid_counts, 'min': minima, 'max': maxima}
+            for statistic in statistics:
+                columns[f'{name}_{statistic}'] = column_statistics[statistic]
+        result[resolution] = columns
+
+    return result
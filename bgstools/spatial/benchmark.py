@@ -0,0 +1,166 @@
+"""
+Throughput benchmark of the spatial functions on synthetic point clouds within the SWEREF99TM extent.
+
+Can be used as stand-alone script by providing command-line arguments:
+    python -m bgstools.spatial.benchmark --sizes 1000 100000 --output spatial_benchmark.json
+"""
+import sys
+import json
+import time
+import platform
+import argparse
+import datetime
+import tracemalloc
+from typing import Callable
+import h3
+import numpy as np
+import pyproj
+from ..version import __version__
+from .spatial import get_h3_geohash, get_h3_geohash_array, reproject_coordinates, reproject_coordinates_array, \
+    get_h3_geohash_epsg3006, get_h3_geohash_epsg3006_array, get_coordinates_epsg3006_from_geohash, \
+    get_coordinates_epsg3006_from_geohash_array
+
+# Approximate projected bounds of SWEREF99TM (EPSG:3006) as (min x, min y, max x, max y)
+SWEREF99TM_EXTENT = (218128.0, 6126002.0, 1083427.0, 7692850.0)
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+
+def generate_points_epsg3006(n_points:int, seed:int = 0) -> tuple:
+    """
+    Generate uniformly distributed points within the SWEREF99TM extent.
+
+    Args:
+        n_points (int): The number of points.
+        seed (int, optional): The seed of the random generator. Defaults to 0.
+
+    Returns:
+        tuple: The x and y coordinates as NumPy arrays.
+    """
+    rng = np.random.default_rng(seed)
+    min_x, min_y, max_x, max_y = SWEREF99TM_EXTENT
+    return rng.uniform(min_x, max_x, n_points), rng.uniform(min_y, max_y, n_points)
+
+
+def measure(func:Callable, n_points:int) -> dict:
+    """
+    Measure the throughput and the peak traced memory of a function processing `n_points` points.
+
+    The function is run twice: once timed, and once under `tracemalloc`, so tracing does not slow the timing down.
+
+    Args:
+        func (Callable): A function without arguments.
+        n_points (int): The number of points processed by the function.
+
+    Returns:
+        dict: A dictionary with the keys `seconds`, `points_per_second` and `peak_memory_bytes`.
+    """
+    start = time.perf_counter()
+    func()
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'seconds': seconds,
+        'points_per_second': n_points / seconds if seconds > 0 else None,
+        'peak_memory_bytes': peak_memory,
+    }
+
+
+def _benchmark_cases(x:np.ndarray, y:np.ndarray, longitudes:np.ndarray, latitudes:np.ndarray, geohashes:np.ndarray, resolution:int) -> dict:
+    """Build the scalar and batch callables of each benchmarked function."""
+    return {
+        'get_h3_geohash': {
+            'scalar': lambda: [get_h3_geohash(latitude, longitude, resolution) for latitude, longitude in zip(latitudes.tolist(), longitudes.tolist())],
+            'batch': lambda: get_h3_geohash_array(latitudes, longitudes, resolution),
+        },
+        'reproject_coordinates': {
+            'scalar': lambda: [reproject_coordinates(x_i, y_i, inProj='epsg:3006', outProj='epsg:4326') for x_i, y_i in zip(x.tolist(), y.tolist())],
+            'batch': lambda: reproject_coordinates_array(x, y, inProj='epsg:3006', outProj='epsg:4326'),
+        },
+        'get_h3_geohash_epsg3006': {
+            'scalar': lambda: [get_h3_geohash_epsg3006(x_i, y_i, resolution) for x_i, y_i in zip(x.tolist(), y.tolist())],
+            'batch': lambda: get_h3_geohash_epsg3006_array(x, y, resolution),
+        },
+        'get_coordinates_epsg3006_from_geohash': {
+            'scalar': lambda: [get_coordinates_epsg3006_from_geohash(geohash) for geohash in geohashes.tolist()],
+            'batch': lambda: get_coordinates_epsg3006_from_geohash_array(geohashes),
+        },
+    }
+
+
+def run_benchmarks(sizes:tuple = DEFAULT_SIZES, max_scalar_size:int = 100_000, resolution:int = 12, seed:int = 0, callback:Callable[[str], None] = None) -> dict:
+    """
+    Run the spatial throughput benchmarks for each point cloud size.
+
+    Args:
+        sizes (tuple, optional): The numbers of points of the synthetic point clouds. Defaults to 1e3 to 1e7.
+        max_scalar_size (int, optional): The largest size for which the per-point (scalar) path is run.
+            Larger sizes only run the batch path. Defaults to 100_000.
+        resolution (int, optional): The H3 resolution. Defaults to 12.
+        seed (int, optional): The seed of the random generator. Defaults to 0.
+        callback (Callable[[str], None], optional): A callback function called with a message after each measurement.
+
+    Returns:
+        dict: A JSON-serializable dictionary with the environment and one result per function, path and size.
+    """
+    # Warm up the transformer cache so the measurements reflect steady state
+    reproject_coordinates(0.0, 0.0, inProj='epsg:3006', outProj='epsg:4326')
+    reproject_coordinates(0.0, 0.0, inProj='epsg:4326', outProj='epsg:3006')
+
+    results = []
+    for n_points in sizes:
+        x, y = generate_points_epsg3006(n_points, seed)
+        longitudes, latitudes = reproject_coordinates_array(x, y, inProj='epsg:3006', outProj='epsg:4326')
+        geohashes = get_h3_geohash_array(latitudes, longitudes, resolution)
+
+        for function_name, paths in _benchmark_cases(x, y, longitudes, latitudes, geohashes, resolution).items():
+            for path, func in paths.items():
+                if path == 'scalar' and n_points > max_scalar_size:
+                    continue
+                result = {'function': function_name, 'path': path, 'n_points': n_points, **measure(func, n_points)}
+                results.append(result)
+                if callback:
+                    callback(f"{function_name} [{path}] n={n_points}: {result['points_per_second']:.0f} points/s, "
+                             f"peak {result['peak_memory_bytes'] / 1024 ** 2:.1f} MiB")
+
+    return {
+        'bgstools': __version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'h3': h3.__version__,
+        'pyproj': pyproj.__version__,
+        'numpy': np.__version__,
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'resolution': resolution,
+        'results': results,
+    }
+
+
+def main(argv:list = None):
+    parser = argparse.ArgumentParser(description='Benchmark the throughput of the bgstools spatial functions.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES), help='Point cloud sizes.')
+    parser.add_argument('--max-scalar-size', type=int, default=100_000, help='Largest size for which the per-point path is run.')
+    parser.add_argument('--resolution', type=int, default=12, help='H3 resolution.')
+    parser.add_argument('--seed', type=int, default=0, help='Random generator seed.')
+    parser.add_argument('--output', type=str, default=None, help='Path of the JSON report. Defaults to stdout.')
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(sizes=args.sizes, max_scalar_size=args.max_scalar_size, resolution=args.resolution,
+                            seed=args.seed, callback=lambda message: print(message, file=sys.stderr))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+
+
+if __name__ == '__main__':
+    main()
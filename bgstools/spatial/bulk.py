@@ -0,0 +1,120 @@
+import os
+import csv
+from itertools import islice
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional
+import numpy as np
+from .spatial import reproject_coordinates_array, get_h3_geohash_array
+
+
+def _get_h3_geohash_epsg3006_rows(rows:list, x_index:int, y_index:int, resolutions:tuple) -> list:
+    """Append one H3 geohash column per resolution to a chunk of CSV rows with SWEREF99TM coordinates."""
+    x = np.fromiter((row[x_index] for row in rows), dtype=np.float64, count=len(rows))
+    y = np.fromiter((row[y_index] for row in rows), dtype=np.float64, count=len(rows))
+
+    # Reproject the whole chunk in place, the coordinate buffers are not needed afterwards
+    decimal_longitudes, decimal_latitudes = reproject_coordinates_array(x, y, inProj='epsg:3006', outProj='epsg:4326', out_x=x, out_y=y)
+
+    columns = [get_h3_geohash_array(decimal_latitudes, decimal_longitudes, resolution) for resolution in resolutions]
+    for i, row in enumerate(rows):
+        row.extend(column[i] for column in columns)
+    return rows
+
+
+def _read_chunks(reader, chunk_size:int):
+    """Yield lists of at most `chunk_size` rows from a CSV reader."""
+    while True:
+        chunk = list(islice(reader, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def csv_epsg3006_to_h3(
+        input_filepath:str,
+        output_filepath:str,
+        resolutions:int | list = 12,
+        x_column:str = 'x',
+        y_column:str = 'y',
+        chunk_size:int = 100_000,
+        n_workers:Optional[int] = 1,
+        delimiter:str = ',',
+        callback:Callable[[str], None] = None) -> int:
+    """
+    Streams a CSV file with SWEREF99TM (EPSG:3006) coordinates into a new CSV file with one H3 geohash column per resolution.
+
+    The input is read in chunks of `chunk_size` rows. Each chunk is reprojected with a single vectorized transform,
+    the H3 geohashes are assigned with the same rules as `get_h3_geohash_epsg3006`, and the chunk is written out
+    before the next one is read, so memory stays bounded whatever the size of the file. With `n_workers` other
+    than 1, chunks are processed in a process pool and written in input order, with at most two chunks per
+    worker in flight.
+
+    Args:
+        input_filepath (str): Path to the input CSV file. The first row must be a header.
+        output_filepath (str): Path to the output CSV file. The input columns are kept, and the columns
+            `H3_<resolution>` are appended.
+        resolutions (int | list, optional): One or more H3 resolutions. Defaults to 12.
+        x_column (str, optional): Name of the column holding the SWEREF99TM x-coordinate. Defaults to 'x'.
+        y_column (str, optional): Name of the column holding the SWEREF99TM y-coordinate. Defaults to 'y'.
+        chunk_size (int, optional): Number of rows processed at once. Defaults to 100_000.
+        n_workers (int, optional): Number of worker processes. 1 processes the chunks in the current process,
+            None uses all available cores. Defaults to 1.
+        delimiter (str, optional): The CSV delimiter of both input and output. Defaults to ','.
+        callback (Callable[[str], None], optional): A callback function called with a progress message
+            after each written chunk. Defaults to None.
+
+    Returns:
+        int: The number of rows written, excluding the header.
+
+    Raises:
+        FileNotFoundError: If the input file does not exist.
+        ValueError: If the coordinate columns are missing, a coordinate is not numeric, or `chunk_size` is not positive.
+
+    Usage:
+        `n_rows = csv_epsg3006_to_h3('stations.csv', 'stations_h3.csv', resolutions=[9, 12], n_workers=None)`
+    """
+    if not os.path.isfile(input_filepath):
+        raise FileNotFoundError(f"No such file or directory: '{input_filepath}'")
+
+    if chunk_size < 1:
+        raise ValueError(f"`chunk_size` must be a positive integer, not {chunk_size}")
+
+    resolutions = (resolutions,) if isinstance(resolutions, int) else tuple(resolutions)
+    n_workers = os.cpu_count() if n_workers is None else n_workers
+    n_rows = 0
+
+    with open(input_filepath, 'r', newline='') as input_file, open(output_filepath, 'w', newline='') as output_file:
+        reader = csv.reader(input_file, delimiter=delimiter)
+        writer = csv.writer(output_file, delimiter=delimiter)
+
+        header = next(reader, None)
+        if header is None or x_column not in header or y_column not in header:
+            raise ValueError(f"Columns `{x_column}` and `{y_column}` not found in the header of {input_filepath}")
+        writer.writerow(header + [f'H3_{resolution}' for resolution in resolutions])
+
+        x_index, y_index = header.index(x_column), header.index(y_column)
+        chunks = _read_chunks(reader, chunk_size)
+
+        def write_chunk(rows):
+            nonlocal n_rows
+            writer.writerows(rows)
+            n_rows += len(rows)
+            if callback:
+                callback(f"{n_rows} rows written to {output_filepath}")
+
+        if n_workers == 1:
+            for rows in chunks:
+                write_chunk(_get_h3_geohash_epsg3006_rows(rows, x_index, y_index, resolutions))
+        else:
+            with ProcessPoolExecutor(max_workers=n_workers) as executor:
+                # Keep a bounded window of chunks in flight and write them back in submission order
+                pending = deque()
+                for rows in chunks:
+                    pending.append(executor.submit(_get_h3_geohash_epsg3006_rows, rows, x_index, y_index, resolutions))
+                    if len(pending) >= 2 * n_workers:
+                        write_chunk(pending.popleft().result())
+                while pending:
+                    write_chunk(pending.popleft().result())
+
+    return n_rows
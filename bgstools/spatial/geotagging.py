@@ -0,0 +1,121 @@
+import re
+import numpy as np
+from .spatial import reproject_coordinates_array, get_h3_geohash_array
+
+_FRAME_SECONDS_PATTERN = re.compile(r'SEC_(\d+(?:\.\d+)?)$')
+
+
+def get_frame_seconds(frame_key) -> float:
+    """Get the time offset in seconds from the start of the video of a frame key.
+
+    Args:
+        frame_key (str | int | float): A frame key as produced by `extract_frames`, e.g. 'SEC_000005', or a number of seconds.
+
+    Returns:
+        float: The time offset in seconds.
+
+    Raises:
+        ValueError: If the key does not encode a time offset.
+
+    """
+    if isinstance(frame_key, (int, float)):
+        return float(frame_key)
+
+    match = _FRAME_SECONDS_PATTERN.search(str(frame_key))
+    if match is None:
+        raise ValueError(f"Frame key `{frame_key}` does not encode a time offset, expected e.g. 'SEC_000005'")
+    return float(match.group(1))
+
+
+def geotag_frames(
+        frames:dict,
+        track_time,
+        track_x,
+        track_y,
+        track_depth=None,
+        video_start_time:float = 0.0,
+        inProj:str = 'epsg:3006',
+        resolution:int = 12) -> dict:
+    """
+    Georeference video frames by interpolating their positions along a navigation track.
+
+    All frame timestamps are interpolated in one vectorized pass over the track, the positions are reprojected
+    to latitude and longitude with a cached transformer, and a H3 geohash is assigned to each frame.
+
+    Args:
+        frames (dict): A dictionary of frames, as returned by `extract_frames` (frame key to file path) or by
+            `select_random_frames` (frame key to a dictionary with `FILEPATH` and `INTERPRETATION`).
+        track_time (array-like): The times of the navigation fixes, in seconds. Need not be sorted.
+        track_x (array-like): The x-coordinates (or longitudes) of the navigation fixes in `inProj`.
+        track_y (array-like): The y-coordinates (or latitudes) of the navigation fixes in `inProj`.
+        track_depth (array-like, optional): The depths of the navigation fixes. Defaults to None.
+        video_start_time (float, optional): The time of the first video frame, on the same clock as `track_time`.
+            Defaults to 0.0.
+        inProj (str, optional): The projection system of the track as an EPSG string. Defaults to 'epsg:3006'.
+        resolution (int, optional): The resolution of the H3 geohashes. Defaults to 12.
+
+    Returns:
+        dict: A dictionary with the same keys as `frames`. Each value is a copy of the frame dictionary (or
+            `{'FILEPATH': <path>}`) with an added `POSITION` dictionary holding `TIME`, `X`, `Y`, `DEPTH`,
+            `DECIMAL_LATITUDE`, `DECIMAL_LONGITUDE` and `H3`. `POSITION` is None for frames outside the track time range.
+
+    Raises:
+        ValueError: If the track arrays do not share the same length or the track is empty.
+
+    Usage:
+        ```
+        frames = extract_frames(video_filepath, frames_dirpath, kwargs={})
+        frames = geotag_frames(frames, nav['time'], nav['x'], nav['y'], nav['depth'], video_start_time=dive_start)
+        ```
+    """
+    track_time = np.asarray(track_time, dtype=np.float64)
+    track_columns = [np.asarray(track_x, dtype=np.float64), np.asarray(track_y, dtype=np.float64)]
+    if track_depth is not None:
+        track_columns.append(np.asarray(track_depth, dtype=np.float64))
+
+    if track_time.size == 0:
+        raise ValueError("The navigation track is empty")
+    if any(column.shape != track_time.shape for column in track_columns):
+        raise ValueError("The navigation track arrays must have the same length")
+
+    # np.interp expects increasing sample times
+    if np.any(np.diff(track_time) < 0):
+        order = np.argsort(track_time, kind='stable')
+        track_time = track_time[order]
+        track_columns = [column[order] for column in track_columns]
+
+    frame_keys = list(frames.keys())
+    frame_time = video_start_time + np.fromiter((get_frame_seconds(key) for key in frame_keys), dtype=np.float64, count=len(frame_keys))
+
+    # Frames outside the track time range get NaN instead of the clamped end positions
+    interpolated = [np.interp(frame_time, track_time, column, left=np.nan, right=np.nan) for column in track_columns]
+    x, y = interpolated[0], interpolated[1]
+    depth = interpolated[2] if track_depth is not None else np.full(len(frame_keys), np.nan)
+
+    valid = ~(np.isnan(x) | np.isnan(y))
+    longitudes, latitudes = reproject_coordinates_array(x[valid], y[valid], inProj=inProj, outProj='epsg:4326')
+    geohashes = np.full(len(frame_keys), None, dtype=object)
+    geohashes[valid] = get_h3_geohash_array(latitudes, longitudes, resolution)
+    decimal_latitudes = np.full(len(frame_keys), np.nan)
+    decimal_longitudes = np.full(len(frame_keys), np.nan)
+    decimal_latitudes[valid], decimal_longitudes[valid] = latitudes, longitudes
+
+    # Convert to Python scalars so the result can be stored with `yaml.safe_dump`
+    columns = zip(valid.tolist(), frame_time.tolist(), x.tolist(), y.tolist(), depth.tolist(),
+                  decimal_latitudes.tolist(), decimal_longitudes.tolist(), geohashes.tolist())
+
+    geotagged_frames = {}
+    for key, (is_valid, time, x_i, y_i, depth_i, latitude, longitude, geohash) in zip(frame_keys, columns):
+        frame = dict(frames[key]) if isinstance(frames[key], dict) else {'FILEPATH': frames[key]}
+        frame['POSITION'] = {
+            'TIME': time,
+            'X': x_i,
+            'Y': y_i,
+            'DEPTH': None if track_depth is None else depth_i,
+            'DECIMAL_LATITUDE': latitude,
+            'DECIMAL_LONGITUDE': longitude,
+            'H3': geohash,
+        } if is_valid else None
+        geotagged_frames[key] = frame
+
+    return geotagged_frames
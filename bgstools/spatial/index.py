@@ -0,0 +1,232 @@
+import h3
+from collections import defaultdict
+from typing import Hashable, Iterable
+from .spatial import get_h3_geohash, get_h3_geohash_array, get_h3_geohash_epsg3006_array
+
+
+class H3Index:
+    """
+    In-memory spatial index mapping H3 geohashes at a fixed resolution to record IDs (e.g. stations or frames).
+
+    Records are kept in a dictionary keyed by geohash, so a query only touches the cells it covers
+    and its cost does not depend on the number of records in the index. Queries return record IDs
+    grouped by cell, in no particular order between cells.
+
+    Attributes:
+        resolution (int): The H3 resolution of the indexed cells.
+
+    Usage:
+        ```
+        index = H3Index(resolution=9)
+        index.insert('STATION_1', 59.3293, 18.0686)
+        index.insert_many_epsg3006(['STATION_2', 'STATION_3'], [674032, 674100], [6580821, 6580900])
+
+        index.query_k_ring(59.33, 18.06, k=2)  # ['STATION_2', 'STATION_3', 'STATION_1']
+        index.rollup(resolution=6)  # {'86088661fffffff': ['STATION_1', 'STATION_2', 'STATION_3']}
+        ```
+    """
+
+    def __init__(self, resolution:int = 9):
+        """
+        Initialize a new, empty instance of the H3Index class.
+
+        Args:
+            resolution (int, optional): The H3 resolution of the indexed cells. Defaults to 9.
+        """
+        if not 0 <= resolution <= 15:
+            raise ValueError(f"H3 resolution must be between 0 and 15, not {resolution}")
+
+        self.resolution = resolution
+        self._cells = defaultdict(list)
+        self._size = 0
+        # Stored cells grouped by their parents, per coarser resolution, built on demand and dropped when a cell is added
+        self._parents = {}
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, geohash:str):
+        return geohash in self._cells
+
+    def insert(self, record_id:Hashable, decimalLatitude:float, decimalLongitude:float) -> str:
+        """
+        Insert a record at a given latitude and longitude.
+
+        Args:
+            record_id (Hashable): The ID of the record.
+            decimalLatitude (float): The latitude in decimal degrees.
+            decimalLongitude (float): The longitude in decimal degrees.
+
+        Returns:
+            str: The H3 geohash the record was indexed under.
+        """
+        geohash = get_h3_geohash(decimalLatitude, decimalLongitude, self.resolution)
+        self._add(record_id, geohash)
+        return geohash
+
+    def insert_cell(self, record_id:Hashable, geohash:str) -> str:
+        """
+        Insert a record by its H3 geohash. Geohashes finer than the index resolution are rolled up to their parent.
+
+        Args:
+            record_id (Hashable): The ID of the record.
+            geohash (str): The H3 geohash of the record.
+
+        Returns:
+            str: The H3 geohash the record was indexed under.
+
+        Raises:
+            ValueError: If the geohash is coarser than the index resolution.
+        """
+        geohash = self._at_resolution(geohash)
+        self._add(record_id, geohash)
+        return geohash
+
+    def insert_many(self, record_ids:Iterable, decimalLatitudes, decimalLongitudes) -> None:
+        """
+        Insert many records at once from arrays of latitudes and longitudes.
+
+        Args:
+            record_ids (Iterable): The IDs of the records.
+            decimalLatitudes (array-like): The latitudes in decimal degrees.
+            decimalLongitudes (array-like): The longitudes in decimal degrees.
+        """
+        self._insert_geohashes(record_ids, get_h3_geohash_array(decimalLatitudes, decimalLongitudes, self.resolution))
+
+    def insert_many_epsg3006(self, record_ids:Iterable, x, y) -> None:
+        """
+        Insert many records at once from arrays of SWEREF99TM coordinates.
+
+        Args:
+            record_ids (Iterable): The IDs of the records.
+            x (array-like): The x-coordinates in SWEREF99TM.
+            y (array-like): The y-coordinates in SWEREF99TM.
+        """
+        self._insert_geohashes(record_ids, get_h3_geohash_epsg3006_array(x, y, self.resolution))
+
+    def _insert_geohashes(self, record_ids:Iterable, geohashes) -> None:
+        record_ids = list(record_ids)
+        if len(record_ids) != len(geohashes):
+            raise ValueError(f"Got {len(record_ids)} record IDs for {len(geohashes)} coordinates")
+
+        cells = self._cells
+        n_cells = len(cells)
+        for record_id, geohash in zip(record_ids, geohashes):
+            cells[geohash].append(record_id)
+        self._size += len(record_ids)
+        if len(cells) != n_cells:
+            self._parents.clear()
+
+    def _add(self, record_id:Hashable, geohash:str) -> None:
+        if geohash not in self._cells:
+            self._parents.clear()
+        self._cells[geohash].append(record_id)
+        self._size += 1
+
+    def _at_resolution(self, geohash:str) -> str:
+        resolution = h3.h3_get_resolution(geohash)
+        if resolution < self.resolution:
+            raise ValueError(f"Geohash {geohash} (resolution {resolution}) is coarser than the index resolution {self.resolution}")
+        return geohash if resolution == self.resolution else h3.h3_to_parent(geohash, self.resolution)
+
+    def _collect(self, geohashes:Iterable) -> list:
+        cells = self._cells
+        record_ids = []
+        for geohash in geohashes:
+            if geohash in cells:
+                record_ids.extend(cells[geohash])
+        return record_ids
+
+    def _cells_by_parent(self, resolution:int) -> dict:
+        """The stored cells grouped by their parent at a coarser resolution."""
+        if resolution not in self._parents:
+            parents = defaultdict(list)
+            for geohash in self._cells:
+                parents[h3.h3_to_parent(geohash, resolution)].append(geohash)
+            self._parents[resolution] = dict(parents)
+        return self._parents[resolution]
+
+    def query_cell(self, geohash:str) -> list:
+        """
+        Get the records within a H3 cell of any resolution.
+
+        Cells coarser than the index resolution are matched against the parents of the stored cells, so the
+        cost does not grow with the 7 children per resolution step of the query cell. Finer cells are rolled
+        up to their parent at the index resolution.
+
+        Args:
+            geohash (str): The H3 geohash.
+
+        Returns:
+            list: The IDs of the records within the cell.
+        """
+        if h3.h3_get_resolution(geohash) < self.resolution:
+            return self._collect(self._cells_by_parent(h3.h3_get_resolution(geohash)).get(geohash, ()))
+        return self._collect((self._at_resolution(geohash),))
+
+    def query_k_ring(self, decimalLatitude:float, decimalLongitude:float, k:int = 1) -> list:
+        """
+        Get the records within `k` rings of cells around a given latitude and longitude.
+
+        Args:
+            decimalLatitude (float): The latitude in decimal degrees.
+            decimalLongitude (float): The longitude in decimal degrees.
+            k (int, optional): The number of rings around the cell of the point. Defaults to 1.
+
+        Returns:
+            list: The IDs of the records within the rings.
+        """
+        return self.query_k_ring_cell(get_h3_geohash(decimalLatitude, decimalLongitude, self.resolution), k)
+
+    def query_k_ring_cell(self, geohash:str, k:int = 1) -> list:
+        """
+        Get the records within `k` rings of cells around a H3 cell.
+
+        Args:
+            geohash (str): The H3 geohash, at or finer than the index resolution.
+            k (int, optional): The number of rings around the cell. Defaults to 1.
+
+        Returns:
+            list: The IDs of the records within the rings.
+        """
+        return self._collect(h3.k_ring(self._at_resolution(geohash), k))
+
+    def query_polygon(self, polygon:list, holes:list = None) -> list:
+        """
+        Get the records within a polygon.
+
+        The polygon is filled with the cells of the index resolution whose centers fall inside it, so records
+        near the polygon edge are included or excluded at cell granularity.
+
+        Args:
+            polygon (list): The outer ring of the polygon as a list of (latitude, longitude) tuples.
+            holes (list, optional): A list of inner rings, each a list of (latitude, longitude) tuples. Defaults to None.
+
+        Returns:
+            list: The IDs of the records within the polygon.
+        """
+        geojson = {'type': 'Polygon', 'coordinates': [list(polygon)] + [list(hole) for hole in holes or []]}
+        return self._collect(h3.polyfill(geojson, self.resolution, geo_json_conformant=False))
+
+    def rollup(self, resolution:int) -> dict:
+        """
+        Group the records by their parent cells at a coarser resolution.
+
+        Args:
+            resolution (int): The coarser H3 resolution, at most the index resolution.
+
+        Returns:
+            dict: A dictionary with the parent geohashes as keys and lists of record IDs as values.
+
+        Raises:
+            ValueError: If the resolution is finer than the index resolution.
+        """
+        if resolution > self.resolution:
+            raise ValueError(f"Cannot roll up to resolution {resolution}, finer than the index resolution {self.resolution}")
+        if resolution == self.resolution:
+            return {geohash: list(record_ids) for geohash, record_ids in self._cells.items()}
+
+        parents = defaultdict(list)
+        for geohash, record_ids in self._cells.items():
+            parents[h3.h3_to_parent(geohash, resolution)].extend(record_ids)
+        return dict(parents)
@@ -1,5 +1,27 @@
+from functools import lru_cache
 import h3
-from pyproj import Proj, transform
+import numpy as np
+from pyproj import Transformer
+
+
+@lru_cache(maxsize=32)
+def get_transformer(inProj:str='epsg:4326', outProj:str='epsg:3006', always_xy:bool=True) -> Transformer:
+    """Get a cached pyproj Transformer between two projection systems.
+
+    Building a Transformer is far more expensive than using it, so transformers are kept
+    in an LRU cache keyed by (inProj, outProj, always_xy).
+
+    Args:
+        inProj (str, optional): The input projection system as an EPSG string. Defaults to 'epsg:4326'.
+        outProj (str, optional): The output projection system as an EPSG string. Defaults to 'epsg:3006'.
+        always_xy (bool, optional): If True, coordinates are always given and returned as (x, y) or
+            (longitude, latitude), regardless of the axis order of the CRS. Defaults to True.
+
+    Returns:
+        Transformer: The cached transformer.
+
+    """
+    return Transformer.from_crs(inProj, outProj, always_xy=always_xy)
 
 
 def get_h3_geohash(decimalLatitude:float, decimalLongitude:float, resolution:int=12) -> str:
@@ -30,14 +52,58 @@ def reproject_coordinates(x_or_longitude:float, y_or_latitude:float, inProj:str=
         tuple: The reprojected coordinates as a tuple containing x and y.
 
     """
-    in_proj = Proj(init=inProj)
-    out_proj = Proj(init=outProj)
-
-    # Convert coordinates
-    x, y = transform(in_proj, out_proj, x_or_longitude, y_or_latitude)
+    x, y = get_transformer(inProj, outProj).transform(x_or_longitude, y_or_latitude)
     return x, y
 
 
+def reproject_coordinates_array(x_or_longitude, y_or_latitude, inProj:str='epsg:4326', outProj:str='epsg:3006', out_x:np.ndarray=None, out_y:np.ndarray=None) -> tuple:
+    """Reproject arrays of coordinates from one projection system to another in a single call.
+
+    Args:
+        x_or_longitude (array-like): The x-coordinates or longitudes.
+        y_or_latitude (array-like): The y-coordinates or latitudes.
+        inProj (str, optional): The input projection system as an EPSG string. Defaults to 'epsg:4326'.
+        outProj (str, optional): The output projection system as an EPSG string. Defaults to 'epsg:3006'.
+        out_x (np.ndarray, optional): A contiguous float64 buffer to write the reprojected x-coordinates into.
+            May be the input array itself. Defaults to None, which allocates a new array.
+        out_y (np.ndarray, optional): A contiguous float64 buffer to write the reprojected y-coordinates into.
+            May be the input array itself. Defaults to None, which allocates a new array.
+
+    Returns:
+        tuple: The reprojected coordinates as a tuple of NumPy arrays containing x and y.
+
+    Raises:
+        ValueError: If the inputs or the output buffers do not share the same shape, or if an output
+            buffer is not a contiguous float64 array.
+
+    """
+    x_or_longitude = np.asarray(x_or_longitude, dtype=np.float64)
+    y_or_latitude = np.asarray(y_or_latitude, dtype=np.float64)
+    if x_or_longitude.shape != y_or_latitude.shape:
+        raise ValueError(f"Coordinate arrays must have the same shape, got {x_or_longitude.shape} and {y_or_latitude.shape}")
+
+    out_x = _as_output_buffer(out_x, x_or_longitude)
+    out_y = _as_output_buffer(out_y, y_or_latitude)
+
+    # Transform the output buffers in place, avoiding any further allocation
+    return get_transformer(inProj, outProj).transform(out_x, out_y, inplace=True)
+
+
+def _as_output_buffer(out:np.ndarray, values:np.ndarray) -> np.ndarray:
+    """Validate (or allocate) an output buffer and fill it with the given values."""
+    if out is None:
+        return np.array(values, dtype=np.float64, order='C')
+
+    if not isinstance(out, np.ndarray) or out.dtype != np.float64 or not out.flags.c_contiguous or not out.flags.writeable:
+        raise ValueError("Output buffers must be writeable, contiguous float64 NumPy arrays")
+    if out.shape != values.shape:
+        raise ValueError(f"Output buffer shape {out.shape} does not match coordinates shape {values.shape}")
+
+    if out is not values:
+        np.copyto(out, values)
+    return out
+
+
 def get_h3_geohash_epsg3006(x:float, y:float, resolution:int=12) -> str:
     """Get the H3 geohash for a given x and y coordinate in the SWEREF99TM projection system.
 
@@ -54,6 +120,42 @@ def get_h3_geohash_epsg3006(x:float, y:float, resolution:int=12) -> str:
     return get_h3_geohash(decimal_latitude, decimal_longitude, resolution)
 
 
+def get_h3_geohash_array(decimalLatitudes, decimalLongitudes, resolution:int=12) -> np.ndarray:
+    """Get the H3 geohashes for arrays of latitudes and longitudes at a specified resolution.
+
+    Args:
+        decimalLatitudes (array-like): The latitudes in decimal degrees.
+        decimalLongitudes (array-like): The longitudes in decimal degrees.
+        resolution (int, optional): The resolution of the H3 geohashes. Defaults to 12.
+
+    Returns:
+        np.ndarray: An object array with the H3 geohashes, in input order.
+
+    """
+    geo_to_h3 = h3.geo_to_h3
+    latitudes = np.asarray(decimalLatitudes, dtype=np.float64).tolist()
+    longitudes = np.asarray(decimalLongitudes, dtype=np.float64).tolist()
+    geohashes = np.empty(len(latitudes), dtype=object)
+    geohashes[:] = [geo_to_h3(latitude, longitude, resolution) for latitude, longitude in zip(latitudes, longitudes)]
+    return geohashes
+
+
+def get_h3_geohash_epsg3006_array(x, y, resolution:int=12) -> np.ndarray:
+    """Get the H3 geohashes for arrays of x and y coordinates in the SWEREF99TM projection system.
+
+    Args:
+        x (array-like): The x-coordinates in SWEREF99TM.
+        y (array-like): The y-coordinates in SWEREF99TM.
+        resolution (int, optional): The resolution of the H3 geohashes. Defaults to 12.
+
+    Returns:
+        np.ndarray: An object array with the H3 geohashes, in input order.
+
+    """
+    decimal_longitudes, decimal_latitudes = reproject_coordinates_array(x, y, inProj='epsg:3006', outProj='epsg:4326')
+    return get_h3_geohash_array(decimal_latitudes, decimal_longitudes, resolution)
+
+
 def get_coordinates_epsg3006_from_geohash(geohash:str, outProj:str='epsg:3006') -> tuple:
     """Convert a H3 geohash to SWEREF99TM coordinates.
 
@@ -67,7 +169,60 @@ def get_coordinates_epsg3006_from_geohash(geohash:str, outProj:str='epsg:3006')
     """
     # Get the coordinates from the H3 geohash
     latitude, longitude = h3.h3_to_geo(geohash)
-    in_proj = Proj(init='epsg:4326')
     # Convert coordinates to SWEREF99TM
-    x, y = transform(in_proj, outProj, longitude, latitude)
+    x, y = reproject_coordinates(longitude, latitude, inProj='epsg:4326', outProj=outProj)
     return x, y
+
+
+def get_coordinates_epsg3006_from_geohash_array(geohashes, outProj:str='epsg:3006', boundaries:bool=False) -> tuple:
+    """Convert an array of H3 geohashes to SWEREF99TM coordinates of the cell centers.
+
+    Each distinct geohash is decoded once, all centers are reprojected in a single call with a cached
+    transformer, and the results are scattered back to input order.
+
+    Args:
+        geohashes (array-like): The H3 geohashes, either as strings or as uint64 integers.
+        outProj (str, optional): The output projection system as an EPSG string. Defaults to 'epsg:3006'.
+        boundaries (bool, optional): If True, also return the cell boundary polygons. Defaults to False.
+
+    Returns:
+        tuple: The coordinates as a tuple of NumPy arrays containing x and y, in input order.
+            If `boundaries` is True, the tuple also contains `boundary_x`, `boundary_y` and `offsets`:
+            the vertices of the polygon of the i-th geohash are `boundary_x[offsets[i]:offsets[i + 1]]`
+            and `boundary_y[offsets[i]:offsets[i + 1]]`.
+
+    Usage:
+        `x, y = get_coordinates_epsg3006_from_geohash_array(['89088661d5bffff', '89088661d5bffff'])`
+
+    """
+    geohashes = np.asarray(geohashes)
+    if np.issubdtype(geohashes.dtype, np.integer):
+        h3_api = h3.api.basic_int
+        unique_geohashes, inverse = np.unique(geohashes.astype(np.uint64).ravel(), return_inverse=True)
+        unique_geohashes = [int(geohash) for geohash in unique_geohashes]
+    else:
+        h3_api = h3
+        unique_geohashes, inverse = np.unique(geohashes.astype(str).ravel(), return_inverse=True)
+        unique_geohashes = unique_geohashes.tolist()
+
+    # Decode each distinct cell once, then reproject all centers in one call
+    centers = np.array([h3_api.h3_to_geo(geohash) for geohash in unique_geohashes], dtype=np.float64).reshape(-1, 2)
+    longitudes, latitudes = np.ascontiguousarray(centers[:, 1]), np.ascontiguousarray(centers[:, 0])
+    x, y = reproject_coordinates_array(longitudes, latitudes, inProj='epsg:4326', outProj=outProj, out_x=longitudes, out_y=latitudes)
+
+    if not boundaries:
+        return x[inverse], y[inverse]
+
+    polygons = [h3_api.h3_to_geo_boundary(geohash) for geohash in unique_geohashes]
+    counts = np.array([len(polygon) for polygon in polygons], dtype=np.int64)
+    unique_offsets = np.concatenate(([0], np.cumsum(counts)))
+    vertices = np.array([vertex for polygon in polygons for vertex in polygon], dtype=np.float64).reshape(-1, 2)
+    vertex_longitudes, vertex_latitudes = np.ascontiguousarray(vertices[:, 1]), np.ascontiguousarray(vertices[:, 0])
+    boundary_x, boundary_y = reproject_coordinates_array(vertex_longitudes, vertex_latitudes, inProj='epsg:4326', outProj=outProj,
+                                                         out_x=vertex_longitudes, out_y=vertex_latitudes)
+
+    # Gather the vertices of every input geohash, in input order
+    input_counts = counts[inverse]
+    offsets = np.concatenate(([0], np.cumsum(input_counts)))
+    vertex_index = np.repeat(unique_offsets[inverse] - offsets[:-1], input_counts) + np.arange(offsets[-1])
+    return x[inverse], y[inverse], boundary_x[vertex_index], boundary_y[vertex_index], offsets
@@ -1,4 +1,5 @@
 from .utils import module_from_spec, script_as_module, \
     spec_from_file_location, create_subdirectory, \
     str_as_dtype, colnames_dtype_mapping, get_nested_dict_value, \
-    get_dynamic_nested_key_value, find_value_in_dict
+    get_dynamic_nested_key_value, find_value_in_dict, check_nested_dict
+from .serialization import YamlBackend, PyYamlBackend, get_yaml_backend, set_yaml_backend, available_yaml_backends
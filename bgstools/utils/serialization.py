@@ -0,0 +1,132 @@
+"""
+The YAML serialization layer of bgstools. Every YAML read and write of the package goes through `safe_load`,
+`safe_dump` and `parse`, which use the current backend: libyaml (`CSafeLoader`/`CSafeDumper`) when PyYAML was
+built with it, the pure-Python `SafeLoader`/`SafeDumper` otherwise, or any backend set with `set_yaml_backend`.
+
+Usage:
+    ```
+    from bgstools.utils import serialization
+    serialization.set_yaml_backend('python')
+    data = serialization.safe_load('APP: {SURVEYS: {}}')
+    ```
+"""
+import threading
+from abc import ABC, abstractmethod
+from typing import Iterator, Optional, Union
+import yaml
+
+
+class YamlBackend(ABC):
+    """
+    The interface of a YAML backend. Subclasses must implement `safe_load` and `safe_dump` with the semantics
+    of `yaml.safe_load` and `yaml.safe_dump`; `parse` defaults to the pure-Python PyYAML parser.
+    """
+
+    name = 'custom'
+
+    @abstractmethod
+    def safe_load(self, stream):
+        pass
+
+    @abstractmethod
+    def safe_dump(self, data, stream=None, **kwargs):
+        pass
+
+    def parse(self, stream) -> Iterator[yaml.Event]:
+        return yaml.parse(stream, Loader=yaml.SafeLoader)
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.name!r})'
+
+
+class PyYamlBackend(YamlBackend):
+    """A YAML backend using PyYAML with the given loader and dumper classes."""
+
+    def __init__(self, name:str, loader:type, dumper:type):
+        self.name = name
+        self.loader = loader
+        self.dumper = dumper
+        self._libyaml_emitter = yaml.__with_libyaml__ and issubclass(dumper, yaml.cyaml.CEmitter)
+
+    def safe_load(self, stream):
+        return yaml.load(stream, Loader=self.loader)
+
+    def safe_dump(self, data, stream=None, **kwargs):
+        if self._libyaml_emitter and kwargs.get('width') == float('inf'):
+            # The libyaml emitter takes an integer width, and a negative one means unlimited
+            kwargs['width'] = -1
+        return yaml.dump(data, stream, Dumper=self.dumper, **kwargs)
+
+    def parse(self, stream) -> Iterator[yaml.Event]:
+        return yaml.parse(stream, Loader=self.loader)
+
+
+PYTHON_BACKEND = PyYamlBackend('python', yaml.SafeLoader, yaml.SafeDumper)
+LIBYAML_BACKEND = PyYamlBackend('libyaml', yaml.CSafeLoader, yaml.CSafeDumper) if yaml.__with_libyaml__ else None
+
+_backends = {backend.name: backend for backend in (PYTHON_BACKEND, LIBYAML_BACKEND) if backend is not None}
+_backend = LIBYAML_BACKEND or PYTHON_BACKEND
+_lock = threading.Lock()
+
+
+def available_yaml_backends() -> list:
+    """The names of the built-in backends available in this environment, fastest first."""
+    return sorted(_backends, key=lambda name: name != 'libyaml')
+
+
+def get_yaml_backend(name:Optional[str] = None) -> YamlBackend:
+    """
+    Get the current backend, or a built-in backend by name.
+
+    Args:
+        name (str, optional): The name of a built-in backend ('libyaml' or 'python'). Defaults to None, the backend
+            used by `safe_load`, `safe_dump` and `parse`.
+
+    Returns:
+        YamlBackend: The backend.
+
+    Raises:
+        ValueError: If the backend name is unknown or not available, e.g. 'libyaml' when PyYAML was built without it.
+    """
+    if name is None:
+        return _backend
+    if name not in _backends:
+        raise ValueError(f"YAML backend `{name}` is not available, choose from {available_yaml_backends()}")
+    return _backends[name]
+
+
+def set_yaml_backend(backend:Union[str, YamlBackend]) -> YamlBackend:
+    """
+    Set the backend used by every YAML read and write of the package.
+
+    Args:
+        backend (str | YamlBackend): The name of a built-in backend ('libyaml' or 'python'), or a YamlBackend instance.
+
+    Returns:
+        YamlBackend: The previous backend, so that it can be restored.
+
+    Raises:
+        ValueError: If the backend name is unknown or not available, e.g. 'libyaml' when PyYAML was built without it.
+    """
+    global _backend
+    if isinstance(backend, str):
+        backend = get_yaml_backend(backend)
+
+    with _lock:
+        previous, _backend = _backend, backend
+    return previous
+
+
+def safe_load(stream):
+    """Parse a YAML document from a string, bytes or a stream into Python objects, like `yaml.safe_load`."""
+    return _backend.safe_load(stream)
+
+
+def safe_dump(data, stream=None, **kwargs):
+    """Serialize Python objects to YAML, like `yaml.safe_dump`. Returns the document if `stream` is None."""
+    return _backend.safe_dump(data, stream, **kwargs)
+
+
+def parse(stream) -> Iterator[yaml.Event]:
+    """Parse a YAML stream into parser events, like `yaml.parse` with a safe loader."""
+    return _backend.parse(stream)
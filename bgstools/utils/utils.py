@@ -34,6 +34,29 @@ def find_value_in_dict(data:dict, search_value:str, nested_path:list=[])->list:
 
 
 
+def check_nested_dict(nested_dict:dict, keys_list:list):
+    """
+    Helper function to recursively search for keys in a nested dictionary.
+    
+    Parameters:
+    nested_dict (dict): The dictionary to search.
+    keys_list (list): The list of keys to check for.
+    
+    Returns:
+    bool: True if all keys are found, False otherwise.
+    """
+    for keys in keys_list:
+        temp_dict = nested_dict
+        for key in keys:
+            if key in temp_dict:
+                temp_dict = temp_dict[key]
+            else:
+                break
+        else:
+            return True
+    return False
+
+
 def get_dynamic_nested_key_value(data:dict, keys_list:list)->dict:
     """
     This function retrieves the value of a nested key in a dictionary,
@@ -1,9 +1,18 @@
 import unittest
 import os
+import datetime
+import time
 import yaml
+import asyncio
+import threading
+import multiprocessing
 from unittest.mock import patch, mock_open
 from tempfile import TemporaryDirectory
-from bgstools.datastorage import DataStore, YamlStorage, StorageStrategy
+from bgstools.datastorage import DataStore, YamlStorage, StorageStrategy, JournalStorage, SqliteStorage, update_and_store_data, to_plain_data, \
+    update_datastore, ConcurrentModificationError, ShardedYamlStorage, LazyShard, DotpointStore, DOTPOINT_DTYPE, \
+    LiveStatus, SessionYamlStorage, YamlDataRegistry
+from bgstools.datastorage.datastorage import _write_file_atomically, _write_behind_storages, _flush_at_exit, _get_umask
+from bgstools.datastorage.benchmark import generate_survey_data, run_benchmarks
 
 
 class TestStorageStrategy(unittest.TestCase):
@@ -70,6 +79,278 @@ class TestYamlStorage(unittest.TestCase):
         self.temp_dir.cleanup()
 
 
+class TestYamlStorageWriteBehind(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.file_path = os.path.join(self.temp_dir.name, "temp.yaml")
+
+    def read_file(self):
+        with open(self.file_path, 'r') as f:
+            return yaml.safe_load(f)
+
+    def test_rewrite_keeps_file_mode(self):
+        YamlStorage(file_path=self.file_path).store_data({"test_key": "test_value"})
+        self.assertEqual(os.stat(self.file_path).st_mode & 0o777, 0o666 & ~_get_umask())
+        os.chmod(self.file_path, 0o640)
+        YamlStorage(file_path=self.file_path).store_data({"test_key": "new_value"})
+        self.assertEqual(os.stat(self.file_path).st_mode & 0o777, 0o640)
+
+    def test_store_data_writes_new_data(self):
+        yaml_storage = YamlStorage(file_path=self.file_path)
+        yaml_storage.store_data({"test_key": "test_value"})
+        self.assertEqual(self.read_file(), {"test_key": "test_value"})
+        self.assertEqual(os.listdir(self.temp_dir.name), ["temp.yaml"])
+
+    def test_coalesces_until_flush(self):
+        yaml_storage = YamlStorage(file_path=self.file_path, write_behind=True, flush_interval=60, max_staleness=60)
+        for i in range(10):
+            yaml_storage.update_data(lambda data: {**data, "count": i})
+        self.assertTrue(yaml_storage.is_dirty)
+        self.assertFalse(os.path.exists(self.file_path))
+        yaml_storage.flush()
+        self.assertFalse(yaml_storage.is_dirty)
+        self.assertEqual(self.read_file(), {"count": 9})
+
+    def test_flushes_after_interval(self):
+        yaml_storage = YamlStorage(file_path=self.file_path, write_behind=True, flush_interval=0.05)
+        yaml_storage.store_data({"test_key": "test_value"})
+        time.sleep(0.5)
+        self.assertEqual(self.read_file(), {"test_key": "test_value"})
+
+    def test_bounded_staleness(self):
+        yaml_storage = YamlStorage(file_path=self.file_path, write_behind=True, flush_interval=0.2, max_staleness=0.3)
+        start = time.monotonic()
+        while not os.path.exists(self.file_path) and time.monotonic() - start < 2:
+            yaml_storage.store_data({"test_key": time.monotonic()})
+            time.sleep(0.05)
+        self.assertLess(time.monotonic() - start, 1)
+
+    def test_exit_flushes_live_storages_only(self):
+        storages = [YamlStorage(file_path=self.file_path, write_behind=True, flush_interval=60) for _ in range(3)]
+        del storages[1:]
+        registered = [storage for storage in _write_behind_storages.values() if storage.file_path == self.file_path]
+        self.assertEqual([id(storage) for storage in registered], [id(storages[0])])
+        storages[0].store_data({"test_key": "test_value"})
+        _flush_at_exit()
+        self.assertEqual(self.read_file(), {"test_key": "test_value"})
+
+    def test_load_data_flushes_pending_updates(self):
+        yaml_storage = YamlStorage(file_path=self.file_path, write_behind=True, flush_interval=60)
+        yaml_storage.store_data({"test_key": "test_value"})
+        yaml_storage.load_data()
+        self.assertEqual(self.read_file(), {"test_key": "test_value"})
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+
+class TestYamlStorageLoadCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.file_path = os.path.join(self.temp_dir.name, "temp.yaml")
+        self.yaml_storage = YamlStorage(file_path=self.file_path)
+        self.yaml_storage.store_data({"test_key": "test_value"})
+
+    def test_unchanged_file_is_not_parsed(self):
+        with patch('bgstools.datastorage.datastorage.serialization.safe_load') as safe_load:
+            self.yaml_storage.load_data()
+            self.yaml_storage.load_data()
+        safe_load.assert_not_called()
+        self.assertEqual(self.yaml_storage.data, {"test_key": "test_value"})
+
+    def test_changed_file_is_parsed(self):
+        YamlStorage(file_path=self.file_path).store_data({"test_key": "new_value"})
+        self.yaml_storage.load_data()
+        self.assertEqual(self.yaml_storage.data, {"test_key": "new_value"})
+
+    def test_non_utf8_file(self):
+        with open(self.file_path, 'wb') as f:
+            f.write("STATIONS:\n- Malmö hamn\n- Göteborg södra älvstranden\n- Växjö sjö\n".encode('latin-1'))
+        self.yaml_storage.load_data()
+        self.assertEqual(self.yaml_storage.data["STATIONS"][0], "Malmö hamn")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+
+class TestYamlStorageSnapshotCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.file_path = os.path.join(self.temp_dir.name, "survey.yaml")
+        self.data = generate_survey_data(3, n_frames=2)
+        YamlStorage(file_path=self.file_path, snapshot_cache=True).store_data(self.data)
+
+    def test_load_from_snapshot(self):
+        self.assertTrue(os.path.isfile(self.file_path + ".snapshot"))
+        with patch('bgstools.datastorage.datastorage.serialization.safe_load') as safe_load:
+            yaml_storage = YamlStorage(file_path=self.file_path, snapshot_cache=True)
+        safe_load.assert_not_called()
+        self.assertEqual(yaml_storage.data, self.data)
+
+    def test_edited_yaml_invalidates_snapshot(self):
+        with open(self.file_path, 'a') as f:
+            f.write("EDITED: true\n")
+        yaml_storage = YamlStorage(file_path=self.file_path, snapshot_cache=True)
+        self.assertTrue(yaml_storage.data["EDITED"])
+        with patch('bgstools.datastorage.datastorage.serialization.safe_load') as safe_load:
+            self.assertTrue(YamlStorage(file_path=self.file_path, snapshot_cache=True).data["EDITED"])
+        safe_load.assert_not_called()
+
+    def test_corrupt_snapshot_falls_back_to_yaml(self):
+        with open(self.file_path + ".snapshot", 'r+b') as f:
+            f.truncate(40)
+        self.assertEqual(YamlStorage(file_path=self.file_path, snapshot_cache=True).data, self.data)
+
+    def test_delete_data_removes_snapshot(self):
+        YamlStorage(file_path=self.file_path, snapshot_cache=True).delete_data()
+        self.assertFalse(os.path.exists(self.file_path + ".snapshot"))
+
+    def test_run_benchmarks(self):
+        report = run_benchmarks(stations=(5, 10), n_frames=2, repeat=1)
+        self.assertEqual([result['n_stations'] for result in report['results']], [5, 10])
+        self.assertTrue(all(result['snapshot_bytes'] > 0 for result in report['results']))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+
+class TestJournalStorage(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.file_path = os.path.join(self.temp_dir.name, "survey.yaml")
+        self.data_store = DataStore(JournalStorage(file_path=self.file_path))
+        self.data_store.store_data({"APP": {"SURVEYS": {"SURVEY_1": {"STATUS": "NOT_STARTED", "DOTPOINTS": {}}}}})
+        self.data = self.data_store.load_data()
+
+    def test_update_appends_to_journal(self):
+        snapshot_size = os.path.getsize(self.file_path)
+        for i in range(3):
+            update_and_store_data(self.data, ["APP", "SURVEYS", "SURVEY_1", "DOTPOINTS", i], {"x": i, "y": 2 * i}, self.data_store)
+        self.assertEqual(os.path.getsize(self.file_path), snapshot_size)
+        with open(self.file_path + ".journal", "r") as f:
+            self.assertEqual(len(f.readlines()), 4)
+        self.assertEqual(JournalStorage(file_path=self.file_path).data, self.data)
+
+    def test_compaction(self):
+        storage = JournalStorage(file_path=self.file_path, compaction_threshold=200)
+        data_store = DataStore(storage)
+        for i in range(20):
+            update_and_store_data(storage.data, ["APP", "SURVEYS", "SURVEY_1", "DOTPOINTS", i], {"x": i}, data_store)
+        self.assertLess(os.path.getsize(self.file_path + ".journal"), 300)
+        self.assertEqual(len(JournalStorage(file_path=self.file_path).data["APP"]["SURVEYS"]["SURVEY_1"]["DOTPOINTS"]), 20)
+
+    def test_replay_through_list_index(self):
+        self.data_store.store_data({"STATIONS": [{"NAME": "x"}, {"NAME": "y"}]})
+        data = self.data_store.load_data()
+        update_and_store_data(data, ["STATIONS", 1, "NAME"], "z", self.data_store)
+        self.assertEqual(JournalStorage(file_path=self.file_path).data, {"STATIONS": [{"NAME": "x"}, {"NAME": "z"}]})
+
+    def test_non_utf8_snapshot(self):
+        with open(self.file_path, 'w', encoding='latin-1') as f:
+            yaml.safe_dump({"NOTES": "Sjöbotten, Ålandshav, Österström, Skärgårdsö"}, f, allow_unicode=True)
+        os.remove(self.file_path + ".journal")
+        data_store = DataStore(JournalStorage(file_path=self.file_path))
+        self.assertEqual(data_store.load_data(), YamlStorage(file_path=self.file_path).data)
+        update_and_store_data(data_store.load_data(), ["STATUS"], "IN_PROGRESS", data_store)
+        self.assertEqual(JournalStorage(file_path=self.file_path).data,
+                         {"NOTES": "Sjöbotten, Ålandshav, Österström, Skärgårdsö", "STATUS": "IN_PROGRESS"})
+
+    def test_stale_journal_is_ignored(self):
+        update_and_store_data(self.data, ["APP", "SURVEYS", "SURVEY_1", "STATUS"], "IN_PROGRESS", self.data_store)
+        with open(self.file_path + ".journal", "rb") as f:
+            journal = f.read()
+        self.data_store.store_data({"APP": {}})
+        # Simulate a crash after the new snapshot was written but before the journal was reset
+        with open(self.file_path + ".journal", "wb") as f:
+            f.write(journal)
+        self.assertEqual(JournalStorage(file_path=self.file_path).data, {"APP": {}})
+
+    def test_torn_entry_is_discarded(self):
+        update_and_store_data(self.data, ["APP", "SURVEYS", "SURVEY_1", "STATUS"], "IN_PROGRESS", self.data_store)
+        with open(self.file_path + ".journal", "ab") as f:
+            f.write(b"{path: [APP, SURVEYS, SURVEY_1, STATUS], val")
+        storage = JournalStorage(file_path=self.file_path)
+        self.assertEqual(storage.data, self.data)
+        update_and_store_data(storage.data, ["APP", "SURVEYS", "SURVEY_1", "STATUS"], "COMPLETED", DataStore(storage))
+        self.assertEqual(JournalStorage(file_path=self.file_path).data["APP"]["SURVEYS"]["SURVEY_1"]["STATUS"], "COMPLETED")
+
+    def test_delete_data(self):
+        self.data_store.delete_data()
+        self.assertFalse(os.path.exists(self.file_path))
+        self.assertFalse(os.path.exists(self.file_path + ".journal"))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+
+class TestSqliteStorage(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.file_path = os.path.join(self.temp_dir.name, "survey.sqlite")
+        self.data = {"APP": {"SURVEYS": {"SURVEY_1": {"STATUS": "NOT_STARTED", "DOTPOINTS": {}, "FRAMES": [1, 2]}}, "CONFIG": {1: "one"}}}
+        self.data_store = DataStore(SqliteStorage(file_path=self.file_path))
+        self.data_store.store_data(self.data)
+
+    def test_round_trip(self):
+        self.assertEqual(to_plain_data(SqliteStorage(file_path=self.file_path).data), self.data)
+
+    def test_update_and_store_data(self):
+        data = self.data_store.load_data()
+        update_and_store_data(data, ["APP", "SURVEYS", "SURVEY_1", "DOTPOINTS"], {"P1": {"x": 1, "y": 2}}, self.data_store)
+        update_and_store_data(data, ["APP", "SURVEYS", "SURVEY_1", "FRAMES", 0], 3, self.data_store)
+        storage = SqliteStorage(file_path=self.file_path)
+        self.assertEqual(storage.get_value(["APP", "SURVEYS", "SURVEY_1", "DOTPOINTS", "P1"]), {"x": 1, "y": 2})
+        self.assertEqual(storage.get_value(["APP", "SURVEYS", "SURVEY_1", "FRAMES"]), [3, 2])
+
+    def test_lazy_loading(self):
+        storage = SqliteStorage(file_path=self.file_path)
+        self.assertEqual(storage.data["APP"]["SURVEYS"]["SURVEY_1"]["STATUS"], "NOT_STARTED")
+        self.assertNotIn("CONFIG", storage.data["APP"]._children)
+
+    def test_child_keys_skip_subtrees(self):
+        data = {"A": {f"STATION_{i}": {"FRAMES": {j: {"x": j} for j in range(50)}} for i in range(3)}, "B": 1, "C": {}, "": 2}
+        self.data_store.store_data(data)
+        storage = SqliteStorage(file_path=self.file_path)
+        rows = []
+        storage._db().set_trace_callback(rows.append)
+        self.assertEqual(list(storage.data), ["", "A", "B", "C"])
+        self.assertEqual(list(storage.data["A"]), ["STATION_0", "STATION_1", "STATION_2"])
+        # One single-row lookup per key plus one past the last, and two to read the node at "A"
+        self.assertEqual(len(rows), (4 + 1) + 2 + (3 + 1))
+        self.assertEqual(to_plain_data(storage.data), data)
+
+    def test_date_keys(self):
+        data = {"APP": {"SAMPLING": {datetime.date(2023, 5, 1): {"STATUS": "DONE"}, "2023-05-01": "text"}}}
+        self.data_store.store_data(data)
+        storage = SqliteStorage(file_path=self.file_path)
+        self.assertEqual(to_plain_data(storage.data), data)
+        self.assertEqual(storage.get_value(["APP", "SAMPLING", datetime.date(2023, 5, 1), "STATUS"]), "DONE")
+        update_and_store_data(storage.data, ["APP", "SAMPLING", datetime.date(2023, 5, 1), "STATUS"], "REDO", DataStore(storage))
+        self.assertEqual(SqliteStorage(file_path=self.file_path).get_value(["APP", "SAMPLING"]),
+                         {datetime.date(2023, 5, 1): {"STATUS": "REDO"}, "2023-05-01": "text"})
+
+    def test_transaction(self):
+        storage = self.data_store.storage_strategy
+        with self.assertRaises(RuntimeError):
+            with storage.transaction():
+                storage.set_value(["APP", "SELECTED_SURVEY"], "SURVEY_1")
+                raise RuntimeError
+        self.assertIsNone(SqliteStorage(file_path=self.file_path).get_value(["APP", "SELECTED_SURVEY"]))
+        with storage.transaction():
+            storage.set_value(["APP", "SELECTED_SURVEY"], "SURVEY_1")
+            storage.set_value(["APP", "SELECTED_STATION"], "STATION_1")
+        self.assertEqual(SqliteStorage(file_path=self.file_path).get_value(["APP", "SELECTED_STATION"]), "STATION_1")
+
+    def test_delete_data(self):
+        self.data_store.delete_data()
+        self.assertFalse(os.path.exists(self.file_path))
+        self.assertEqual(self.data_store.load_data(), {})
+
+    def tearDown(self):
+        self.data_store.storage_strategy.close()
+        self.temp_dir.cleanup()
+
+
 class TestDataStore(unittest.TestCase):
     def setUp(self):
         self.temp_dir = TemporaryDirectory()
@@ -103,5 +384,524 @@ class TestDataStore(unittest.TestCase):
         self.temp_dir.cleanup()
 
 
+class RecordingStorage(StorageStrategy):
+    def __init__(self):
+        super().__init__()
+        self.stored_paths = []
+
+    def store_paths(self, data, paths):
+        self.stored_paths.append(paths)
+        self.store_data(data)
+
+
+class TestDataStoreDirtyPaths(unittest.TestCase):
+    def setUp(self):
+        self.storage_strategy = RecordingStorage()
+        self.data_store = DataStore(self.storage_strategy)
+        self.data_store.store_data({"SELECTED_SURVEY": "SURVEY_1", "APP": {"SURVEYS": {"SURVEY_1": {"STATUS": "NOT_STARTED"}}}})
+
+    def test_update_datastore_skips_unchanged(self):
+        update_datastore(self.data_store, {"SELECTED_SURVEY": "SURVEY_1"})
+        self.assertEqual(self.data_store.write_stats, {"performed": 1, "skipped": 1})
+        update_datastore(self.data_store, {"SELECTED_SURVEY": "SURVEY_2", "SELECTED_STATION": "STATION_1"})
+        self.assertEqual(self.data_store.write_stats, {"performed": 2, "skipped": 1})
+        self.assertEqual(sorted(self.storage_strategy.stored_paths[-1]), [["SELECTED_STATION"], ["SELECTED_SURVEY"]])
+
+    def test_update_and_store_data_skips_unchanged(self):
+        data = self.data_store.load_data()
+        update_and_store_data(data, ["APP", "SURVEYS", "SURVEY_1", "STATUS"], "NOT_STARTED", self.data_store)
+        self.assertEqual(self.storage_strategy.stored_paths, [])
+        update_and_store_data(data, ["APP", "SURVEYS", "SURVEY_1", "STATUS"], "COMPLETED", self.data_store)
+        self.assertEqual(self.storage_strategy.stored_paths, [[["APP", "SURVEYS", "SURVEY_1", "STATUS"]]])
+        self.assertEqual(self.data_store.write_stats, {"performed": 2, "skipped": 1})
+
+    def test_update_and_store_data_with_bare_strategy(self):
+        with TemporaryDirectory() as dirpath:
+            file_path = os.path.join(dirpath, "survey.yaml")
+            storage = YamlStorage(file_path=file_path)
+            storage.store_data({"A": {"B": 1}})
+            update_and_store_data(storage.data, ["A", "B"], 2, storage)
+            self.assertEqual(YamlStorage(file_path=file_path).data, {"A": {"B": 2}})
+
+        update_and_store_data(self.storage_strategy.data, ["SELECTED_SURVEY"], "SURVEY_2", self.storage_strategy)
+        self.assertEqual(self.storage_strategy.stored_paths[-1], [["SELECTED_SURVEY"]])
+
+    def test_same_container_counts_as_changed(self):
+        data = self.data_store.load_data()
+        survey = data["APP"]["SURVEYS"]["SURVEY_1"]
+        survey["STATUS"] = "IN_PROGRESS"
+        update_and_store_data(data, ["APP", "SURVEYS", "SURVEY_1"], survey, self.data_store)
+        self.assertEqual(self.data_store.write_stats["skipped"], 0)
+
+    def test_type_change_counts_as_changed(self):
+        update_datastore(self.data_store, {"COUNT": 1})
+        update_datastore(self.data_store, {"COUNT": True})
+        self.assertEqual(self.data_store.write_stats["skipped"], 0)
+
+
+class TestLiveStatus(unittest.TestCase):
+    def setUp(self):
+        self.data_store = DataStore(StorageStrategy())
+        self.data_store.store_data({"SELECTED_SURVEY": "SURVEY_1", "SELECTED_STATION": None})
+        self.keys = ["SELECTED_SURVEY", "SELECTED_STATION"]
+
+    def test_reads_through(self):
+        status = LiveStatus(self.data_store, self.keys)
+        self.assertEqual(status.SELECTED_SURVEY, "SURVEY_1")
+        self.assertEqual(status.get_attributes(), {"SELECTED_SURVEY": "SURVEY_1"})
+        self.data_store.storage_strategy.data["SELECTED_STATION"] = "STATION_1"
+        self.assertEqual(status.SELECTED_STATION, "STATION_1")
+
+    def test_cache_is_invalidated_on_store(self):
+        status = LiveStatus(self.data_store, self.keys, cache=True)
+        self.assertIsNone(status.SELECTED_STATION)
+        self.data_store.storage_strategy.data["SELECTED_STATION"] = "STATION_1"
+        self.assertIsNone(status.SELECTED_STATION)
+        update_datastore(self.data_store, {"SELECTED_STATION": "STATION_2"})
+        self.assertEqual(status.SELECTED_STATION, "STATION_2")
+        self.assertEqual(status.get_attributes(), {"SELECTED_SURVEY": "SURVEY_1", "SELECTED_STATION": "STATION_2"})
+
+    def test_attributes_keep_declaration_order(self):
+        keys = [f"KEY_{i}" for i in range(20, 0, -1)]
+        update_datastore(self.data_store, {key: i for i, key in enumerate(sorted(keys))})
+        status = LiveStatus(self.data_store, keys + ["KEY_1"])
+        self.assertEqual(list(status.get_attributes()), keys)
+
+    def test_unknown_and_read_only_attributes(self):
+        status = LiveStatus(self.data_store, self.keys)
+        with self.assertRaises(AttributeError):
+            status.SELECTED_VIDEO_FILEPATH
+        with self.assertRaises(AttributeError):
+            status.SELECTED_SURVEY = "SURVEY_2"
+        self.assertIn("SELECTED_SURVEY", dir(status))
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            LiveStatus(object(), self.keys)
+        with self.assertRaises(TypeError):
+            LiveStatus(self.data_store, "SELECTED_SURVEY")
+
+
+class TestSessionYamlStorage(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.file_path = os.path.join(self.temp_dir.name, "survey.yaml")
+        self.data = generate_survey_data(3, n_frames=2)
+        with open(self.file_path, 'w') as f:
+            yaml.safe_dump(self.data, f)
+        self.registry = YamlDataRegistry()
+        self.stations_path = ["APP", "SURVEYS", "SURVEY_1", "STATIONS"]
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def open_session(self):
+        return DataStore(SessionYamlStorage(file_path=self.file_path, registry=self.registry))
+
+    def test_file_is_parsed_once(self):
+        self.open_session()
+        with patch('bgstools.datastorage.registry.serialization.safe_load') as safe_load:
+            sessions = [self.open_session() for _ in range(3)]
+        safe_load.assert_not_called()
+        self.assertEqual(len(self.registry), 1)
+        self.assertEqual(to_plain_data(sessions[0].load_data()), self.data)
+
+    def test_changes_are_private_until_stored(self):
+        first, second = self.open_session(), self.open_session()
+        first_data, second_data = first.load_data(), second.load_data()
+        first_data["APP"]["SURVEYS"]["SURVEY_1"]["STATIONS"]["STATION_1"]["STATUS"] = "COMPLETED"
+        first_data["SELECTED_SURVEY"] = "SURVEY_2"
+        self.assertEqual(second_data["APP"]["SURVEYS"]["SURVEY_1"]["STATIONS"]["STATION_1"]["STATUS"], "NOT_STARTED")
+        self.assertEqual(second_data["SELECTED_SURVEY"], "SURVEY_1")
+        self.assertEqual(self.registry.get_data(self.file_path), self.data)
+
+    def test_store_shares_unmodified_subtrees(self):
+        data_store = self.open_session()
+        data = data_store.load_data()
+        old_base = self.registry.get_data(self.file_path)
+        update_and_store_data(data, self.stations_path + ["STATION_1", "STATUS"], "COMPLETED", data_store)
+
+        new_base = self.registry.get_data(self.file_path)
+        self.assertIsNot(new_base, old_base)
+        new_stations, old_stations = (base["APP"]["SURVEYS"]["SURVEY_1"]["STATIONS"] for base in (new_base, old_base))
+        self.assertIs(new_stations["STATION_2"], old_stations["STATION_2"])
+        self.assertEqual(new_stations["STATION_1"]["STATUS"], "COMPLETED")
+        self.assertFalse(data.is_modified)
+
+        other = self.open_session().load_data()
+        self.assertEqual(other["APP"]["SURVEYS"]["SURVEY_1"]["STATIONS"]["STATION_1"]["STATUS"], "COMPLETED")
+        with open(self.file_path) as f:
+            self.assertEqual(yaml.safe_load(f)["APP"]["SURVEYS"]["SURVEY_1"]["STATIONS"]["STATION_1"]["STATUS"], "COMPLETED")
+
+    def test_lists_and_deletions(self):
+        data_store = self.open_session()
+        data = data_store.load_data()
+        frame = data["APP"]["SURVEYS"]["SURVEY_1"]["STATIONS"]["STATION_0"]["FRAMES"]["SEC_000000"]
+        frame["INTERPRETATION"]["DOTPOINTS"].append({"ID": 3})
+        del data["APP"]["SURVEYS"]["SURVEY_1"]["STATIONS"]["STATION_2"]
+        self.assertEqual(len(self.registry.get_data(self.file_path)["APP"]["SURVEYS"]["SURVEY_1"]["STATIONS"]["STATION_0"]
+                             ["FRAMES"]["SEC_000000"]["INTERPRETATION"]["DOTPOINTS"]), 3)
+        data_store.store_data(data)
+        stored = self.registry.get_data(self.file_path)["APP"]["SURVEYS"]["SURVEY_1"]["STATIONS"]
+        self.assertEqual(sorted(stored), ["STATION_0", "STATION_1"])
+        self.assertEqual(len(stored["STATION_0"]["FRAMES"]["SEC_000000"]["INTERPRETATION"]["DOTPOINTS"]), 4)
+
+    def test_reading_lists_is_not_a_change(self):
+        data_store = self.open_session()
+        data = data_store.load_data()
+        frame = data["APP"]["SURVEYS"]["SURVEY_1"]["STATIONS"]["STATION_0"]["FRAMES"]["SEC_000000"]
+        self.assertEqual(len(frame["INTERPRETATION"]["DOTPOINTS"]), 3)
+        self.assertFalse(data.is_modified)
+        with patch('bgstools.datastorage.registry._write_file_atomically') as write_file:
+            data_store.store_data(data)
+        write_file.assert_not_called()
+
+        frame["INTERPRETATION"]["DOTPOINTS"].pop()
+        self.assertTrue(data.is_modified)
+        data_store.store_data(data)
+        stored = self.registry.get_data(self.file_path)["APP"]["SURVEYS"]["SURVEY_1"]["STATIONS"]["STATION_0"]
+        self.assertEqual(len(stored["FRAMES"]["SEC_000000"]["INTERPRETATION"]["DOTPOINTS"]), 2)
+
+    def test_file_change_on_disk_invalidates(self):
+        data_store = self.open_session()
+        with open(self.file_path, 'w') as f:
+            yaml.safe_dump({"SELECTED_SURVEY": "SURVEY_3"}, f)
+        self.assertEqual(to_plain_data(data_store.load_data()), {"SELECTED_SURVEY": "SURVEY_3"})
+
+
+class TestDataStoreAsync(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.file_path = os.path.join(self.temp_dir.name, "survey.yaml")
+        self.data_store = DataStore(YamlStorage(file_path=self.file_path))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    async def test_store_and_load(self):
+        await self.data_store.astore_data({"SELECTED_SURVEY": "SURVEY_1"})
+        other = DataStore(YamlStorage(file_path=self.file_path))
+        self.assertEqual(await other.aload_data(), {"SELECTED_SURVEY": "SURVEY_1"})
+        await other.aupdate_data(lambda data: {**data, "SELECTED_STATION": "STATION_1"})
+        self.assertEqual(YamlStorage(file_path=self.file_path).data["SELECTED_STATION"], "STATION_1")
+
+    async def test_concurrent_loads_are_coalesced(self):
+        calls = []
+        release = threading.Event()
+
+        def slow_load():
+            calls.append(1)
+            release.wait(5)
+
+        with patch.object(self.data_store.storage_strategy, 'load_data', side_effect=slow_load):
+            loads = [asyncio.ensure_future(self.data_store.aload_data()) for _ in range(5)]
+            await asyncio.sleep(0.05)
+            release.set()
+            await asyncio.gather(*loads)
+            self.assertEqual(len(calls), 1)
+            await self.data_store.aload_data()
+            self.assertEqual(len(calls), 2)
+
+    async def test_writers_are_serialized_and_loop_is_not_blocked(self):
+        active, overlaps = [], []
+        store_data = self.data_store.storage_strategy.store_data
+
+        def slow_store(data):
+            active.append(1)
+            overlaps.append(len(active) > 1)
+            time.sleep(0.02)
+            store_data(data)
+            active.pop()
+
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.001)
+
+        ticker_task = asyncio.ensure_future(ticker())
+        with patch.object(self.data_store.storage_strategy, 'store_data', side_effect=slow_store):
+            await asyncio.gather(*(self.data_store.astore_data({"COUNTER": i}) for i in range(5)))
+        ticker_task.cancel()
+
+        self.assertFalse(any(overlaps))
+        self.assertGreater(ticks, 5)
+        self.assertEqual(YamlStorage(file_path=self.file_path).data, {"COUNTER": 4})
+
+
+class TestShardedYamlStorage(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.dirpath = os.path.join(self.temp_dir.name, "survey_datastore")
+        self.data = generate_survey_data(3, n_frames=2)
+        DataStore(ShardedYamlStorage(dirpath=self.dirpath, shard_depth=5)).store_data(self.data)
+        self.data_store = DataStore(ShardedYamlStorage(dirpath=self.dirpath, shard_depth=5))
+        self.stations_path = ["APP", "SURVEYS", "SURVEY_1", "STATIONS"]
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def shard_file(self, station):
+        return os.path.join(self.dirpath, "shards", "APP", "SURVEYS", "SURVEY_1", "STATIONS", f"{station}.yaml")
+
+    def test_one_file_per_shard(self):
+        for station in ("STATION_0", "STATION_1", "STATION_2"):
+            with open(self.shard_file(station)) as f:
+                self.assertEqual(yaml.safe_load(f), self.data["APP"]["SURVEYS"]["SURVEY_1"]["STATIONS"][station])
+        with open(os.path.join(self.dirpath, "root.yaml")) as f:
+            self.assertNotIn("FRAMES", f.read())
+
+    def test_shards_are_loaded_lazily(self):
+        data = self.data_store.load_data()
+        stations = data["APP"]["SURVEYS"]["SURVEY_1"]["STATIONS"]
+        self.assertIsInstance(stations["STATION_1"], LazyShard)
+        self.assertFalse(stations["STATION_1"].is_loaded)
+        self.assertEqual(stations["STATION_1"]["STATUS"], "NOT_STARTED")
+        self.assertTrue(stations["STATION_1"].is_loaded)
+        self.assertFalse(stations["STATION_2"].is_loaded)
+        self.assertEqual(to_plain_data(data), self.data)
+
+    def test_only_modified_shard_is_written(self):
+        data = self.data_store.load_data()
+        data["APP"]["SURVEYS"]["SURVEY_1"]["STATIONS"]["STATION_2"]["STATUS"]
+        with patch('bgstools.datastorage.shardedstorage._write_file_atomically') as write_file:
+            update_and_store_data(data, self.stations_path + ["STATION_1", "STATUS"], "COMPLETED", self.data_store)
+        self.assertEqual([call.args[0] for call in write_file.call_args_list], [self.shard_file("STATION_1")])
+
+    def test_store_data_writes_changed_shards_only(self):
+        data = self.data_store.load_data()
+        data["APP"]["SURVEYS"]["SURVEY_1"]["STATIONS"]["STATION_0"]["STATUS"]
+        data["APP"]["SURVEYS"]["SURVEY_1"]["STATIONS"]["STATION_2"]["STATUS"] = "COMPLETED"
+        with patch('bgstools.datastorage.shardedstorage._write_file_atomically', wraps=_write_file_atomically) as write_file:
+            self.data_store.store_data(data)
+        self.assertEqual([call.args[0] for call in write_file.call_args_list], [self.shard_file("STATION_2")])
+        reloaded = ShardedYamlStorage(dirpath=self.dirpath, shard_depth=5).data
+        self.assertEqual(reloaded["APP"]["SURVEYS"]["SURVEY_1"]["STATIONS"]["STATION_2"]["STATUS"], "COMPLETED")
+
+    def test_new_and_removed_shards(self):
+        data = self.data_store.load_data()
+        stations = data["APP"]["SURVEYS"]["SURVEY_1"]["STATIONS"]
+        del stations["STATION_0"]
+        stations["STATION_3"] = {"STATUS": "NOT_STARTED"}
+        self.data_store.store_data(data)
+        self.assertFalse(os.path.exists(self.shard_file("STATION_0")))
+        self.assertTrue(os.path.exists(self.shard_file("STATION_3")))
+        reloaded = to_plain_data(ShardedYamlStorage(dirpath=self.dirpath, shard_depth=5).data)
+        self.assertEqual(sorted(reloaded["APP"]["SURVEYS"]["SURVEY_1"]["STATIONS"]), ["STATION_1", "STATION_2", "STATION_3"])
+
+    def test_delete_data(self):
+        self.data_store.delete_data()
+        self.assertEqual(os.listdir(self.dirpath), [])
+
+    def test_key_named_like_the_root_file(self):
+        data_store = DataStore(ShardedYamlStorage(dirpath=os.path.join(self.temp_dir.name, "depth_1"), shard_depth=1))
+        data_store.store_data({"root": {"a": 1}, "root.yaml": {"c": 3}, "other": {"b": 2}})
+        reloaded = ShardedYamlStorage(dirpath=data_store.storage_strategy.dirpath, shard_depth=1)
+        self.assertEqual(to_plain_data(reloaded.data), {"root": {"a": 1}, "root.yaml": {"c": 3}, "other": {"b": 2}})
+
+    def test_non_utf8_files(self):
+        shard_file = self.shard_file("STATION_1")
+        with open(shard_file, 'w', encoding='latin-1') as f:
+            yaml.safe_dump({"STATUS": "NOT_STARTED", "NOTES": "Sjöbotten, Ålandshav, Österström, Skärgårdsö"}, f, allow_unicode=True)
+        data = ShardedYamlStorage(dirpath=self.dirpath, shard_depth=5).data
+        self.assertEqual(data["APP"]["SURVEYS"]["SURVEY_1"]["STATIONS"]["STATION_1"]["NOTES"],
+                         "Sjöbotten, Ålandshav, Österström, Skärgårdsö")
+
+
+class TestDotpointStore(unittest.TestCase):
+    def setUp(self):
+        self.frames = {
+            'SEC_000005': {'FILEPATH': 'frames/SEC_000005.png', 'INTERPRETATION': {'DOTPOINTS': {
+                0: {'x': 10, 'y': 20, 'annotation': 'Sand'},
+                1: {'x': 30, 'y': 40, 'annotation': None},
+                2: {'x': 50, 'y': 60, 'annotation': 'Mud', 'status': 'COMPLETED'},
+            }, 'STATUS': 'IN_PROGRESS'}},
+            'SEC_000010': {'FILEPATH': 'frames/SEC_000010.png', 'INTERPRETATION': {'DOTPOINTS': {}, 'STATUS': 'NOT_STARTED'}},
+        }
+        self.store = DotpointStore.from_frames(self.frames)
+
+    def test_from_frames(self):
+        self.assertEqual(len(self.store), 3)
+        self.assertEqual(self.store.frames, ['SEC_000005', 'SEC_000010'])
+        self.assertEqual(self.store.labels, ['Sand', 'Mud'])
+        points = self.store.get_points('SEC_000005')
+        self.assertEqual(points.dtype, DOTPOINT_DTYPE)
+        self.assertEqual(points['label'].tolist(), [0, -1, 1])
+
+    def test_dotpoints_view_has_dict_shape(self):
+        self.assertEqual(dict(self.store.dotpoints('SEC_000005')), self.frames['SEC_000005']['INTERPRETATION']['DOTPOINTS'])
+        self.assertEqual(dict(self.store.dotpoints('SEC_000010')), {})
+
+    def test_dotpoints_view_is_mutable(self):
+        dotpoints = self.store.dotpoints('SEC_000010')
+        dotpoints[7] = {'x': 1, 'y': 2, 'annotation': 'Rock'}
+        dotpoints[7] = {'x': 1, 'y': 2, 'annotation': 'Sand'}
+        self.assertEqual(dotpoints[7], {'x': 1.0, 'y': 2.0, 'annotation': 'Sand'})
+        del dotpoints[7]
+        self.assertEqual(len(dotpoints), 0)
+        with self.assertRaises(KeyError):
+            dotpoints[7]
+
+    def test_bulk_updates(self):
+        point_ids = self.store.add_points('SEC_000010', x=[1, 2, 3], y=[4, 5, 6])
+        self.assertEqual(point_ids.tolist(), [0, 1, 2])
+        self.store.set_labels('SEC_000010', [2, 0], ['Mud', 'Rock'])
+        self.store.set_statuses('SEC_000010', [1], ['COMPLETED'])
+        self.assertEqual([point['annotation'] for point in self.store.dotpoints('SEC_000010').values()], ['Rock', None, 'Mud'])
+        self.assertEqual(self.store.dotpoints('SEC_000010')[1]['status'], 'COMPLETED')
+        with self.assertRaises(KeyError):
+            self.store.set_labels('SEC_000010', [9], ['Mud'])
+        with self.assertRaises(ValueError):
+            self.store.add_points('SEC_000010', x=[1], y=[1], point_ids=[0])
+        with self.assertRaises(ValueError):
+            self.store.set_statuses('SEC_000010', [0], ['DONE'])
+
+    def test_coordinates_round_trip(self):
+        frames = {'SEC_000001': {'INTERPRETATION': {'DOTPOINTS': {0: {'x': 1234.567, 'y': 0.1, 'annotation': None}}}}}
+        store = DotpointStore.from_frames(frames)
+        self.assertEqual(store.dotpoints('SEC_000001')[0], {'x': 1234.567, 'y': 0.1, 'annotation': None})
+        self.assertEqual(store.to_frames({'SEC_000001': {}}), frames)
+
+    def test_point_ids_keep_their_type(self):
+        frames = {'SEC_000001': {'INTERPRETATION': {'DOTPOINTS': {
+            'P1': {'x': 1, 'y': 2, 'annotation': 'Sand'},
+            '2': {'x': 3, 'y': 4, 'annotation': None},
+            2: {'x': 5, 'y': 6, 'annotation': 'Mud'},
+        }}}}
+        store = DotpointStore.from_frames(frames)
+        dotpoints = store.dotpoints('SEC_000001')
+        self.assertEqual(list(dotpoints), ['P1', '2', 2])
+        self.assertEqual(dotpoints['2']['x'], 3.0)
+        self.assertEqual(store.add_points('SEC_000001', x=[7], y=[8]).tolist(), [3])
+        store.set_labels('SEC_000001', ['P1'], ['Rock'])
+        del dotpoints['2']
+        with TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, 'dotpoints.npz')
+            store.save(file_path)
+            loaded = DotpointStore.load(file_path)
+        self.assertEqual(dict(loaded.dotpoints('SEC_000001')), {
+            'P1': {'x': 1.0, 'y': 2.0, 'annotation': 'Rock'},
+            2: {'x': 5.0, 'y': 6.0, 'annotation': 'Mud'},
+            3: {'x': 7.0, 'y': 8.0, 'annotation': None},
+        })
+
+    def test_save_and_load(self):
+        with TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, 'dotpoints.npz')
+            self.store.save(file_path)
+            loaded = DotpointStore.load(file_path)
+        self.assertEqual(loaded.frames, self.store.frames)
+        self.assertEqual(loaded.labels, self.store.labels)
+        self.assertEqual(loaded.to_table().tolist(), self.store.to_table().tolist())
+        self.assertEqual(loaded.to_frames(self.frames), self.frames)
+
+
+def _update_own_keys(file_path, worker, n_updates):
+    # Each worker keeps its stale copy of the data and only ever loads it once
+    data_store = DataStore(YamlStorage(file_path=file_path, shared=True))
+    data = data_store.load_data()
+    for i in range(n_updates):
+        data.setdefault('WORKERS', {})
+        update_and_store_data(data, ['WORKERS'], {**data['WORKERS'], f'WORKER_{worker}_{i}': i}, data_store)
+
+
+def _increment_counter(file_path, n_updates):
+    data_store = DataStore(YamlStorage(file_path=file_path, shared=True))
+    for _ in range(n_updates):
+        data_store.update_data(lambda data: {**data, 'COUNTER': data.get('COUNTER', 0) + 1})
+
+
+def _read_repeatedly(file_path, n_reads, errors):
+    storage = YamlStorage(file_path=file_path, shared=True)
+    for _ in range(n_reads):
+        storage.load_data()
+        if not isinstance(storage.data, dict) or 'COUNTER' not in storage.data:
+            errors.value += 1
+
+
+class TestYamlStorageShared(unittest.TestCase):
+    N_PROCESSES = 4
+    N_UPDATES = 25
+
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.file_path = os.path.join(self.temp_dir.name, 'survey.yaml')
+        self.context = multiprocessing.get_context('fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _run(self, target, args_list):
+        processes = [self.context.Process(target=target, args=args) for args in args_list]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(60)
+            self.assertEqual(process.exitcode, 0)
+
+    def test_stale_writer_merges_instead_of_clobbering(self):
+        first = YamlStorage(file_path=self.file_path, shared=True)
+        first.store_data({'SELECTED_SURVEY': 'SURVEY_1', 'STATIONS': {'STATION_1': 'NOT_STARTED'}})
+        second = YamlStorage(file_path=self.file_path, shared=True)
+
+        second.data['STATIONS']['STATION_2'] = 'NOT_STARTED'
+        second.store_data(second.data)
+        first.data['SELECTED_SURVEY'] = 'SURVEY_2'
+        first.data['STATIONS']['STATION_1'] = 'COMPLETED'
+        first.store_data(first.data)
+
+        expected = {'SELECTED_SURVEY': 'SURVEY_2', 'STATIONS': {'STATION_1': 'COMPLETED', 'STATION_2': 'NOT_STARTED'}}
+        self.assertEqual(first.data, expected)
+        with open(self.file_path) as f:
+            self.assertEqual(yaml.safe_load(f), expected)
+        self.assertNotEqual(first.version, second.version)
+
+    def test_deletion_is_merged(self):
+        first = YamlStorage(file_path=self.file_path, shared=True)
+        first.store_data({'A': 1, 'B': 2})
+        second = YamlStorage(file_path=self.file_path, shared=True)
+        second.store_data({'A': 1, 'B': 2, 'C': 3})
+        del first.data['A']
+        first.store_data(first.data)
+        self.assertEqual(first.data, {'B': 2, 'C': 3})
+
+    def test_raise_on_conflict(self):
+        first = YamlStorage(file_path=self.file_path, shared=True, on_conflict='raise')
+        first.store_data({'A': 1})
+        second = YamlStorage(file_path=self.file_path, shared=True)
+        second.store_data({'A': 2})
+        with self.assertRaises(ConcurrentModificationError):
+            first.store_data({'A': 3})
+        first.load_data()
+        first.store_data({'A': 3})
+        self.assertEqual(YamlStorage(file_path=self.file_path).data, {'A': 3})
+
+    def test_invalid_on_conflict(self):
+        with self.assertRaises(ValueError):
+            YamlStorage(file_path=self.file_path, shared=True, on_conflict='ignore')
+
+    def test_concurrent_stale_writers(self):
+        YamlStorage(file_path=self.file_path, shared=True).store_data({'WORKERS': {}})
+        self._run(_update_own_keys, [(self.file_path, worker, self.N_UPDATES) for worker in range(self.N_PROCESSES)])
+
+        workers = YamlStorage(file_path=self.file_path).data['WORKERS']
+        self.assertEqual(len(workers), self.N_PROCESSES * self.N_UPDATES)
+
+    def test_concurrent_updates_and_readers(self):
+        YamlStorage(file_path=self.file_path, shared=True).store_data({'COUNTER': 0})
+        errors = self.context.Value('i', 0)
+        readers = [self.context.Process(target=_read_repeatedly, args=(self.file_path, 200, errors)) for _ in range(2)]
+        for reader in readers:
+            reader.start()
+        self._run(_increment_counter, [(self.file_path, self.N_UPDATES)] * self.N_PROCESSES)
+        for reader in readers:
+            reader.join(60)
+
+        self.assertEqual(YamlStorage(file_path=self.file_path).data['COUNTER'], self.N_PROCESSES * self.N_UPDATES)
+        self.assertEqual(errors.value, 0)
+
+
 if __name__ == '__main__':
     unittest.main()
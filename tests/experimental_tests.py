@@ -0,0 +1,103 @@
+import unittest
+from bgstools.experimental import PersistentMap, bulk_upsert, upsert_data
+
+
+class CollidingKey:
+    def __init__(self, value):
+        self.value = value
+
+    def __hash__(self):
+        return self.value % 3
+
+    def __eq__(self, other):
+        return isinstance(other, CollidingKey) and other.value == self.value
+
+
+class TestPersistentMap(unittest.TestCase):
+    def test_set_and_delete_keep_snapshots(self):
+        snapshots = [PersistentMap()]
+        for i in range(200):
+            snapshots.append(snapshots[-1].set(f'SEC_{i:06d}', i))
+        for i, snapshot in enumerate(snapshots):
+            self.assertEqual(len(snapshot), i)
+        self.assertEqual(snapshots[100]['SEC_000099'], 99)
+        self.assertNotIn('SEC_000100', snapshots[100])
+
+        deleted = snapshots[-1].delete('SEC_000050')
+        self.assertNotIn('SEC_000050', deleted)
+        self.assertIn('SEC_000050', snapshots[-1])
+        self.assertEqual(len(deleted), 199)
+        with self.assertRaises(KeyError):
+            deleted.delete('SEC_000050')
+
+    def test_update_is_equivalent_to_dict(self):
+        items = {i: str(i) for i in range(1000)}
+        persistent_map = PersistentMap(items)
+        self.assertEqual(dict(persistent_map.items()), items)
+        updated = persistent_map.update({0: 'zero', 1000: '1000'})
+        self.assertEqual((updated[0], updated[1000], len(updated)), ('zero', '1000', 1001))
+        self.assertEqual((persistent_map[0], len(persistent_map)), ('0', 1000))
+        self.assertIs(persistent_map.update({1: persistent_map[1]}), persistent_map)
+
+    def test_hash_collisions(self):
+        keys = [CollidingKey(i) for i in range(12)]
+        persistent_map = PersistentMap((key, key.value) for key in keys)
+        self.assertEqual([persistent_map[CollidingKey(i)] for i in range(12)], list(range(12)))
+        persistent_map = persistent_map.delete(CollidingKey(4))
+        self.assertNotIn(CollidingKey(4), persistent_map)
+        self.assertEqual(len(persistent_map), 11)
+
+    def test_nested_conversion(self):
+        data = {'APP': {'SURVEYS': {'SURVEY_1': {'STATUS': 'NOT_STARTED'}}}, 'SELECTED_SURVEY': 'SURVEY_1'}
+        persistent_map = PersistentMap.from_dict(data)
+        updated = persistent_map.set_in(['APP', 'SURVEYS', 'SURVEY_1', 'STATUS'], 'COMPLETED')
+        self.assertEqual(updated.get_in(['APP', 'SURVEYS', 'SURVEY_1', 'STATUS']), 'COMPLETED')
+        self.assertEqual(persistent_map.to_dict(), data)
+        self.assertIsNone(updated.get_in(['APP', 'MISSING']))
+
+
+class TestBulkUpsert(unittest.TestCase):
+    def setUp(self):
+        self.frames = {
+            'SEC_000005': {'FILEPATH': 'frames/SEC_000005.png', 'INTERPRETATION': {'DOTPOINTS': {}, 'STATUS': 'NOT_STARTED'}},
+            'SEC_000010': {'FILEPATH': 'frames/SEC_000010.png', 'INTERPRETATION': {'DOTPOINTS': {}, 'STATUS': 'NOT_STARTED'}},
+        }
+
+    def test_in_place(self):
+        result = bulk_upsert(self.frames, items={'SEC_000015': {}},
+                             paths=[([key, 'INTERPRETATION', 'STATUS'], 'COMPLETED') for key in ('SEC_000005', 'SEC_000010')])
+        self.assertIs(result, self.frames)
+        self.assertEqual([frame.get('INTERPRETATION', {}).get('STATUS') for frame in result.values()], ['COMPLETED', 'COMPLETED', None])
+
+    def test_copy_shares_unmodified_subtrees(self):
+        result = bulk_upsert(self.frames, paths=[(['SEC_000005', 'INTERPRETATION', 'STATUS'], 'COMPLETED')], copy=True)
+        self.assertEqual(self.frames['SEC_000005']['INTERPRETATION']['STATUS'], 'NOT_STARTED')
+        self.assertEqual(result['SEC_000005']['INTERPRETATION']['STATUS'], 'COMPLETED')
+        self.assertIs(result['SEC_000010'], self.frames['SEC_000010'])
+        self.assertIs(result['SEC_000005']['INTERPRETATION']['DOTPOINTS'], self.frames['SEC_000005']['INTERPRETATION']['DOTPOINTS'])
+
+    def test_no_overwrite_matches_upsert_data(self):
+        items = {'SEC_000005': {}, 'SEC_000020': {}}
+        expected = self.frames
+        for key, value in items.items():
+            expected = upsert_data(expected, key, value)
+        self.assertEqual(bulk_upsert(self.frames, items=items, overwrite=False, copy=True), expected)
+
+    def test_persistent_map(self):
+        persistent_map = PersistentMap.from_dict(self.frames)
+        result = bulk_upsert(persistent_map, items=[('SEC_000015', 'new')],
+                             paths=[(['SEC_000005', 'INTERPRETATION', 'STATUS'], 'COMPLETED')])
+        self.assertIsInstance(result, PersistentMap)
+        self.assertEqual(result.get_in(['SEC_000005', 'INTERPRETATION', 'STATUS']), 'COMPLETED')
+        self.assertEqual(persistent_map.get_in(['SEC_000005', 'INTERPRETATION', 'STATUS']), 'NOT_STARTED')
+        self.assertIs(result['SEC_000010'], persistent_map['SEC_000010'])
+
+    def test_last_value_wins(self):
+        result = bulk_upsert({}, paths=[(['A', 'B'], 1), (['A'], {'C': 2}), (['A', 'D'], 3)])
+        self.assertEqual(result, {'A': {'C': 2, 'D': 3}})
+        with self.assertRaises(ValueError):
+            bulk_upsert({}, paths=[([], 1)])
+
+
+if __name__ == '__main__':
+    unittest.main()
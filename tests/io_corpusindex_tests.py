@@ -0,0 +1,213 @@
+import datetime
+import os
+import shutil
+import tempfile
+import unittest
+import yaml
+from bgstools.io import YamlCorpusIndex, find_files_with_key_or_value, get_yaml_files_with_keys
+
+
+class TestYamlCorpusIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.dirpath = tempfile.mkdtemp()
+        self.surveys_dirpath = os.path.join(self.dirpath, 'surveys')
+        os.makedirs(os.path.join(self.surveys_dirpath, 'archive'))
+        self.index_filepath = os.path.join(self.dirpath, 'index.sqlite')
+        self.write('survey_1.yaml', {'APP': {'SURVEYS': {'Survey 1': {'FRAMES': {'FRAME_1': {'Data': 'v1'}}}}}})
+        self.write('archive/survey_2.yaml', {'APP': {'SURVEYS': {'Survey 2': {'FRAMES': {'FRAME_1': {'Data': 'v1'}}, 'TAGS': ['v1', 3]}}}})
+        self.write('notes.txt', 'v1')
+
+    def tearDown(self):
+        shutil.rmtree(self.dirpath)
+
+    def write(self, filename, data):
+        file_path = os.path.join(self.surveys_dirpath, filename)
+        with open(file_path, 'w') as f:
+            yaml.safe_dump(data, f)
+        # Make the change visible even on file systems with a coarse modification time
+        os.utime(file_path, ns=(0, os.stat(file_path).st_mtime_ns + 1_000_000_000))
+
+    def test_refresh_parses_only_changed_files(self):
+        with YamlCorpusIndex(self.index_filepath) as index:
+            self.assertEqual(index.refresh(self.surveys_dirpath), {'parsed': 2, 'unchanged': 0, 'removed': 0})
+            self.assertEqual(index.refresh(self.surveys_dirpath), {'parsed': 0, 'unchanged': 2, 'removed': 0})
+
+            self.write('survey_1.yaml', {'APP': {'SURVEYS': {'Survey 1': {'STATUS': 'v2'}}}})
+            os.remove(os.path.join(self.surveys_dirpath, 'archive', 'survey_2.yaml'))
+            self.assertEqual(index.refresh(self.surveys_dirpath), {'parsed': 1, 'unchanged': 0, 'removed': 1})
+            self.assertEqual(index.find_files_with_key_or_value('v1'), [])
+            self.assertEqual(len(index.find_files_with_key_or_value('v2')), 1)
+
+        # The index persists across instances
+        with YamlCorpusIndex(self.index_filepath) as index:
+            self.assertEqual(index.refresh(self.surveys_dirpath), {'parsed': 0, 'unchanged': 1, 'removed': 0})
+
+    def test_find_files_with_key_or_value(self):
+        with YamlCorpusIndex(self.index_filepath) as index:
+            index.refresh(self.surveys_dirpath)
+            results = index.find_files_with_key_or_value('v1')
+            self.assertEqual(results, [
+                {'yaml_file': 'survey_2.yaml', 'unknown_key': 'Data', 'value': 'v1',
+                 'nested_list': ['APP', 'SURVEYS', 'Survey 2', 'FRAMES', 'FRAME_1', 'Data']},
+                {'yaml_file': 'survey_2.yaml', 'unknown_key': 0, 'value': 'v1',
+                 'nested_list': ['APP', 'SURVEYS', 'Survey 2', 'TAGS', 0]},
+                {'yaml_file': 'survey_1.yaml', 'unknown_key': 'Data', 'value': 'v1',
+                 'nested_list': ['APP', 'SURVEYS', 'Survey 1', 'FRAMES', 'FRAME_1', 'Data']},
+            ])
+
+            # Keys match too, and their value is read from the file
+            results = index.find_files_with_key_or_value('FRAME_1')
+            self.assertEqual([result['value'] for result in results], [{'Data': 'v1'}, {'Data': 'v1'}])
+
+            # Values are matched as Python compares them
+            self.assertEqual(len(index.find_files_with_key_or_value(3.0)), 1)
+            self.assertEqual(index.find_files_with_key_or_value('3'), [])
+
+    def test_find_files_with_key_or_value_prefix(self):
+        with YamlCorpusIndex(self.index_filepath) as index:
+            index.refresh(self.surveys_dirpath)
+            results = index.find_files_with_key_or_value('Survey ', prefix=True)
+            self.assertEqual([result['nested_list'] for result in results],
+                             [['APP', 'SURVEYS', 'Survey 2'], ['APP', 'SURVEYS', 'Survey 1']])
+
+            # The prefix of a string does not match numbers, and the whole string is a prefix of itself
+            self.assertEqual(len(index.find_files_with_key_or_value('v', prefix=True)), 3)
+            self.assertEqual(index.find_files_with_key_or_value('v1', prefix=True), index.find_files_with_key_or_value('v1'))
+            self.assertEqual(len(index.find_files_with_key_or_value('', prefix=True, dirpath=os.path.join(self.surveys_dirpath, 'archive'))), 9)
+
+            with self.assertRaises(TypeError):
+                index.find_files_with_key_or_value(3, prefix=True)
+
+    def test_get_yaml_files_with_keys(self):
+        with YamlCorpusIndex(self.index_filepath) as index:
+            index.refresh(self.surveys_dirpath)
+            self.assertEqual(index.get_yaml_files_with_keys([['APP', 'SURVEYS', 'Survey 1'], ['APP', 'CONFIG']]),
+                             {'survey_1.yaml': True, 'survey_2.yaml': False})
+            self.assertEqual(index.get_yaml_files_with_keys([['APP', 'SURVEYS', 'Survey 2', 'TAGS']]),
+                             {'survey_1.yaml': False, 'survey_2.yaml': True})
+            # List positions are not keys
+            self.assertEqual(index.get_yaml_files_with_keys([['APP', 'SURVEYS', 'Survey 2', 'TAGS', 1]]),
+                             {'survey_1.yaml': False, 'survey_2.yaml': False})
+
+    def test_key_paths_match_plain_scan(self):
+        self.write('lists.yaml', {'A': [{'B': 1}, 'x'], 'C': {0: {'D': 2}}})
+        for keys in (['A'], ['A', 0], ['A', 0, 'B'], ['A', 1], ['C', 0], ['C', 0, 'D'], ['A', 'B']):
+            with self.subTest(keys=keys):
+                self.assertEqual(get_yaml_files_with_keys(self.surveys_dirpath, [keys], index_filepath=self.index_filepath),
+                                 get_yaml_files_with_keys(self.surveys_dirpath, [keys]))
+        with YamlCorpusIndex(self.index_filepath) as index:
+            self.assertTrue(index.get_yaml_files_with_keys([['C', 0, 'D']])['lists.yaml'])
+            self.assertFalse(index.get_yaml_files_with_keys([['A', 0, 'B']])['lists.yaml'])
+
+    def test_dates_keep_their_type(self):
+        with open(os.path.join(self.surveys_dirpath, 'dates.yaml'), 'w') as f:
+            f.write('DATES: {2023-05-01: {SAMPLED: 2023-05-02}, LATEST: 2023-05-02 10:30:00, TEXT: "2023-05-02"}\n')
+        for search_value in (datetime.date(2023, 5, 2), '2023-05-02', datetime.date(2023, 5, 1), 'SAMPLED'):
+            with self.subTest(search_value=search_value):
+                self.assertEqual(find_files_with_key_or_value(self.surveys_dirpath, search_value, index_filepath=self.index_filepath),
+                                 find_files_with_key_or_value(self.surveys_dirpath, search_value))
+
+        with YamlCorpusIndex(self.index_filepath) as index:
+            result, = index.find_files_with_key_or_value(datetime.datetime(2023, 5, 2, 10, 30))
+            self.assertEqual(result['value'], datetime.datetime(2023, 5, 2, 10, 30))
+            result, = index.find_files_with_key_or_value('SAMPLED')
+            self.assertEqual(result['nested_list'], ['DATES', datetime.date(2023, 5, 1), 'SAMPLED'])
+            self.assertEqual(index.get_yaml_files_with_keys([['DATES', datetime.date(2023, 5, 1), 'SAMPLED']])['dates.yaml'], True)
+            self.assertEqual(index.get_yaml_files_with_keys([['DATES', '2023-05-01']])['dates.yaml'], False)
+
+    def test_functions_match_with_and_without_index(self):
+        for search_value in ('v1', 'FRAME_1', 'missing'):
+            expected = find_files_with_key_or_value(self.surveys_dirpath, search_value)
+            results = find_files_with_key_or_value(self.surveys_dirpath, search_value, index_filepath=self.index_filepath)
+            key = lambda result: (result['yaml_file'], result['nested_list'])
+            self.assertEqual(sorted(results, key=key), sorted(expected, key=key))
+
+        keys_list = [['APP', 'SURVEYS', 'Survey 2']]
+        self.assertEqual(get_yaml_files_with_keys(self.surveys_dirpath, keys_list, index_filepath=self.index_filepath),
+                         get_yaml_files_with_keys(self.surveys_dirpath, keys_list))
+
+    def test_list_indices_do_not_match(self):
+        self.write('lists.yaml', {'APP': {'TAGS': ['x', 'y', [True, 0]], 'COUNTS': [1, 2], 1: 'one'}})
+        key = lambda result: (result['yaml_file'], repr(result['nested_list']))
+        for search_value in (0, 1, 2, True, 'y', 'one', 3):
+            with self.subTest(search_value=search_value):
+                expected = find_files_with_key_or_value(self.surveys_dirpath, search_value)
+                results = find_files_with_key_or_value(self.surveys_dirpath, search_value, index_filepath=self.index_filepath)
+                self.assertEqual(sorted(results, key=key), sorted(expected, key=key))
+
+        with YamlCorpusIndex(self.index_filepath) as index:
+            self.assertEqual([result['nested_list'] for result in index.find_files_with_key_or_value(2)], [['APP', 'COUNTS', 1]])
+
+    def test_exact_and_prefix_match_plain_scan(self):
+        self.write('lists.yaml', {'APP': {'TAGS': ['x', 'y', 'vx', [True, 0]], 'COUNTS': [1, 2], 1: 'one', 'v3': {'a': 'v1'}}})
+
+        def plain_scan(matches):
+            results = []
+            for root, dirs, files in os.walk(self.surveys_dirpath):
+                for file in sorted(files):
+                    if file.endswith('.yaml'):
+                        with open(os.path.join(root, file)) as f:
+                            data = yaml.safe_load(f)
+                        results.extend((file, repr(path)) for path in walk(data, [], matches))
+            return sorted(results)
+
+        def walk(data, path, matches):
+            if isinstance(data, dict):
+                for key, value in data.items():
+                    if matches(key):
+                        yield path + [key]
+                    yield from walk(value, path + [key], matches)
+            elif isinstance(data, list):
+                for index, value in enumerate(data):
+                    yield from walk(value, path + [index], matches)
+            elif matches(data):
+                yield path
+
+        with YamlCorpusIndex(self.index_filepath) as index:
+            index.refresh(self.surveys_dirpath)
+            for search_value in (0, 1, True, 'v1', 'y', 'FRAME_1'):
+                with self.subTest(search_value=search_value):
+                    results = index.find_files_with_key_or_value(search_value)
+                    self.assertEqual(sorted((result['yaml_file'], repr(result['nested_list'])) for result in results),
+                                     plain_scan(lambda value: type(value) is not dict and value == search_value))
+            for prefix in ('v', 'S', 'FRAME_', '', 'o'):
+                with self.subTest(prefix=prefix):
+                    results = index.find_files_with_key_or_value(prefix, prefix=True)
+                    self.assertEqual(sorted((result['yaml_file'], repr(result['nested_list'])) for result in results),
+                                     plain_scan(lambda value: isinstance(value, str) and value.startswith(prefix)))
+
+    def test_functions_match_with_and_without_workers(self):
+        for i in range(3, 12):
+            self.write(f'archive/survey_{i}.yaml', {'APP': {'SURVEYS': {f'Survey {i}': {'STATUS': 'v1' if i % 2 else 'v2'}}}})
+
+        for search_value in ('v1', 'STATUS'):
+            expected = find_files_with_key_or_value(self.surveys_dirpath, search_value)
+            self.assertEqual(find_files_with_key_or_value(self.surveys_dirpath, search_value, n_workers=3, chunk_size=2), expected)
+
+        keys_list = [['APP', 'SURVEYS', 'Survey 5'], ['APP', 'SURVEYS', 'Survey 1']]
+        expected = get_yaml_files_with_keys(self.surveys_dirpath, keys_list)
+        results = get_yaml_files_with_keys(self.surveys_dirpath, keys_list, n_workers=3, chunk_size=2)
+        self.assertEqual(list(results.items()), list(expected.items()))
+        self.assertEqual(sum(results.values()), 2)
+
+        with self.assertRaises(ValueError):
+            get_yaml_files_with_keys(self.surveys_dirpath, keys_list, chunk_size=0)
+
+    def test_invalid_files_are_skipped(self):
+        with open(os.path.join(self.surveys_dirpath, 'broken.yaml'), 'w') as f:
+            f.write('APP: [unclosed')
+        messages = []
+        with YamlCorpusIndex(self.index_filepath) as index:
+            index.refresh(self.surveys_dirpath, callback=messages.append)
+            self.assertEqual(len(messages), 1)
+            self.assertNotIn('broken.yaml', index.get_yaml_files_with_keys([['APP']]))
+
+    def test_missing_directory(self):
+        with YamlCorpusIndex(self.index_filepath) as index:
+            with self.assertRaises(ValueError):
+                index.refresh(os.path.join(self.dirpath, 'missing'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import io
+import os
+import datetime
+import itertools
+import unittest
+import yaml
+from bgstools.io import stream_has_key_paths, check_nested_dict
+
+
+DOCUMENTS = [
+    "APP:\n  SURVEYS:\n    S1: {FRAMES: {F1: 1}}\n  CONFIG: x\n",
+    "a: 1\nb: {c: {d: 2}, 1: {2: 3}}\nnull: {y: 2}\nl: [{a: 1}, [2]]\n",
+    "base: &b {k: 1}\nother:\n  <<: *b\n  z: 2\n",
+    "x: &a [1]\ny: *a\n",
+    "2020-01-01: {v: 1}\ntrue: {q: 1}\n",
+    "- 1\n- 2\n",
+    "",
+]
+
+KEY_PATHS = [
+    [], ['APP'], ['APP', 'SURVEYS', 'S1', 'FRAMES', 'F1'], ['APP', 'CONFIG'], ['APP', 'SURVEYS', 'S2'],
+    ['b', 'c', 'd'], ['b', 1, 2], ['b', 'c', 'e'], ['a', 'b'], [None, 'y'], ['l', 'a'],
+    ['other', 'k'], ['other', 'z'], ['x'], ['y'], [True, 'q'], [1, 'q'], [datetime.date(2020, 1, 1), 'v'],
+]
+
+
+class TestStreamHasKeyPaths(unittest.TestCase):
+
+    def test_matches_check_nested_dict(self):
+        for document in DOCUMENTS:
+            data = yaml.safe_load(document)
+            for n_paths in range(3):
+                for keys_list in itertools.combinations(KEY_PATHS, n_paths):
+                    try:
+                        expected = check_nested_dict(data, list(keys_list))
+                    except TypeError:
+                        # check_nested_dict fails on documents that are not mappings
+                        continue
+                    with self.subTest(document=document, keys_list=keys_list):
+                        self.assertEqual(stream_has_key_paths(io.StringIO(document), list(keys_list)), expected)
+
+    def test_stops_reading_once_decided(self):
+        # The invalid YAML at the end is never read
+        document = "APP:\n  SURVEYS: {S1: 1}\nOTHER: [unclosed\n"
+        self.assertTrue(stream_has_key_paths(io.StringIO(document), [['APP', 'SURVEYS']]))
+        self.assertFalse(stream_has_key_paths(io.StringIO(document), [['APP', 'CONFIG']]))
+        with self.assertRaises(yaml.YAMLError):
+            stream_has_key_paths(io.StringIO(document), [['MISSING']])
+
+    def test_non_seekable_stream_with_aliases(self):
+        read_fd, write_fd = os.pipe()
+        os.write(write_fd, DOCUMENTS[2].encode('utf-8'))
+        os.close(write_fd)
+        with os.fdopen(read_fd, 'rb') as stream:
+            self.assertFalse(stream.seekable())
+            self.assertTrue(stream_has_key_paths(stream, [['other', 'k']]))
+
+
+if __name__ == '__main__':
+    unittest.main()
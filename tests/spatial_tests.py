@@ -0,0 +1,224 @@
+import os
+import csv
+import h3
+import unittest
+import numpy as np
+from tempfile import TemporaryDirectory
+from bgstools.spatial import get_h3_geohash_epsg3006, get_coordinates_epsg3006_from_geohash, \
+    reproject_coordinates, reproject_coordinates_array, get_transformer, csv_epsg3006_to_h3, \
+    get_coordinates_epsg3006_from_geohash_array, H3Index, aggregate_h3, h3_to_parent_array
+from bgstools.spatial import geotag_frames, get_frame_seconds
+from bgstools.spatial.benchmark import run_benchmarks, generate_points_epsg3006, SWEREF99TM_EXTENT
+
+
+class TestReprojectCoordinates(unittest.TestCase):
+    def setUp(self):
+        self.x = np.array([674032.0, 500000.0, 319000.0])
+        self.y = np.array([6580821.0, 6400000.0, 7520000.0])
+
+    def test_transformer_is_cached(self):
+        self.assertIs(get_transformer('epsg:3006', 'epsg:4326'), get_transformer('epsg:3006', 'epsg:4326'))
+
+    def test_array_matches_scalar(self):
+        longitudes, latitudes = reproject_coordinates_array(self.x, self.y, inProj='epsg:3006', outProj='epsg:4326')
+        for i in range(len(self.x)):
+            longitude, latitude = reproject_coordinates(self.x[i], self.y[i], inProj='epsg:3006', outProj='epsg:4326')
+            self.assertAlmostEqual(longitudes[i], longitude)
+            self.assertAlmostEqual(latitudes[i], latitude)
+
+    def test_array_writes_into_buffers(self):
+        out_x = np.empty_like(self.x)
+        out_y = np.empty_like(self.y)
+        result_x, result_y = reproject_coordinates_array(self.x, self.y, 'epsg:3006', 'epsg:4326', out_x=out_x, out_y=out_y)
+        self.assertIs(result_x, out_x)
+        self.assertIs(result_y, out_y)
+        self.assertEqual(self.x[0], 674032.0)
+
+    def test_array_rejects_bad_buffer(self):
+        with self.assertRaises(ValueError):
+            reproject_coordinates_array(self.x, self.y, out_x=np.empty(2), out_y=np.empty(3))
+
+    def test_geohash_round_trip(self):
+        geohash = get_h3_geohash_epsg3006(674032, 6580821, resolution=15)
+        x, y = get_coordinates_epsg3006_from_geohash(geohash)
+        self.assertAlmostEqual(x, 674032, delta=1)
+        self.assertAlmostEqual(y, 6580821, delta=1)
+
+
+class TestGetCoordinatesEpsg3006FromGeohashArray(unittest.TestCase):
+    def setUp(self):
+        self.geohashes = ['89088661d5bffff', '8908b571327ffff', '89088661d5bffff']
+
+    def test_matches_scalar(self):
+        x, y = get_coordinates_epsg3006_from_geohash_array(self.geohashes)
+        for i, geohash in enumerate(self.geohashes):
+            self.assertEqual((x[i], y[i]), get_coordinates_epsg3006_from_geohash(geohash))
+
+    def test_integer_geohashes(self):
+        integer_geohashes = np.array([int(geohash, 16) for geohash in self.geohashes], dtype=np.uint64)
+        x, y = get_coordinates_epsg3006_from_geohash_array(self.geohashes)
+        integer_x, integer_y = get_coordinates_epsg3006_from_geohash_array(integer_geohashes)
+        np.testing.assert_array_equal(x, integer_x)
+        np.testing.assert_array_equal(y, integer_y)
+
+    def test_boundaries(self):
+        x, y, boundary_x, boundary_y, offsets = get_coordinates_epsg3006_from_geohash_array(self.geohashes, boundaries=True)
+        np.testing.assert_array_equal(offsets, [0, 6, 12, 18])
+        np.testing.assert_array_equal(boundary_x[0:6], boundary_x[12:18])
+        self.assertAlmostEqual(boundary_x[0:6].mean(), x[0], delta=50)
+        self.assertAlmostEqual(boundary_y[0:6].mean(), y[0], delta=50)
+
+
+class TestH3Index(unittest.TestCase):
+    def setUp(self):
+        self.index = H3Index(resolution=9)
+        self.index.insert('STATION_1', 59.3293, 18.0686)
+        self.index.insert_many_epsg3006(['STATION_2', 'STATION_3'], [674032, 674100], [6580821, 6580900])
+        self.index.insert('STATION_4', 55.6050, 13.0038)
+
+    def test_len(self):
+        self.assertEqual(len(self.index), 4)
+
+    def test_query_k_ring(self):
+        self.assertEqual(sorted(self.index.query_k_ring(59.33, 18.06, k=2)), ['STATION_1', 'STATION_2', 'STATION_3'])
+        self.assertEqual(self.index.query_k_ring(55.6050, 13.0038, k=1), ['STATION_4'])
+
+    def test_query_polygon(self):
+        polygon = [(59.2, 17.9), (59.4, 17.9), (59.4, 18.2), (59.2, 18.2)]
+        self.assertEqual(sorted(self.index.query_polygon(polygon)), ['STATION_1', 'STATION_2', 'STATION_3'])
+
+    def test_query_cell(self):
+        parent = get_h3_geohash_epsg3006(674032, 6580821, resolution=6)
+        child = get_h3_geohash_epsg3006(674032, 6580821, resolution=12)
+        self.assertEqual(sorted(self.index.query_cell(parent)), ['STATION_1', 'STATION_2', 'STATION_3'])
+        self.assertIn('STATION_2', self.index.query_cell(child))
+
+    def test_query_coarse_cell_of_fine_index(self):
+        # A resolution 0 cell has 7^15 children at resolution 15, so they cannot be enumerated
+        index = H3Index(resolution=15)
+        index.insert('STATION_1', 59.3293, 18.0686)
+        parent = get_h3_geohash_epsg3006(674032, 6580821, resolution=0)
+        self.assertEqual(index.query_cell(parent), ['STATION_1'])
+        index.insert('STATION_2', 59.3300, 18.0700)
+        index.insert_many_epsg3006(['STATION_3'], [674100], [6580900])
+        self.assertEqual(sorted(index.query_cell(parent)), ['STATION_1', 'STATION_2', 'STATION_3'])
+
+    def test_rollup(self):
+        rollup = self.index.rollup(resolution=4)
+        self.assertEqual(sorted(len(record_ids) for record_ids in rollup.values()), [1, 3])
+        with self.assertRaises(ValueError):
+            self.index.rollup(resolution=10)
+
+
+class TestAggregateH3(unittest.TestCase):
+    def setUp(self):
+        self.geohashes = ['8c08861adca17ff', '8c08861adca17ff', '8c08b57132589ff', '8c08861adca11ff']
+        self.depths = [10.0, 20.0, 5.0, np.nan]
+
+    def test_parent_array_matches_h3(self):
+        cells = np.array([int(geohash, 16) for geohash in self.geohashes], dtype=np.uint64)
+        for resolution in (0, 5, 9, 12):
+            parents = [format(parent, 'x') for parent in h3_to_parent_array(cells, resolution).tolist()]
+            self.assertEqual(parents, [h3.h3_to_parent(geohash, resolution) for geohash in self.geohashes])
+
+    def test_aggregate(self):
+        result = aggregate_h3(self.geohashes, {'DEPTH': self.depths}, resolutions=[6, 12], statistics=('count', 'mean', 'max'), as_strings=True)
+        self.assertEqual(result[12]['cell'].tolist(), ['8c08861adca11ff', '8c08861adca17ff', '8c08b57132589ff'])
+        np.testing.assert_array_equal(result[12]['count'], [1, 2, 1])
+        np.testing.assert_array_equal(result[12]['DEPTH_count'], [0, 2, 1])
+        np.testing.assert_array_equal(result[12]['DEPTH_mean'], [np.nan, 15.0, 5.0])
+        self.assertEqual(result[6]['cell'].tolist(), [h3.h3_to_parent('8c08861adca17ff', 6), h3.h3_to_parent('8c08b57132589ff', 6)])
+        np.testing.assert_array_equal(result[6]['count'], [3, 1])
+        np.testing.assert_array_equal(result[6]['DEPTH_max'], [20.0, 5.0])
+
+    def test_aggregate_coordinates(self):
+        result = aggregate_h3(decimalLatitudes=[59.33, 59.33], decimalLongitudes=[18.06, 18.06], resolutions=9)
+        np.testing.assert_array_equal(result[9]['count'], [2])
+
+    def test_coarser_geohashes(self):
+        with self.assertRaises(ValueError):
+            aggregate_h3(self.geohashes, resolutions=13)
+
+
+class TestCsvEpsg3006ToH3(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.input_filepath = os.path.join(self.temp_dir.name, "stations.csv")
+        self.rows = [['STATION_1', '674032.0', '6580821.0'], ['STATION_2', '500000.5', '6400000.5'], ['STATION_3', '319000', '7520000']]
+        with open(self.input_filepath, 'w', newline='') as f:
+            csv.writer(f).writerows([['name', 'x', 'y']] + self.rows)
+
+    def read_output(self, filepath):
+        with open(filepath, 'r', newline='') as f:
+            return list(csv.reader(f))
+
+    def test_serial_matches_scalar(self):
+        output_filepath = os.path.join(self.temp_dir.name, "serial.csv")
+        n_rows = csv_epsg3006_to_h3(self.input_filepath, output_filepath, resolutions=[9, 12], chunk_size=2)
+        output = self.read_output(output_filepath)
+        self.assertEqual(n_rows, 3)
+        self.assertEqual(output[0], ['name', 'x', 'y', 'H3_9', 'H3_12'])
+        for row, output_row in zip(self.rows, output[1:]):
+            x, y = float(row[1]), float(row[2])
+            self.assertEqual(output_row, row + [get_h3_geohash_epsg3006(x, y, 9), get_h3_geohash_epsg3006(x, y, 12)])
+
+    def test_parallel_matches_serial(self):
+        serial_filepath = os.path.join(self.temp_dir.name, "serial.csv")
+        parallel_filepath = os.path.join(self.temp_dir.name, "parallel.csv")
+        csv_epsg3006_to_h3(self.input_filepath, serial_filepath, chunk_size=1)
+        csv_epsg3006_to_h3(self.input_filepath, parallel_filepath, chunk_size=1, n_workers=2)
+        self.assertEqual(self.read_output(serial_filepath), self.read_output(parallel_filepath))
+
+    def test_missing_column(self):
+        with self.assertRaises(ValueError):
+            csv_epsg3006_to_h3(self.input_filepath, os.path.join(self.temp_dir.name, "out.csv"), x_column='easting')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+
+class TestGeotagFrames(unittest.TestCase):
+    def setUp(self):
+        self.frames = {
+            'SEC_000005': '/frames/a.png',
+            'SEC_000010': {'FILEPATH': '/frames/b.png', 'INTERPRETATION': {'DOTPOINTS': {}, 'STATUS': 'NOT_STARTED'}},
+            'SEC_000100': '/frames/c.png',
+        }
+        self.track = ([1010, 1000, 1020], [674020, 674000, 674040], [6580810, 6580800, 6580820], [12, 10, 14])
+
+    def test_get_frame_seconds(self):
+        self.assertEqual(get_frame_seconds('survey_video_frame__SEC_000012'), 12.0)
+        with self.assertRaises(ValueError):
+            get_frame_seconds('FRAME_1')
+
+    def test_geotag_frames(self):
+        frames = geotag_frames(self.frames, *self.track, video_start_time=1000)
+        position = frames['SEC_000005']['POSITION']
+        self.assertEqual((position['TIME'], position['X'], position['Y'], position['DEPTH']), (1005.0, 674010.0, 6580805.0, 11.0))
+        self.assertEqual(position['H3'], get_h3_geohash_epsg3006(674010.0, 6580805.0))
+        self.assertEqual(frames['SEC_000005']['FILEPATH'], '/frames/a.png')
+        self.assertEqual(frames['SEC_000010']['INTERPRETATION']['STATUS'], 'NOT_STARTED')
+        self.assertNotIn('POSITION', self.frames['SEC_000010'])
+
+    def test_frames_outside_track(self):
+        frames = geotag_frames(self.frames, *self.track[:3], video_start_time=1000)
+        self.assertIsNone(frames['SEC_000100']['POSITION'])
+        self.assertIsNone(frames['SEC_000010']['POSITION']['DEPTH'])
+
+
+class TestSpatialBenchmark(unittest.TestCase):
+    def test_generate_points(self):
+        x, y = generate_points_epsg3006(100)
+        min_x, min_y, max_x, max_y = SWEREF99TM_EXTENT
+        self.assertTrue(((x >= min_x) & (x <= max_x)).all())
+        self.assertTrue(((y >= min_y) & (y <= max_y)).all())
+
+    def test_run_benchmarks(self):
+        report = run_benchmarks(sizes=(10, 20), max_scalar_size=10)
+        self.assertEqual(len(report['results']), 12)
+        self.assertEqual({result['path'] for result in report['results'] if result['n_points'] == 20}, {'batch'})
+        self.assertTrue(all(result['peak_memory_bytes'] > 0 for result in report['results']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import os
+import shutil
+import tempfile
+import unittest
+import yaml
+from bgstools.utils import serialization, YamlBackend, get_yaml_backend, set_yaml_backend, available_yaml_backends
+from bgstools.datastorage import DataStore, YamlStorage
+from bgstools.datastorage.benchmark import generate_survey_data
+
+
+class RecordingBackend(YamlBackend):
+    """A backend that records its calls and delegates to the pure-Python backend."""
+
+    name = 'recording'
+
+    def __init__(self):
+        self.calls = []
+
+    def safe_load(self, stream):
+        self.calls.append('load')
+        return get_yaml_backend('python').safe_load(stream)
+
+    def safe_dump(self, data, stream=None, **kwargs):
+        self.calls.append('dump')
+        return get_yaml_backend('python').safe_dump(data, stream, **kwargs)
+
+
+class TestYamlBackends(unittest.TestCase):
+
+    def setUp(self):
+        self.previous_backend = get_yaml_backend()
+        self.dirpath = tempfile.mkdtemp()
+
+    def tearDown(self):
+        set_yaml_backend(self.previous_backend)
+        shutil.rmtree(self.dirpath)
+
+    def test_default_backend(self):
+        self.assertEqual(get_yaml_backend().name, 'libyaml' if yaml.__with_libyaml__ else 'python')
+        self.assertEqual(available_yaml_backends()[0], get_yaml_backend().name)
+        with self.assertRaises(ValueError):
+            set_yaml_backend('unknown')
+
+    def test_incomplete_backend_cannot_be_created(self):
+        class LoadOnlyBackend(YamlBackend):
+            def safe_load(self, stream):
+                return None
+
+        with self.assertRaises(TypeError):
+            LoadOnlyBackend()
+        with self.assertRaises(TypeError):
+            YamlBackend()
+
+    def test_backends_read_and_write_the_same_data(self):
+        data = generate_survey_data(n_stations=3, n_frames=2)
+        for name in available_yaml_backends():
+            backend = get_yaml_backend(name)
+            with self.subTest(backend=name):
+                self.assertEqual(backend.safe_load(backend.safe_dump(data)), data)
+                line = backend.safe_dump({'path': ['a'], 'value': 'x ' * 100}, default_flow_style=True, width=float('inf'))
+                self.assertEqual(line.count('\n'), 1)
+
+    def test_package_reads_and_writes_through_the_backend(self):
+        backend = RecordingBackend()
+        set_yaml_backend(backend)
+        data_store = DataStore(YamlStorage(file_path=os.path.join(self.dirpath, 'survey.yaml')))
+        data_store.store_data({'APP': {'SURVEYS': {}}})
+        os.utime(data_store.storage_strategy.file_path, ns=(0, 0))
+        self.assertEqual(data_store.load_data(), {'APP': {'SURVEYS': {}}})
+        self.assertEqual(backend.calls, ['dump', 'load'])
+        self.assertEqual(serialization.safe_load('a: 1'), {'a': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()